@@ -0,0 +1,76 @@
+import tempfile
+
+from q2_katharoseq import estimating_biomass, biomass_plot
+
+from .common import (SAMPLES, FEATURES, synthetic_table, example_replicas,
+                     dense_supported, columns)
+
+
+class DenseBiomass:
+    params = [SAMPLES, FEATURES]
+    param_names = ['samples', 'features']
+    number = 1
+    repeat = 3
+    timeout = 1800
+
+    def setup(self, n_samples, n_features):
+        dense_supported(n_samples, n_features)
+        table, metadata = synthetic_table(n_samples, n_features)
+        self.table = table.to_dataframe(dense=True).T
+        self.columns = columns(metadata)
+        self.output_dir = tempfile.TemporaryDirectory()
+
+    def teardown(self, n_samples, n_features):
+        self.output_dir.cleanup()
+
+    def _estimate(self):
+        return estimating_biomass(
+            self.table, self.columns['cell_count_column'], 100, 'control',
+            self.columns['positive_control_column'], 5, 60,
+            self.columns['extraction_mass_g'])
+
+    def _plot(self):
+        biomass_plot(
+            self.output_dir.name, self.table,
+            self.columns['cell_count_column'], 100, 'control',
+            self.columns['positive_control_column'], plot_samples=True,
+            extraction_mass_g=self.columns['extraction_mass_g'],
+            pcr_template_vol=5, dna_extract_vol=60)
+
+    def time_estimating_biomass(self, n_samples, n_features):
+        self._estimate()
+
+    def peakmem_estimating_biomass(self, n_samples, n_features):
+        self._estimate()
+
+    def time_biomass_plot(self, n_samples, n_features):
+        self._plot()
+
+    def peakmem_biomass_plot(self, n_samples, n_features):
+        self._plot()
+
+
+class ExampleBiomass(DenseBiomass):
+    params = [1, 10, 100, 1000]
+    param_names = ['replicas']
+
+    def setup(self, n):
+        table, metadata = example_replicas(n)
+        self.table = table.to_dataframe(dense=True).T
+        self.columns = columns(metadata)
+        self.output_dir = tempfile.TemporaryDirectory()
+
+    def teardown(self, n):
+        self.output_dir.cleanup()
+
+    def time_estimating_biomass(self, n):
+        self._estimate()
+
+    def peakmem_estimating_biomass(self, n):
+        self._estimate()
+
+    def time_biomass_plot(self, n):
+        self._plot()
+
+    def peakmem_biomass_plot(self, n):
+        self._plot()
@@ -0,0 +1,20 @@
+# Import times, measured in a fresh interpreter each time
+
+
+def timeraw_import_package():
+    return 'import q2_katharoseq'
+
+
+def timeraw_import_core():
+    return 'import q2_katharoseq.core'
+
+
+def timeraw_import_plugin():
+    return 'import q2_katharoseq.plugin_setup'
+
+
+def timeraw_plugin_manager():
+    return '''
+    import qiime2.sdk
+    qiime2.sdk.PluginManager()
+    '''
@@ -0,0 +1,95 @@
+import tempfile
+
+from q2_katharoseq import read_count_threshold, fit_threshold, filter_table
+
+from .common import (SAMPLES, FEATURES, synthetic_table, example_replicas,
+                     dense_supported, columns)
+
+
+class DenseThreshold:
+    params = [SAMPLES, FEATURES]
+    param_names = ['samples', 'features']
+    number = 1
+    repeat = 3
+    timeout = 1800
+
+    def setup(self, n_samples, n_features):
+        dense_supported(n_samples, n_features)
+        table, metadata = synthetic_table(n_samples, n_features)
+        self.table = table.to_dataframe(dense=True).T
+        self.columns = columns(metadata)
+        self.output_dir = tempfile.TemporaryDirectory()
+
+    def teardown(self, n_samples, n_features):
+        self.output_dir.cleanup()
+
+    def _fit(self):
+        return fit_threshold(
+            90, 'control', self.columns['positive_control_column'],
+            self.columns['cell_count_column'], self.table, 'classic')
+
+    def time_fit_threshold(self, n_samples, n_features):
+        self._fit()
+
+    def peakmem_fit_threshold(self, n_samples, n_features):
+        self._fit()
+
+    def time_read_count_threshold(self, n_samples, n_features):
+        read_count_threshold(
+            self.output_dir.name, 90, 'control',
+            self.columns['positive_control_column'],
+            self.columns['cell_count_column'], self.table, 'classic')
+
+
+class SparseThreshold:
+    params = [SAMPLES, FEATURES]
+    param_names = ['samples', 'features']
+    number = 1
+    repeat = 3
+    timeout = 1800
+
+    def setup(self, n_samples, n_features):
+        self.table, metadata = synthetic_table(n_samples, n_features)
+        self.columns = columns(metadata)
+
+    def _filter(self):
+        return filter_table(
+            self.table, 90, 'control',
+            self.columns['positive_control_column'],
+            self.columns['cell_count_column'], 'classic')
+
+    def time_filter_table(self, n_samples, n_features):
+        self._filter()
+
+    def peakmem_filter_table(self, n_samples, n_features):
+        self._filter()
+
+
+class ExampleThreshold:
+    params = [1, 10, 100, 1000]
+    param_names = ['replicas']
+    number = 1
+    repeat = 3
+    timeout = 1800
+
+    def setup(self, n):
+        self.sparse, metadata = example_replicas(n)
+        self.table = self.sparse.to_dataframe(dense=True).T
+        self.columns = columns(metadata)
+
+    def time_fit_threshold(self, n):
+        fit_threshold(90, 'control', self.columns['positive_control_column'],
+                      self.columns['cell_count_column'], self.table,
+                      'classic')
+
+    def _filter(self):
+        return filter_table(
+            self.sparse, 90, 'control',
+            self.columns['positive_control_column'],
+            self.columns['cell_count_column'], 'classic')
+
+    def time_filter_table(self, n):
+        self._filter()
+
+    def peakmem_filter_table(self, n):
+        self._filter()
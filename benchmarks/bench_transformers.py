@@ -0,0 +1,64 @@
+import biom
+import pandas as pd
+import qiime2
+
+from .common import SAMPLES, FEATURES, synthetic_table, dense_supported
+
+
+class FeatureTableViews:
+    # the BIOM to pandas and biom.Table transformers every action of the
+    # plugin goes through
+    params = [SAMPLES, FEATURES]
+    param_names = ['samples', 'features']
+    number = 1
+    repeat = 3
+    timeout = 1800
+
+    def setup(self, n_samples, n_features):
+        table, _ = synthetic_table(n_samples, n_features)
+        self.artifact = qiime2.Artifact.import_data(
+            'FeatureTable[Frequency]', table)
+
+    def time_view_biom(self, n_samples, n_features):
+        self.artifact.view(biom.Table)
+
+    def peakmem_view_biom(self, n_samples, n_features):
+        self.artifact.view(biom.Table)
+
+    def time_view_dataframe(self, n_samples, n_features):
+        dense_supported(n_samples, n_features)
+        self.artifact.view(pd.DataFrame)
+
+    def peakmem_view_dataframe(self, n_samples, n_features):
+        dense_supported(n_samples, n_features)
+        self.artifact.view(pd.DataFrame)
+
+
+class EstimatedBiomassViews:
+    params = [SAMPLES]
+    param_names = ['samples']
+    number = 1
+    repeat = 3
+    timeout = 1800
+
+    def setup(self, n_samples):
+        estimates = pd.DataFrame(
+            {'total_reads': 1000.0, 'log_total_reads': 3.0,
+             'estimated_biomass_per_pcrrxn': 10.0,
+             'estimated_biomass_per_dnarxn': 120.0,
+             'extraction_mass_g': 0.1, 'estimated_cells_per_g': 1200.0,
+             'log_estimated_cells_per_g': 3.08},
+            index=pd.Index([f'S{i}' for i in range(n_samples)],
+                           name='sample_name'))
+        self.estimates = estimates
+        self.artifact = qiime2.Artifact.import_data('EstimatedBiomass',
+                                                    estimates)
+
+    def time_import(self, n_samples):
+        qiime2.Artifact.import_data('EstimatedBiomass', self.estimates)
+
+    def time_view_dataframe(self, n_samples):
+        self.artifact.view(pd.DataFrame)
+
+    def peakmem_view_dataframe(self, n_samples):
+        self.artifact.view(pd.DataFrame)
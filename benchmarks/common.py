@@ -0,0 +1,55 @@
+from os.path import dirname, abspath, join
+
+import biom
+import pandas as pd
+import qiime2
+
+from q2_katharoseq.simulate import simulate_study
+
+
+EXAMPLE = join(dirname(abspath(__file__)), '..', 'example')
+
+SAMPLES = [10**2, 10**3, 10**4, 10**5, 10**6]
+FEATURES = [10**2, 10**3, 10**4, 10**5]
+
+# pandas tables above this many cells are skipped; the sparse benchmarks
+# cover the larger sizes
+DENSE_MAX_CELLS = 10**8
+
+
+def synthetic_table(n_samples, n_features):
+    return simulate_study(n_samples, n_features, seed=0)
+
+
+def example_replicas(n):
+    # n copies of the FMP example, with the sample IDs made unique
+    table = qiime2.Artifact.load(
+        join(EXAMPLE, 'fmp_collapsed_table.qza')).view(biom.Table)
+    metadata = qiime2.Metadata.load(
+        join(EXAMPLE, 'fmp_metadata.tsv')).to_dataframe()
+    metadata = metadata.loc[table.ids(axis='sample')]
+
+    tables, frames = [], []
+    for i in range(n):
+        tables.append(table.update_ids(
+            {s: f'{s}.{i}' for s in table.ids(axis='sample')},
+            axis='sample', inplace=False))
+        frames.append(metadata.rename(index=lambda s: f'{s}.{i}'))
+    if n == 1:
+        return tables[0], frames[0]
+    return tables[0].concat(tables[1:], axis='sample'), pd.concat(frames)
+
+
+def dense_supported(n_samples, n_features):
+    if n_samples * n_features > DENSE_MAX_CELLS:
+        raise NotImplementedError('dense table too large')
+
+
+def columns(metadata):
+    md = qiime2.Metadata(metadata[['control_rct',
+                                   'control_cell_into_extraction',
+                                   'extraction_mass_g']])
+    return {'positive_control_column': md.get_column('control_rct'),
+            'cell_count_column': md.get_column(
+                'control_cell_into_extraction'),
+            'extraction_mass_g': md.get_column('extraction_mass_g')}
@@ -6,9 +6,19 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 from . import _version
-from ._methods import read_count_threshold, estimating_biomass, control_type
-from ._methods import biomass_plot
 
 __version__ = _version.get_versions()['version']
 __all__ = ['read_count_threshold', 'estimating_biomass', 'biomass_plot',
-           'control_type']
+           'fit_standard_curve', 'append_biomass', 'filter_table',
+           'fit_threshold', 'threshold_plot', 'fit_threshold_collection',
+           'estimating_biomass_collection', 'select_group', 'read_totals',
+           'group_thresholds', 'rank_thresholds', 'control_type']
+
+
+# the actions are imported on first use, so that q2_katharoseq.core can be
+# used without importing QIIME 2
+def __getattr__(name):
+    if name in __all__:
+        from . import _methods
+        return getattr(_methods, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,480 @@
+import logging
+import math
+
+import numpy as np
+import pandas as pd
+
+from . import core
+from .core import control_type, min_frequency, top_features, depth_summary
+from ._timing import stage
+
+
+logger = logging.getLogger(__name__)
+
+# fits every kit and keeps the one that describes the controls best
+AUTO = 'auto'
+CONTROLS = list(control_type) + [AUTO]
+
+# share of the reads of the controls with the most cells that a kit has to
+# hold to be picked by AUTO
+AUTO_MIN_SHARE = 0.5
+
+# the levels of `qiime taxa collapse` up to the genus of the kit taxa
+RANKS = {1: 'domain', 2: 'phylum', 3: 'class', 4: 'order', 5: 'family',
+         6: 'genus'}
+LEVELS = [4, 5, 6]
+
+
+def as_series(column):
+    # metadata columns are QIIME 2 MetadataColumns within the plugin and
+    # plain Series when used without the framework
+    if isinstance(column, pd.Series):
+        return column
+    return column.to_series()
+
+
+def totals_frame(table):
+    # only the total reads of a sample are used to estimate biomass, so a
+    # biom.Table is reduced to them instead of being densified
+    return pd.Series(table.sum(axis='sample'),
+                     index=table.ids(axis='sample')).to_frame()
+
+
+def align_totals(totals, sample_ids):
+    # totals computed separately, e.g. per partition of a pipeline, in the
+    # order of the samples of the table
+    missing = pd.Index(sample_ids).difference(totals.index)
+    if len(missing):
+        raise ValueError(f"The read totals lack {len(missing)} samples of "
+                         f"the table: {', '.join(map(str, missing[:5]))}.")
+    return totals.reindex(sample_ids).to_numpy(dtype=float)
+
+
+def filter_total_reads(table, min_total_reads):
+    total_reads = table.sum(axis=1)
+    filtered = pd.DataFrame(total_reads[total_reads > min_total_reads])
+    filtered = filtered.rename(columns={0: 'total_reads'})
+    filtered['log_total_reads'] = filtered.total_reads.apply(math.log10)
+    return filtered
+
+
+def fit_lm(table,
+           min_total_reads,
+           positive_control_column,
+           positive_control_value,
+           control_cell_extraction):
+    with stage('sum'):
+        filtered = filter_total_reads(table, min_total_reads)
+
+    with stage('standard curve'):
+        positive_control_column = as_series(positive_control_column).loc[
+            filtered.index]
+        positive_controls = positive_control_column[
+            positive_control_column == positive_control_value]
+        positive_controls = filtered.loc[positive_controls.index]
+
+        positive_controls['control_cell_extraction'] = \
+            as_series(control_cell_extraction).loc[positive_controls.index]
+        positive_controls['log_control_cell_extraction'] = \
+            positive_controls.control_cell_extraction.apply(math.log10)
+
+        slope, intercept = core.fit_standard_curve(
+            positive_controls.log_total_reads,
+            positive_controls.log_control_cell_extraction)
+
+    return slope, intercept, filtered, positive_controls
+
+
+def estimate_biomass(filtered,
+                     slope,
+                     intercept,
+                     pcr_template_vol,
+                     dna_extract_vol,
+                     extraction_mass_g):
+    with stage('estimate'):
+        filtered['estimated_biomass_per_pcrrxn'] = core.estimate_cells(
+            filtered.log_total_reads, slope, intercept)
+        filtered['estimated_biomass_per_dnarxn'] = \
+            filtered.estimated_biomass_per_pcrrxn*(
+                dna_extract_vol/pcr_template_vol)
+
+        filtered['extraction_mass_g'] = as_series(extraction_mass_g).loc[
+            filtered.index]
+        filtered['estimated_cells_per_g'] = \
+            filtered['estimated_biomass_per_dnarxn'] / \
+            filtered['extraction_mass_g']
+        filtered['log_estimated_cells_per_g'] = \
+            filtered.estimated_cells_per_g.apply(math.log10)
+
+        filtered.index.rename('sample_name', inplace=True)
+
+    return filtered
+
+
+def validate_positive_controls(
+        sample_ids,
+        feature_ids,
+        threshold,
+        positive_control_value,
+        positive_control_column,
+        cell_count_column,
+        control,
+        asv):
+    if control == 'asv':
+        if asv is None:
+            raise ValueError("Control type set to asv but no asv provided")
+        if asv not in feature_ids:
+            raise ValueError("asv not found in the feature table")
+
+    # conversions
+    positive_control_column = as_series(positive_control_column)
+    cell_count_column = as_series(cell_count_column)
+
+    # filter columns
+    positive_controls = positive_control_column[
+        positive_control_column == positive_control_value]
+
+    if not positive_controls.shape[0]:
+        unique_values = positive_control_column.unique()[:10]
+        raise ValueError(
+            f"No positive controls found in positive control column. "
+            f"Searched for '{positive_control_value}' but found these values: "
+            f"{list(unique_values)}"
+        )
+    positive_controls = pd.Series(positive_controls)
+
+    # check shapes - validate overlap between metadata and feature table
+    n_controls_metadata = len(positive_controls)
+    inds = positive_controls.index.intersection(sample_ids)
+    n_controls_in_table = len(inds)
+
+    if n_controls_in_table == 0:
+        missing_samples = list(positive_controls.index[:5])
+        table_samples = list(sample_ids[:5])
+        raise KeyError(
+            f"No positive controls found in feature table. "
+            f"Found {n_controls_metadata} controls in metadata but none match "
+            f"the feature table sample IDs.\n"
+            f"Example control IDs from metadata: {missing_samples}\n"
+            f"Example sample IDs from table: {table_samples}\n"
+            f"Check that sample IDs match between your metadata and "
+            f"feature table."
+        )
+
+    if n_controls_in_table < n_controls_metadata:
+        missing = positive_controls.index.difference(sample_ids)
+        missing_cell_counts = cell_count_column.loc[missing]
+        logger.warning(
+            f"Only {n_controls_in_table} of {n_controls_metadata} "
+            f"positive controls found in feature table. Missing "
+            f"{len(missing)} samples with cell counts: "
+            f"{sorted(missing_cell_counts.unique().tolist())}. "
+            f"Proceeding with available controls."
+        )
+
+    # get cell counts only for samples that are in the table
+    cell_counts = cell_count_column.loc[inds]
+
+    # validate we have enough points for curve fitting
+    unique_cell_counts = cell_counts.unique()
+    if len(unique_cell_counts) < 3:
+        raise ValueError(
+            f"Insufficient dilution series: only {len(unique_cell_counts)} "
+            f"unique cell count values found ({sorted(unique_cell_counts)}). "
+            f"At least 3 different concentrations are required for "
+            f"curve fitting."
+        )
+
+    # the minimum frequency is infinite at 100 percent and undefined at 0
+    if threshold >= 100 or threshold <= 0:
+        raise ValueError('Threshold must be between 0 and 100, exclusive.')
+
+    return inds, cell_counts
+
+
+def feature_taxa(feature_ids, taxonomy):
+    # the taxonomy string of every feature of the table, from a taxonomy
+    # DataFrame with a Taxon column or a Series of the strings
+    if isinstance(taxonomy, pd.DataFrame):
+        taxonomy = taxonomy['Taxon']
+    taxa = taxonomy.reindex(pd.Index(feature_ids))
+    missing = taxa.index[taxa.isna()]
+    if len(missing):
+        raise ValueError(
+            f"{len(missing)} features of the table are not in the "
+            f"taxonomy, e.g. {list(missing[:5])}. Use the taxonomy the "
+            f"table was classified with.")
+    return taxa.tolist()
+
+
+def compare_kits(kit_reads, n_present, asv_reads, levels):
+    # one row per kit with its fit to the controls; the kit with the best
+    # fit among those that hold most of the reads of the controls with the
+    # most cells is selected
+    log_reads = np.log10(asv_reads)
+    top = levels == levels.max()
+    kits = []
+    for i, kit in enumerate(core.KITS):
+        correct = kit_reads[:, i] / asv_reads
+        row = {'kit': kit, 'n_taxa': len(control_type[kit]),
+               'n_present': int(n_present[i]),
+               'top_share': float(correct[top].mean()),
+               'h': None, 'k_prime': None, 'r2': None, 'rmse': None,
+               'error': None, 'selected': False}
+        if not kit_reads[:, i].any():
+            row['error'] = 'no reads'
+        else:
+            try:
+                popt, _ = core.fit_sigmoid(log_reads, correct)
+            except (ValueError, RuntimeError) as e:
+                row['error'] = str(e).split('.')[0]
+            else:
+                r2, rmse = core.fit_quality(log_reads, correct, popt)
+                row.update(h=float(popt[0]), k_prime=float(popt[1]), r2=r2,
+                           rmse=rmse)
+        kits.append(row)
+
+    eligible = [k for k in kits if k['r2'] is not None and
+                not np.isnan(k['r2']) and k['top_share'] >= AUTO_MIN_SHARE]
+    if not eligible:
+        shares = ', '.join(f"{k['kit']} {k['top_share']:.1%}" for k in kits)
+        raise ValueError(
+            f"No control type could be detected: no kit that can be fitted "
+            f"holds at least {AUTO_MIN_SHARE:.0%} of the reads of the "
+            f"positive controls with the most cells ({shares}). Set the "
+            f"control type, or use the asv control type for a custom "
+            f"positive control.")
+    max(eligible, key=lambda k: k['r2'])['selected'] = True
+    return kits
+
+
+def fit_positive_controls(matrix, sample_ids, feature_ids, cell_counts,
+                          control, asv, taxonomy=None):
+    # matrix holds the positive controls as CSR rows, in sample_ids order
+    sample_ids = pd.Index(sample_ids)
+
+    # the kit taxa are genera, so the controls of an ASV table are collapsed
+    # to genus with one product with the ASV x genus indicator; the rest of
+    # the table is never collapsed
+    if taxonomy is not None and control != 'asv':
+        with stage('collapse'):
+            indicator, feature_ids = core.collapse_indicator(
+                feature_taxa(feature_ids, taxonomy))
+            matrix = (matrix @ indicator).tocsr()
+
+    # visual check
+    with stage('top taxa'):
+        top_taxa = top_features(matrix, feature_ids,
+                                cell_counts.loc[sample_ids].to_numpy())
+
+    # calculate the total number of reads per sample
+    with stage('control totals'):
+        asv_reads = core.sample_totals(matrix)
+
+    # validate no zero-read samples
+    zero_read_samples = sample_ids[asv_reads == 0].tolist()
+    if zero_read_samples:
+        raise ValueError(
+            f"Found {len(zero_read_samples)} positive control sample(s) "
+            f"with zero total reads: {zero_read_samples[:5]}. Cannot "
+            f"compute correct assignment ratio. These samples may have "
+            f"been filtered out upstream."
+        )
+
+    # with AUTO every kit is read in one pass and fitted, and the selected
+    # kit is fitted again below like a kit that was set
+    kits = None
+    if control == AUTO:
+        with stage('control reads'):
+            reads, n_present = core.kit_reads(matrix, feature_ids)
+        with stage('kits'):
+            kits = compare_kits(reads, n_present, asv_reads,
+                                cell_counts.loc[sample_ids].to_numpy())
+        control = next(k['kit'] for k in kits if k['selected'])
+        logger.info('Detected the %s control type', control)
+
+    # number reads aligning to mock community input
+    if control == 'asv':
+        with stage('control reads'):
+            control_reads, _ = core.control_reads(matrix, feature_ids, [asv])
+    else:
+        control_taxa = control_type[control]
+        with stage('control reads'):
+            control_reads, present_taxa = core.control_reads(
+                matrix, feature_ids, control_taxa)
+        # validate control taxa exist in the table
+        if not present_taxa:
+            raise ValueError(
+                f"None of the {control} control taxa were found in the "
+                f"feature table. Expected taxa like: "
+                f"{control_taxa[0][:50]}..."
+            )
+
+    # validate control has reads in at least some positive controls
+    if control_reads.sum() == 0:
+        if control == 'asv':
+            raise ValueError(
+                f"The specified ASV has zero reads in all {len(sample_ids)} "
+                f"positive control samples. Cannot build KatharoSeq "
+                f"curve. Verify the ASV sequence is correct and present "
+                f"in your positive control dilution series."
+            )
+        else:
+            raise ValueError(
+                f"The {control} control taxa have zero total reads across "
+                f"all {len(sample_ids)} positive control samples. Cannot "
+                f"build KatharoSeq curve. Verify the control type matches "
+                f"your experimental setup."
+            )
+
+    # define katharo
+    katharo = pd.DataFrame({'correct_assign': control_reads / asv_reads,
+                            'control_reads': control_reads,
+                            'asv_reads': asv_reads,
+                            'log_asv_reads': np.log10(asv_reads)},
+                           index=sample_ids)
+
+    # fit curve to data
+    with stage('curve fit'):
+        popt, pcov = core.fit_sigmoid(katharo['log_asv_reads'],
+                                      katharo['correct_assign'])
+
+    return katharo, popt, pcov, top_taxa, kits
+
+
+def threshold_fit(katharo, popt, pcov, cell_counts, top_taxa, threshold,
+                  totals, kits=None):
+    thresholds = sorted({50, 70, 90, threshold} - {0, 100})
+    controls = katharo.join(cell_counts.rename('cell_count'))
+    min_freqs = {
+        str(t): int(min_frequency(popt, t/100)) for t in thresholds}
+
+    with stage('depth summary'):
+        depth = depth_summary(totals, min_freqs)
+
+    # a detected control type is reported along with the other kits
+    detected = {}
+    if kits is not None:
+        detected = {'control': next(k['kit'] for k in kits if k['selected']),
+                    'kits': kits}
+
+    return {'threshold': threshold,
+            'min_freq': int(min_frequency(popt, threshold/100)),
+            'h': float(popt[0]),
+            'k_prime': float(popt[1]),
+            'pcov': np.asarray(pcov).tolist(),
+            'thresholds': min_freqs,
+            'depth': depth,
+            'controls': {
+                'sample_id': [str(i) for i in controls.index],
+                'cell_count': controls['cell_count'].tolist(),
+                'asv_reads': controls['asv_reads'].tolist(),
+                'control_reads': controls['control_reads'].tolist(),
+                'correct_assign': controls['correct_assign'].tolist(),
+                'log_asv_reads': controls['log_asv_reads'].tolist()},
+            'top_taxa': top_taxa,
+            **detected}
+
+
+def control_rows(table, inds):
+    # the positive controls of a biom.Table as CSR rows in inds order, and
+    # the feature IDs
+    controls = table.filter(inds, axis='sample', inplace=False)
+    order = [controls.index(i, axis='sample') for i in inds]
+    return (controls.matrix_data.T.tocsr()[order],
+            controls.ids(axis='observation'))
+
+
+def fit_table_threshold(table, threshold, positive_control_value,
+                        positive_control_column, cell_count_column, control,
+                        asv=None, taxonomy=None):
+    with stage('validate'):
+        inds, cell_counts = validate_positive_controls(
+            table.ids(axis='sample'),
+            table.ids(axis='observation'),
+            threshold,
+            positive_control_value,
+            positive_control_column,
+            cell_count_column,
+            control,
+            asv)
+
+    with stage('controls'):
+        matrix, feature_ids = control_rows(table, inds)
+    katharo, popt, pcov, top_taxa, kits = fit_positive_controls(
+        matrix, inds, feature_ids, cell_counts, control, asv, taxonomy)
+
+    with stage('sum'):
+        totals = table.sum(axis='sample')
+    result = threshold_fit(katharo, popt, pcov, cell_counts, top_taxa,
+                           threshold, totals, kits)
+    return result, totals
+
+
+def rank_fits(matrix, taxa, control, levels, asv_reads, threshold,
+              thresholds):
+    # the control reads at every level from one product of the controls with
+    # the feature x level indicator, and a fit per level
+    reads = matrix @ core.rank_indicator(taxa, control_type[control], levels)
+    if hasattr(reads, 'toarray'):
+        reads = reads.toarray()
+    log_reads = np.log10(asv_reads)
+    ranks = []
+    for i, level in enumerate(levels):
+        correct = reads[:, i] / asv_reads
+        row = {'level': level, 'rank': RANKS[level],
+               'correct_assign': correct.tolist(), 'h': None,
+               'k_prime': None, 'r2': None, 'min_freq': None,
+               'thresholds': None, 'error': None}
+        try:
+            popt, _ = core.fit_sigmoid(log_reads, correct)
+        except (ValueError, RuntimeError) as e:
+            row['error'] = str(e).split('.')[0]
+        else:
+            row.update(
+                h=float(popt[0]), k_prime=float(popt[1]),
+                r2=core.fit_quality(log_reads, correct, popt)[0],
+                min_freq=int(min_frequency(popt, threshold/100)),
+                thresholds={t: int(min_frequency(popt, int(t)/100))
+                            for t in thresholds})
+        ranks.append(row)
+    return ranks
+
+
+def fit_rank_thresholds(table, threshold, positive_control_value,
+                        positive_control_column, cell_count_column, control,
+                        taxonomy, levels=LEVELS):
+    # the threshold of an ASV table at the genus level, plus the fits of the
+    # kit at every requested level
+    levels = sorted(set(levels))
+    unknown = [level for level in levels if level not in RANKS]
+    if unknown:
+        raise ValueError(
+            f"Levels must be between 1 and 6, the genus level of the kit "
+            f"taxa, but {unknown} were requested.")
+    if control == 'asv':
+        raise ValueError("Thresholds by rank need a kit of known taxa, "
+                         "which the asv control type does not have.")
+
+    with stage('validate'):
+        inds, cell_counts = validate_positive_controls(
+            table.ids(axis='sample'), table.ids(axis='observation'),
+            threshold, positive_control_value, positive_control_column,
+            cell_count_column, control, None)
+
+    with stage('controls'):
+        matrix, feature_ids = control_rows(table, inds)
+    katharo, popt, pcov, top_taxa, kits = fit_positive_controls(
+        matrix, inds, feature_ids, cell_counts, control, None, taxonomy)
+
+    with stage('sum'):
+        totals = table.sum(axis='sample')
+    result = threshold_fit(katharo, popt, pcov, cell_counts, top_taxa,
+                           threshold, totals, kits)
+
+    with stage('ranks'):
+        result['ranks'] = rank_fits(
+            matrix, feature_taxa(feature_ids, taxonomy),
+            result.get('control', control), levels,
+            katharo['asv_reads'].to_numpy(), threshold, result['thresholds'])
+    return result, totals
@@ -1,3 +1,7 @@
+import gzip
+import io
+import json
+
 import qiime2.plugin.model as model
 
 
@@ -9,17 +13,170 @@ STATS_HEADER = ['sample-id',
                 'estimated_cells_per_g',
                 'log_estimated_cells_per_g']
 
+# written by estimating_biomass in front of the STATS_HEADER columns
+OPTIONAL_STATS_COLUMNS = ['total_reads']
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def detect_compression(path):
+    with open(str(path), 'rb') as fh:
+        magic = fh.read(4)
+
+    if magic.startswith(_GZIP_MAGIC):
+        return 'gzip'
+    elif magic.startswith(_ZSTD_MAGIC):
+        return 'zstd'
+    return None
+
+
+def open_text(path):
+    compression = detect_compression(path)
+    if compression == 'gzip':
+        return gzip.open(str(path), 'rt')
+    elif compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError('%s is zstd compressed but the zstandard '
+                             'package is not installed.' % path)
+        fh = open(str(path), 'rb')
+        reader = zstandard.ZstdDecompressor().stream_reader(fh,
+                                                            closefd=True)
+        return io.TextIOWrapper(reader)
+    return open(str(path))
+
+
+def open_gzip_writer(path):
+    # mtime is pinned so identical tables produce identical artifacts
+    fh = gzip.GzipFile(str(path), 'wb', mtime=0)
+    return io.TextIOWrapper(fh, newline='')
+
+
+def read_header(path):
+    with open_text(path) as fh:
+        return fh.readline().strip().split(',')
+
+
+def sniff_biomass(path):
+    hdr = read_header(path)
+    columns = [c for c in hdr[1:] if c not in OPTIONAL_STATS_COLUMNS]
+
+    return columns == STATS_HEADER[1:]
+
 
 class EstimatedBiomassFmt(model.TextFileFormat):
     def sniff(self):
-        line = open(str(self)).readline()
-        hdr = line.strip().split(',')
+        return detect_compression(self) is None and sniff_biomass(self)
+
+    def validate(self, *args):
+        pass
+
+
+class CompressedEstimatedBiomassFmt(model.BinaryFileFormat):
+    compression = 'gzip'
+
+    def sniff(self):
+        return (detect_compression(self) == self.compression
+                and sniff_biomass(self))
+
+    def validate(self, *args):
+        pass
+
+
+class ZstdEstimatedBiomassFmt(CompressedEstimatedBiomassFmt):
+    compression = 'zstd'
+
+
+BIOMASS_CSV = 'est_biomass.csv'
+BIOMASS_CSV_GZ = 'est_biomass.csv.gz'
+BIOMASS_CSV_ZST = 'est_biomass.csv.zst'
+BIOMASS_FILES = [BIOMASS_CSV_GZ, BIOMASS_CSV_ZST, BIOMASS_CSV]
+
+
+class EstimatedBiomassDirFmt(model.DirectoryFormat):
+    # new artifacts are written with gzip, the plain CSV of earlier releases
+    # and a zstd compressed one are read as well
+    biomass = model.File(BIOMASS_CSV, format=EstimatedBiomassFmt,
+                         optional=True)
+    compressed_biomass = model.File(BIOMASS_CSV_GZ,
+                                    format=CompressedEstimatedBiomassFmt,
+                                    optional=True)
+    zstd_biomass = model.File(BIOMASS_CSV_ZST,
+                              format=ZstdEstimatedBiomassFmt, optional=True)
+
+    def _present(self):
+        return [n for n in BIOMASS_FILES if (self.path / n).exists()]
+
+    def biomass_path(self):
+        present = self._present()
+        if not present:
+            raise ValueError(f"{self.path} holds none of "
+                             f"{', '.join(BIOMASS_FILES)}.")
+        return self.path / present[0]
+
+    def _validate_(self, level):
+        if len(self._present()) != 1:
+            raise model.ValidationError(
+                f"Expected exactly one of {', '.join(BIOMASS_FILES)}.")
+
+
+STANDARD_CURVE_KEYS = ['slope', 'intercept', 'min_total_reads', 'n_controls']
+
+
+class StandardCurveFmt(model.TextFileFormat):
+    def sniff(self):
+        try:
+            with open(str(self)) as fh:
+                curve = json.load(fh)
+        except ValueError:
+            return False
+
+        return (isinstance(curve, dict)
+                and all(k in curve for k in STANDARD_CURVE_KEYS))
+
+    def validate(self, *args):
+        pass
+
+
+StandardCurveDirFmt = model.SingleFileDirectoryFormat(
+    'StandardCurveDirFmt', 'standard_curve.json', StandardCurveFmt)
+
+
+THRESHOLD_KEYS = ['threshold', 'min_freq', 'h', 'k_prime']
+
+
+class KatharoSeqThresholdFmt(model.TextFileFormat):
+    def sniff(self):
+        try:
+            with open(str(self)) as fh:
+                fit = json.load(fh)
+        except ValueError:
+            return False
+
+        return isinstance(fit, dict) and all(k in fit for k in THRESHOLD_KEYS)
 
-        return hdr == STATS_HEADER
+    def validate(self, *args):
+        pass
+
+
+KatharoSeqThresholdDirFmt = model.SingleFileDirectoryFormat(
+    'KatharoSeqThresholdDirFmt', 'threshold.json', KatharoSeqThresholdFmt)
+
+
+READ_TOTALS_HEADER = ['sample-id', 'total_reads']
+
+
+class ReadTotalsFmt(model.TextFileFormat):
+    def sniff(self):
+        with open(str(self)) as fh:
+            return fh.readline().rstrip('\n').split('\t') == \
+                READ_TOTALS_HEADER
 
     def validate(self, *args):
         pass
 
 
-EstimatedBiomassDirFmt = model.SingleFileDirectoryFormat(
-    'EstimatedBiomassDirFmt', 'est_biomass.csv', EstimatedBiomassFmt)
+ReadTotalsDirFmt = model.SingleFileDirectoryFormat(
+    'ReadTotalsDirFmt', 'read_totals.tsv', ReadTotalsFmt)
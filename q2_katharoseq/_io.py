@@ -0,0 +1,40 @@
+import io
+import zipfile
+
+import biom
+
+
+def load_table(path):
+    # a .qza is a zip archive; its BIOM member is read into memory and handed
+    # to h5py, which avoids extracting the archive to disk
+    if zipfile.is_zipfile(path):
+        import h5py
+
+        with zipfile.ZipFile(path) as archive:
+            members = [n for n in archive.namelist()
+                       if n.endswith('/data/feature-table.biom')]
+            if not members:
+                raise ValueError(f'{path} does not contain a feature table.')
+            data = io.BytesIO(archive.read(members[0]))
+        with h5py.File(data, 'r') as fh:
+            return biom.Table.from_hdf5(fh)
+
+    return biom.load_table(path)
+
+
+def load_taxonomy(path):
+    # the Taxon column of a FeatureData[Taxonomy] .qza or of its TSV, indexed
+    # by the feature IDs
+    import pandas as pd
+
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            members = [n for n in archive.namelist()
+                       if n.endswith('/data/taxonomy.tsv')]
+            if not members:
+                raise ValueError(f'{path} does not contain a taxonomy.')
+            path = io.BytesIO(archive.read(members[0]))
+    taxonomy = pd.read_csv(path, sep='\t', dtype=str, index_col=0)
+    if 'Taxon' not in taxonomy.columns:
+        raise ValueError('The taxonomy has no Taxon column.')
+    return taxonomy['Taxon']
@@ -1,101 +1,190 @@
 import pandas as pd
 import qiime2
+import biom
 import numpy as np
-from scipy.optimize import curve_fit
-import matplotlib.pyplot as plt
 import os
-import q2templates
 from importlib.resources import files
-import math
-import sys
-from sklearn.linear_model import LinearRegression
-
-control_type = {
-    'atcc': [
-        'd__Bacteria;p__Firmicutes;c__Clostridia;o__Clostridiales;'
-        'f__Clostridiaceae;g__Clostridium',
-        'd__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;'
-        'o__Enterobacterales;f__Enterobacteriaceae;g__',
-        'd__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;'
-        'o__Enterobacterales;f__Enterobacteriaceae;'
-        'g__Escherichia-Shigella',
-        'd__Bacteria;p__Firmicutes;c__Bacilli;o__Staphylococcales;'
-        'f__Staphylococcaceae;g__Staphylococcus'],
-    'zymobiomics': [
-        'd__Bacteria;p__Firmicutes;c__Bacilli;'
-        'o__Lactobacillales;f__Listeriaceae;g__Listeria',
-        'd__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;'
-        'o__Pseudomonadales;f__Pseudomonadaceae;g__Pseudomonas',
-        'd__Bacteria;p__Firmicutes;c__Bacilli;o__Bacillales;'
-        'f__Bacillaceae;g__Bacillus',
-        'd__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;'
-        'o__Enterobacterales;f__Enterobacteriaceae;__',
-        'd__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;'
-        'o__Enterobacterales;f__Enterobacteriaceae;'
-        'g__Escherichia-Shigella',
-        'd__Bacteria;p__Firmicutes;c__Bacilli;o__Lactobacillales;'
-        'f__Lactobacillaceae;g__Lactobacillus',
-        'd__Bacteria;p__Firmicutes;c__Bacilli;o__Lactobacillales;'
-        'f__Enterococcaceae;g__Enterococcus',
-        'd__Bacteria;p__Firmicutes;c__Bacilli;o__Staphylococcales'
-        ';f__Staphylococcaceae;g__Staphylococcus'],
-    'classic': [
-        'd__Bacteria;p__Firmicutes;c__Bacilli;o__Bacillales;'
-        'f__Bacillaceae;g__Bacillus',
-        'd__Bacteria;p__Proteobacteria;c__Alphaproteobacteria;'
-        'o__Rhodobacterales;f__Rhodobacteraceae;g__Paracoccus'],
-    'single': [
-        'd__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;'
-        'o__Burkholderiales;f__Comamonadaceae;g__Variovorax'],
-    'asv': ''
-}
-
-
-# Define the allosteric sigmoid equation
-def allosteric_sigmoid(x, h, k_prime):
-    y = x ** h / (k_prime + x ** h)
-    return y
-
-
-def get_threshold(r1, r2, thresh):
-    # assign variables and solve for X (number of reads to pass filter)
-    popt, pcov = curve_fit(allosteric_sigmoid, r1, r2, method='dogbox')
-    h = popt[0]  # first value printed above graph
-    k = popt[1]  # second value printed above graph
-    y = thresh   # desired thresh (50%, 70%, 90%)
-    min_log_reads = np.power((k/(1/y-1)), (1/h))
-    min_freq = np.power(10, min_log_reads).astype(int)
-    return min_freq
-
-
-def fit_lm(table,
-           min_total_reads,
-           positive_control_column,
-           positive_control_value,
-           control_cell_extraction):
-
-    total_reads = table.sum(axis=1)
-    filtered = pd.DataFrame(total_reads[total_reads > min_total_reads])
-    filtered = filtered.rename(columns={0: 'total_reads'})
-    filtered['log_total_reads'] = filtered.total_reads.apply(math.log10)
-
-    positive_control_column = positive_control_column.to_series().loc[
-        filtered.index]
-    positive_controls = positive_control_column[
-        positive_control_column == positive_control_value]
-    positive_controls = filtered.loc[positive_controls.index]
-
-    positive_controls['control_cell_extraction'] = \
-        control_cell_extraction.to_series().loc[positive_controls.index]
-    positive_controls['log_control_cell_extraction'] = \
-        positive_controls.control_cell_extraction.apply(math.log10)
-
-    lm = LinearRegression()
-    lm.fit(
-        positive_controls.log_total_reads.values.reshape(-1, 1),
-        positive_controls.log_control_cell_extraction)
-
-    return lm, filtered, positive_controls
+import csv
+import heapq
+from q2_types.feature_table import BIOMV210DirFmt
+
+from ._format import (EstimatedBiomassDirFmt, BIOMASS_CSV_GZ, open_text,
+                      open_gzip_writer)
+from ._plot import (plot_threshold, plot_standard_curve, plot_depth,
+                    plot_rank_fits)
+from . import _vega
+from ._timing import timed, stage
+from .core import (control_type, allosteric_sigmoid,  # noqa
+                   get_threshold, min_frequency, top_features,
+                   depth_summary)
+from ._fit import (filter_total_reads, fit_lm, estimate_biomass,
+                   validate_positive_controls, fit_positive_controls,
+                   threshold_fit, fit_table_threshold, fit_rank_thresholds,
+                   totals_frame, align_totals, LEVELS)
+
+
+def threshold_views(fit):
+    popt = (fit['h'], fit['k_prime'])
+
+    x = np.linspace(0, 5, 50)
+    sigmoid = _vega.sigmoid_spec(pd.DataFrame(fit['controls']),
+                                 x, allosteric_sigmoid(x, *popt))
+
+    # the minimum frequency only grows with the threshold, so the curve is
+    # cut where it overflows
+    percent = np.arange(1, 100)
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        curve = min_frequency(popt, percent / 100)
+    finite = np.isfinite(curve) & (curve >= 1)
+    threshold_curve = _vega.threshold_curve_spec(
+        percent[finite], curve[finite], fit['threshold'])
+
+    views = [_vega.view('sigmoid', 'Fit', *sigmoid),
+             _vega.view('threshold-curve', 'Minimum frequency by threshold',
+                        *threshold_curve)]
+    if 'depth' in fit:
+        views.append(_vega.view('depth', 'Read depth',
+                                *_vega.depth_spec(fit['depth'],
+                                                  fit['thresholds'])))
+    return views
+
+
+def top_taxa_table(top_taxa):
+    # one column per dilution level, holding the percentage of its reads of
+    # each of its top features
+    columns = {}
+    for level, total, features, reads in zip(top_taxa['levels'],
+                                             top_taxa['totals'],
+                                             top_taxa['features'],
+                                             top_taxa['reads']):
+        percent = np.asarray(reads) / max(total, 1) * 100
+        columns['%g cells' % level] = pd.Series(percent, index=features)
+
+    table = pd.DataFrame(columns)
+    table = table.loc[table.max(axis=1).sort_values(ascending=False).index]
+    table.index.name = 'Feature'
+    return table.round(2).astype(object).where(table.notna(), '')
+
+
+def depth_table(depth, min_freqs):
+    retained = pd.DataFrame({
+        'Threshold (%)': list(min_freqs),
+        'Minimum frequency': list(min_freqs.values()),
+        'Samples retained': [depth['retained'][t] for t in min_freqs]})
+    retained['Fraction retained'] = \
+        retained['Samples retained'] / max(depth['n_samples'], 1)
+    return retained.set_index('Threshold (%)')
+
+
+def kits_table(kits):
+    table = pd.DataFrame(kits).set_index('kit')
+    table['selected'] = table['selected'].map({True: 'yes', False: ''})
+    table = table[['selected', 'n_present', 'n_taxa', 'top_share', 'r2',
+                   'rmse', 'h', 'k_prime', 'error']]
+    table.columns = ['Selected', 'Taxa in table', 'Taxa in kit',
+                     'Share of reads at the most cells', 'R²', 'RMSE', 'h',
+                     "k'", 'Not fitted']
+    table.index.name = 'Kit'
+    table = table.round(4)
+    return table.astype(object).where(table.notna(), '')
+
+
+def ranks_table(ranks):
+    rows = {}
+    for rank in ranks:
+        row = {'Level': rank['level'], 'h': rank['h'], "k'": rank['k_prime'],
+               'R²': rank['r2']}
+        for t, min_freq in (rank['thresholds'] or {}).items():
+            row[f'Minimum frequency at {t}%'] = min_freq
+        row['Not fitted'] = rank['error']
+        rows[rank['rank']] = row
+    table = pd.DataFrame.from_dict(rows, orient='index')
+    table.index.name = 'Rank'
+    table = table.round(4)
+    return table.astype(object).where(table.notna(), '')
+
+
+def render_threshold(output_dir, fit, timer):
+    import q2templates
+
+    controls = fit['controls']
+
+    # plot
+    with stage('plot'):
+        plot_threshold(os.path.join(output_dir, 'fit.svg'),
+                       controls['log_asv_reads'],
+                       controls['correct_assign'],
+                       (fit['h'], fit['k_prime']))
+        # fits stored before the read depth was summarized have no depth
+        if 'depth' in fit:
+            plot_depth(os.path.join(output_dir, 'depth.svg'), fit['depth'],
+                       fit['thresholds'])
+        if 'ranks' in fit:
+            plot_rank_fits(os.path.join(output_dir, 'ranks.svg'),
+                           controls['log_asv_reads'], fit['ranks'])
+
+    # visualizer
+    with stage('views'):
+        context = {'minimum_frequency': fit['min_freq'],
+                   'threshold': fit['threshold'],
+                   'table': q2templates.df_to_html(
+                       top_taxa_table(fit['top_taxa'])),
+                   'views': threshold_views(fit)}
+        if 'depth' in fit:
+            context['depth_table'] = q2templates.df_to_html(
+                depth_table(fit['depth'], fit['thresholds']))
+            context['n_samples'] = fit['depth']['n_samples']
+        if 'kits' in fit:
+            context['control'] = fit['control']
+            context['kits_table'] = q2templates.df_to_html(
+                kits_table(fit['kits']))
+        if 'ranks' in fit:
+            context['ranks_table'] = q2templates.df_to_html(
+                ranks_table(fit['ranks']))
+        _vega.write_assets(output_dir)
+
+    # the page lists the stages up to here; timings.tsv also has its
+    # rendering
+    context['timings'] = timer.to_html()
+    with stage('render'):
+        TEMPLATES = files('q2_katharoseq') / 'read_count_threshold_assets'
+        index = TEMPLATES / 'index.html'
+        q2templates.render(str(index), output_dir, context=context)
+    timer.write(output_dir)
+
+
+def fit_threshold(
+        threshold: int,
+        positive_control_value: str,
+        positive_control_column: qiime2.CategoricalMetadataColumn,
+        cell_count_column: qiime2.NumericMetadataColumn,
+        table: pd.DataFrame,
+        control: str,
+        asv: str = None,
+        taxonomy: pd.DataFrame = None,
+        totals: pd.Series = None) -> dict:
+    from scipy import sparse
+
+    with timed('fit_threshold'):
+        with stage('validate'):
+            inds, cell_counts = validate_positive_controls(
+                table.index, table.columns, threshold,
+                positive_control_value, positive_control_column,
+                cell_count_column, control, asv)
+
+        with stage('controls'):
+            matrix = sparse.csr_matrix(table.loc[inds].to_numpy())
+        katharo, popt, pcov, top_taxa, kits = fit_positive_controls(
+            matrix, inds, table.columns, cell_counts, control, asv,
+            taxonomy)
+
+        with stage('sum'):
+            if totals is None:
+                totals = table.sum(axis=1).to_numpy()
+            else:
+                totals = align_totals(totals, table.index)
+        return threshold_fit(katharo, popt, pcov, cell_counts, top_taxa,
+                             threshold, totals, kits)
 
 
 def read_count_threshold(
@@ -106,228 +195,355 @@ def read_count_threshold(
         cell_count_column: qiime2.NumericMetadataColumn,
         table: pd.DataFrame,
         control: str,
-        asv: str = None) -> None:
-    if control == 'asv':
-        if asv is None:
-            raise ValueError("Control type set to asv but no asv provided")
-        if asv not in table.columns:
-            raise ValueError("asv not found in the feature table")
-
-    # conversions
-    positive_control_column = positive_control_column.to_series()
-    cell_count_column = cell_count_column.to_series()
-
-    # filter columns
-    positive_controls = positive_control_column[
-        positive_control_column == positive_control_value]
-
-    if not positive_controls.shape[0]:
-        unique_values = positive_control_column.unique()[:10]
+        asv: str = None,
+        taxonomy: pd.DataFrame = None) -> None:
+    with timed('read_count_threshold') as timer:
+        fit = fit_threshold(threshold, positive_control_value,
+                            positive_control_column, cell_count_column, table,
+                            control, asv, taxonomy)
+        render_threshold(output_dir, fit, timer)
+
+
+def rank_thresholds(
+        output_dir: str,
+        table: biom.Table,
+        taxonomy: pd.DataFrame,
+        threshold: int,
+        positive_control_value: str,
+        positive_control_column: qiime2.CategoricalMetadataColumn,
+        cell_count_column: qiime2.NumericMetadataColumn,
+        control: str,
+        levels: list = None) -> None:
+    with timed('rank_thresholds') as timer:
+        fit, _ = fit_rank_thresholds(
+            table, threshold, positive_control_value,
+            positive_control_column, cell_count_column, control, taxonomy,
+            LEVELS if levels is None else levels)
+        render_threshold(output_dir, fit, timer)
+
+
+def threshold_plot(output_dir: str, threshold: dict) -> None:
+    with timed('threshold_plot') as timer:
+        render_threshold(output_dir, threshold, timer)
+
+
+def select_group(
+        table: biom.Table,
+        group_column: qiime2.CategoricalMetadataColumn,
+        group: str) -> biom.Table:
+    groups = group_column.to_series()
+    ids = set(groups.index[groups == group])
+    keep = [i for i in table.ids(axis='sample') if i in ids]
+    if not keep:
+        raise ValueError(f"No samples of group '{group}' found in the "
+                         f"feature table.")
+
+    selected = table.filter(keep, axis='sample', inplace=False)
+    selected.remove_empty(axis='observation', inplace=True)
+    return selected
+
+
+def read_totals(table: biom.Table) -> pd.Series:
+    return totals_frame(table)[0].rename('total_reads')
+
+
+def group_thresholds(
+        ctx,
+        table,
+        threshold,
+        positive_control_value,
+        positive_control_column,
+        cell_count_column,
+        group_column,
+        control,
+        asv=None):
+    # every call below is a separate action, so under --parallel each group
+    # is selected, summed, fitted and plotted as its own task
+    select = ctx.get_action('katharoseq', 'select_group')
+    sum_reads = ctx.get_action('katharoseq', 'read_totals')
+    fit = ctx.get_action('katharoseq', 'fit_threshold')
+    plot = ctx.get_action('katharoseq', 'threshold_plot')
+
+    groups = group_column.to_series()
+    groups = groups.loc[groups.index.intersection(
+        table.view(biom.Table).ids(axis='sample'))].dropna()
+
+    # a group without positive controls cannot be fitted, so the pipeline
+    # stops before any of the groups is dispatched
+    controls = positive_control_column.to_series() == positive_control_value
+    controls = controls.reindex(groups.index, fill_value=False)
+    missing = sorted(set(groups) - set(groups[controls]))
+    if missing:
         raise ValueError(
-            f"No positive controls found in positive control column. "
-            f"Searched for '{positive_control_value}' but found these values: "
-            f"{list(unique_values)}"
-        )
-    positive_controls = pd.Series(positive_controls)
-
-    # check shapes - validate overlap between metadata and feature table
-    n_controls_metadata = len(positive_controls)
-    inds = positive_controls.index.intersection(table.index)
-    n_controls_in_table = len(inds)
-
-    if n_controls_in_table == 0:
-        missing_samples = list(positive_controls.index[:5])
-        table_samples = list(table.index[:5])
-        raise KeyError(
-            f"No positive controls found in feature table. "
-            f"Found {n_controls_metadata} controls in metadata but none match "
-            f"the feature table sample IDs.\n"
-            f"Example control IDs from metadata: {missing_samples}\n"
-            f"Example sample IDs from table: {table_samples}\n"
-            f"Check that sample IDs match between your metadata and "
-            f"feature table."
-        )
+            f"No positive controls in group(s) "
+            f"{', '.join(repr(g) for g in missing)}. Every group needs its "
+            f"own positive controls; remove the samples of these groups "
+            f"from the table first.")
+
+    def restrict(column, ids):
+        return column.filter_ids(column.to_series().index.intersection(ids))
+
+    thresholds = {}
+    visualizations = {}
+    for group in sorted(groups.unique()):
+        # the controls of the other groups are not missing from this one
+        ids = groups.index[groups == group]
+        selected, = select(table=table, group_column=group_column,
+                           group=group)
+        totals, = sum_reads(table=selected)
+        thresholds[group], = fit(
+            table=selected, threshold=threshold,
+            positive_control_value=positive_control_value,
+            positive_control_column=restrict(positive_control_column, ids),
+            cell_count_column=restrict(cell_count_column, ids),
+            control=control, asv=asv, totals=totals)
+        visualizations[group], = plot(threshold=thresholds[group])
+
+    return thresholds, visualizations
 
-    if n_controls_in_table < n_controls_metadata:
-        missing = positive_controls.index.difference(table.index)
-        missing_cell_counts = cell_count_column.loc[missing]
-        print(
-            f"Warning: Only {n_controls_in_table} of {n_controls_metadata} "
-            f"positive controls found in feature table. Missing "
-            f"{len(missing)} samples with cell counts: "
-            f"{sorted(missing_cell_counts.unique().tolist())}. "
-            f"Proceeding with available controls.",
-            file=sys.stderr
-        )
 
-    table_positive = table.loc[inds]
+def estimating_biomass(
+        table: pd.DataFrame,
+        control_cell_extraction: qiime2.NumericMetadataColumn,
+        min_total_reads: int,
+        positive_control_value: str,
+        positive_control_column: qiime2.CategoricalMetadataColumn,
+        pcr_template_vol: int,
+        dna_extract_vol: int,
+        extraction_mass_g: qiime2.NumericMetadataColumn) -> pd.DataFrame:
 
-    # get cell counts only for samples that are in the table
-    cell_counts = cell_count_column.loc[inds]
+    with timed('estimating_biomass'):
+        slope, intercept, filtered, positive_controls = fit_lm(
+            table, min_total_reads, positive_control_column,
+            positive_control_value, control_cell_extraction)
 
-    # validate we have enough points for curve fitting
-    unique_cell_counts = cell_counts.unique()
-    if len(unique_cell_counts) < 3:
-        raise ValueError(
-            f"Insufficient dilution series: only {len(unique_cell_counts)} "
-            f"unique cell count values found ({sorted(unique_cell_counts)}). "
-            f"At least 3 different concentrations are required for "
-            f"curve fitting."
-        )
+        return estimate_biomass(filtered, slope, intercept,
+                                pcr_template_vol, dna_extract_vol,
+                                extraction_mass_g)
 
-    if threshold > 100 or threshold < 0:
-        raise ValueError('Threshold must be between 0 and 100.')
-    df = table_positive
 
-    # visual check
-    max_cell_counts = cell_counts.idxmax()
+def filter_table(
+        table: biom.Table,
+        threshold: int,
+        positive_control_value: str,
+        positive_control_column: qiime2.CategoricalMetadataColumn,
+        cell_count_column: qiime2.NumericMetadataColumn,
+        control: str,
+        asv: str = None,
+        taxonomy: pd.DataFrame = None) -> (biom.Table, dict):
+    with timed('filter_table'):
+        result, totals = fit_table_threshold(
+            table, threshold, positive_control_value,
+            positive_control_column, cell_count_column, control, asv,
+            taxonomy)
 
-    max_input = df.loc[max_cell_counts]
-    max_inputT = max_input.T
-    max_inputT = max_inputT.sort_values(ascending=False).head(10)
+        with stage('filter'):
+            keep = table.ids(axis='sample')[totals >= result['min_freq']]
+            filtered = table.filter(keep, axis='sample', inplace=False)
+            filtered.remove_empty(axis='observation', inplace=True)
 
-    # calculate the total number of reads per sample
-    df['asv_reads'] = df.sum(axis=1)
+    result['n_samples'] = int(len(totals))
+    result['n_retained'] = int(len(keep))
 
-    # validate no zero-read samples
-    zero_read_samples = df[df['asv_reads'] == 0].index.tolist()
-    if zero_read_samples:
-        raise ValueError(
-            f"Found {len(zero_read_samples)} positive control sample(s) "
-            f"with zero total reads: {zero_read_samples[:5]}. Cannot "
-            f"compute correct assignment ratio. These samples may have "
-            f"been filtered out upstream."
-        )
+    return filtered, result
+
+
+def _load_member(fmt):
+    return biom.load_table(str(fmt.path / 'feature-table.biom'))
 
-    # number reads aligning to mock community input
-    if control == 'asv':
-        df['control_reads'] = df[asv]
-    else:
-        # validate control taxa exist in the table
-        control_taxa = control_type[control]
-        missing_taxa = [t for t in control_taxa if t not in df.columns]
-        if len(missing_taxa) == len(control_taxa):
-            raise ValueError(
-                f"None of the {control} control taxa were found in the "
-                f"feature table. Expected taxa like: "
-                f"{control_taxa[0][:50]}..."
-            )
-        # use only taxa that exist
-        present_taxa = [t for t in control_taxa if t in df.columns]
-        df['control_reads'] = df[present_taxa].sum(axis=1)
-
-    # validate control has reads in at least some positive controls
-    total_control_reads = df['control_reads'].sum()
-    if total_control_reads == 0:
-        if control == 'asv':
-            raise ValueError(
-                f"The specified ASV has zero reads in all {len(df)} "
-                f"positive control samples. Cannot build KatharoSeq "
-                f"curve. Verify the ASV sequence is correct and present "
-                f"in your positive control dilution series."
-            )
-        else:
-            raise ValueError(
-                f"The {control} control taxa have zero total reads across "
-                f"all {len(df)} positive control samples. Cannot build "
-                f"KatharoSeq curve. Verify the control type matches your "
-                f"experimental setup."
-            )
-
-    # percent correctly assigned
-    df['correct_assign'] = df['control_reads'] / df['asv_reads']
-
-    # validate there's variation in correct_assign for curve fitting
-    unique_correct_assign = df['correct_assign'].nunique()
-    if unique_correct_assign < 2:
-        raise ValueError(
-            f"All positive control samples have identical correct "
-            f"assignment ratio ({df['correct_assign'].iloc[0]:.4f}). "
-            f"Cannot fit curve without variation in the data. Check "
-            f"that your dilution series spans a range of concentrations."
-        )
 
-    # define katharo
-    katharo = df[['correct_assign', 'control_reads', 'asv_reads']].copy()
-    katharo['log_asv_reads'] = np.log10(katharo['asv_reads'].values)
+def _threshold_member(fmt, *args):
+    return fit_table_threshold(_load_member(fmt), *args)[0]
 
-    # fit curve to data
+
+def _biomass_member(fmt, *args):
+    return estimating_biomass(totals_frame(_load_member(fmt)), *args)
+
+
+def _member_result(name, call, *args):
     try:
-        popt, pcov = curve_fit(allosteric_sigmoid,
-                               katharo['log_asv_reads'],
-                               katharo['correct_assign'],
-                               method='dogbox')
-    except RuntimeError as e:
-        raise RuntimeError(
-            f"Curve fitting failed to converge. This typically indicates "
-            f"the data does not follow the expected sigmoid pattern. "
-            f"Details: {e}\n"
-            f"Data summary - log_asv_reads range: "
-            f"[{katharo['log_asv_reads'].min():.2f}, "
-            f"{katharo['log_asv_reads'].max():.2f}], correct_assign range: "
-            f"[{katharo['correct_assign'].min():.4f}, "
-            f"{katharo['correct_assign'].max():.4f}]"
-        ) from e
+        return call(*args)
+    except Exception as e:
+        raise ValueError(f"Failed to process '{name}': {e}") from e
 
-    # plot
-    x = np.linspace(0, 5, 50)
-    y = allosteric_sigmoid(x, *popt)
-    plt.plot(katharo['log_asv_reads'],
-             katharo['correct_assign'],
-             'o', label='data')
-    plt.plot(x, y, label='fit')
-    plt.ylim(0, 1.05)
-    plt.legend(loc='best')
-    plt.savefig(os.path.join(output_dir, 'fit.svg'))
-    plt.close()
-
-    # find threshold
-    min_freq = get_threshold(katharo['log_asv_reads'],
-                             katharo['correct_assign'],
-                             threshold/100)
 
-    # visualizer
-    max_input_html = q2templates.df_to_html(max_inputT.to_frame())
-    context = {'minimum_frequency': min_freq,
-               'threshold': threshold,
-               'table': max_input_html}
-    TEMPLATES = files('q2_katharoseq') / 'read_count_threshold_assets'
-    index = TEMPLATES / 'index.html'
-    q2templates.render(str(index), output_dir, context=context)
+def map_members(func, members, n_jobs, *args):
+    # each worker receives the member's directory format rather than the
+    # table, so the tables are read in the workers and never pickled
+    if n_jobs == 0:
+        n_jobs = os.cpu_count()
+    n_jobs = min(n_jobs, len(members))
 
+    if n_jobs <= 1:
+        return {name: _member_result(name, func, member, *args)
+                for name, member in members.items()}
 
-def estimating_biomass(
-        table: pd.DataFrame,
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = {name: pool.submit(func, member, *args)
+                   for name, member in members.items()}
+        return {name: _member_result(name, future.result)
+                for name, future in futures.items()}
+
+
+def fit_threshold_collection(
+        tables: BIOMV210DirFmt,
+        threshold: int,
+        positive_control_value: str,
+        positive_control_column: qiime2.CategoricalMetadataColumn,
+        cell_count_column: qiime2.NumericMetadataColumn,
+        control: str,
+        asv: str = None,
+        n_jobs: int = 1) -> dict:
+    return map_members(_threshold_member, tables, n_jobs, threshold,
+                       positive_control_value, positive_control_column,
+                       cell_count_column, control, asv)
+
+
+def estimating_biomass_collection(
+        tables: BIOMV210DirFmt,
         control_cell_extraction: qiime2.NumericMetadataColumn,
         min_total_reads: int,
         positive_control_value: str,
         positive_control_column: qiime2.CategoricalMetadataColumn,
         pcr_template_vol: int,
         dna_extract_vol: int,
-        extraction_mass_g: qiime2.NumericMetadataColumn) -> pd.DataFrame:
+        extraction_mass_g: qiime2.NumericMetadataColumn,
+        n_jobs: int = 1) -> pd.DataFrame:
+    return map_members(_biomass_member, tables, n_jobs,
+                       control_cell_extraction, min_total_reads,
+                       positive_control_value, positive_control_column,
+                       pcr_template_vol, dna_extract_vol, extraction_mass_g)
 
-    lm, filtered, positive_controls = fit_lm(table,
-                                             min_total_reads,
-                                             positive_control_column,
-                                             positive_control_value,
-                                             control_cell_extraction)
 
-    filtered['estimated_biomass_per_pcrrxn'] = \
-        10**((filtered.log_total_reads*lm.coef_[0])+lm.intercept_)
-    filtered['estimated_biomass_per_dnarxn'] = \
-        filtered.estimated_biomass_per_pcrrxn*(
-            dna_extract_vol/pcr_template_vol)
+def fit_standard_curve(
+        table: pd.DataFrame,
+        control_cell_extraction: qiime2.NumericMetadataColumn,
+        min_total_reads: int,
+        positive_control_value: str,
+        positive_control_column: qiime2.CategoricalMetadataColumn) -> dict:
 
-    filtered['extraction_mass_g'] = extraction_mass_g.to_series().loc[
-        filtered.index]
-    filtered['estimated_cells_per_g'] = \
-        filtered['estimated_biomass_per_dnarxn']/filtered['extraction_mass_g']
-    filtered['log_estimated_cells_per_g'] = \
-        filtered.estimated_cells_per_g.apply(math.log10)
+    slope, intercept, filtered, positive_controls = fit_lm(
+        table, min_total_reads, positive_control_column,
+        positive_control_value, control_cell_extraction)
 
-    filtered.index.rename('sample_name', inplace=True)
+    return {'slope': slope,
+            'intercept': intercept,
+            'min_total_reads': min_total_reads,
+            'n_controls': len(positive_controls)}
 
-    return filtered
+
+def _row_id(line):
+    # sample IDs are only quoted by pandas when they contain a delimiter
+    if line.startswith('"'):
+        return next(csv.reader([line]))[0]
+    return line.split(',', 1)[0]
+
+
+def append_biomass(
+        estimated_biomass: EstimatedBiomassDirFmt,
+        standard_curve: dict,
+        table: pd.DataFrame,
+        pcr_template_vol: int,
+        dna_extract_vol: int,
+        extraction_mass_g: qiime2.NumericMetadataColumn,
+        min_total_reads: int = None
+        ) -> EstimatedBiomassDirFmt:
+    # the new samples are filtered like the ones the curve was fit with
+    if min_total_reads is None:
+        min_total_reads = standard_curve['min_total_reads']
+    elif min_total_reads != standard_curve['min_total_reads']:
+        raise ValueError(
+            f"min_total_reads is {min_total_reads}, but the standard curve "
+            f"was fit with {standard_curve['min_total_reads']}. Leave it "
+            f"unset to use the value of the standard curve.")
+
+    filtered = filter_total_reads(table, min_total_reads)
+    new = estimate_biomass(filtered,
+                           standard_curve['slope'],
+                           standard_curve['intercept'],
+                           pcr_template_vol,
+                           dna_extract_vol,
+                           extraction_mass_g)
+    new_lines = new.to_csv(lineterminator='\n').splitlines(keepends=True)
+    new_header, new_rows = new_lines[0], new_lines[1:]
+
+    # the existing rows are carried over as text, only their IDs are parsed
+    with open_text(estimated_biomass.biomass_path()) as fh:
+        header = fh.readline()
+        rows = [line if line.endswith('\n') else line + '\n'
+                for line in fh if line.strip()]
+
+    if header.rstrip('\n').split(',')[1:] != \
+            new_header.rstrip('\n').split(',')[1:]:
+        raise ValueError(
+            f"The columns of the existing estimated biomass do not match "
+            f"the columns of the new estimates. Existing: {header.strip()}"
+        )
+
+    existing_ids = set(map(_row_id, rows))
+    duplicated = [i for i in new.index if i in existing_ids]
+    if duplicated:
+        raise ValueError(
+            f"{len(duplicated)} sample(s) already have biomass estimates: "
+            f"{duplicated[:5]}. Only new samples can be appended."
+        )
+
+    rows.sort(key=_row_id)
+    new_rows.sort(key=_row_id)
+
+    result = EstimatedBiomassDirFmt()
+    with open_gzip_writer(result.path / BIOMASS_CSV_GZ) as fh:
+        fh.write(header)
+        fh.writelines(heapq.merge(rows, new_rows, key=_row_id))
+
+    return result
+
+
+def biomass_views(slope, intercept, positive_controls, samples):
+    x = samples['log_total_reads']
+    fit_x = np.array([x.min(), x.max()])
+    standard_curve = _vega.standard_curve_spec(
+        positive_controls.rename_axis('sample_id').reset_index(),
+        fit_x, intercept + slope * fit_x)
+
+    if 'log_estimated_cells_per_g' in samples:
+        y, y_title = 'log_estimated_cells_per_g', 'Log estimated cells per g'
+    else:
+        y, y_title = ('log_estimated_biomass_per_pcrrxn',
+                      'Log estimated cells per PCR reaction')
+        samples = samples.assign(**{y: intercept + slope * x})
+    shown, n = _vega.downsample(samples[['total_reads', 'log_total_reads',
+                                         y]])
+    note = None
+    if len(shown) < n:
+        note = ('Showing a random subset of %d of the %d samples.'
+                % (len(shown), n))
+    estimates = _vega.estimates_spec(
+        shown.rename_axis('sample_id').reset_index(), y, y_title)
+
+    return [_vega.view('standard-curve', 'Standard curve', *standard_curve),
+            _vega.view('estimates', 'Samples', *estimates, note=note)]
+
+
+# columns of the per-sample estimates table, in display order
+ESTIMATES_COLUMNS = [
+    ('sample_id', 'Sample'),
+    ('total_reads', 'Reads'),
+    ('estimated_biomass_per_pcrrxn', 'Estimated cells per PCR reaction'),
+    ('estimated_biomass_per_dnarxn', 'Estimated cells per DNA extraction'),
+    ('extraction_mass_g', 'Extraction mass (g)'),
+    ('estimated_cells_per_g', 'Estimated cells per g')]
+
+
+def estimates_table(slope, intercept, samples):
+    if 'estimated_biomass_per_pcrrxn' not in samples:
+        samples = samples.assign(estimated_biomass_per_pcrrxn=10**(
+            samples['log_total_reads'] * slope + intercept))
+    samples = samples.rename_axis('sample_id').reset_index()
+    columns = [(c, t) for c, t in ESTIMATES_COLUMNS if c in samples]
+    return samples[[c for c, _ in columns]], columns
 
 
 def biomass_plot(
@@ -336,32 +552,58 @@ def biomass_plot(
         control_cell_extraction: qiime2.NumericMetadataColumn,
         min_total_reads: int,
         positive_control_value: str,
-        positive_control_column: qiime2.CategoricalMetadataColumn) -> None:
-
-    lm, filtered, positive_controls = fit_lm(table,
-                                             min_total_reads,
-                                             positive_control_column,
-                                             positive_control_value,
-                                             control_cell_extraction)
-
-    # make plot
-    y = positive_controls['log_control_cell_extraction']
-    x = positive_controls['log_total_reads']
-    intercept = lm.intercept_
-    slope = lm.coef_[0]
-
-    plt.clf()
-    plt.scatter(x, y, color='black')
-    axes = plt.gca()
-    x_vals = np.array(axes.get_xlim())
-    y_vals = intercept + slope * x_vals
-    plt.plot(x_vals, y_vals, '--')
-    plt.xlabel('Log reads')
-    plt.ylabel('Log cells')
-    plt.savefig(os.path.join(output_dir, 'fit.svg'))
-    plt.close()
-
-    # visualizer
-    TEMPLATES = files('q2_katharoseq') / 'estimating_biomass_assets'
-    index = TEMPLATES / 'index.html'
-    q2templates.render(str(index), output_dir)
+        positive_control_column: qiime2.CategoricalMetadataColumn,
+        plot_samples: bool = False,
+        extraction_mass_g: qiime2.NumericMetadataColumn = None,
+        pcr_template_vol: int = None,
+        dna_extract_vol: int = None) -> None:
+    import q2templates
+
+    if extraction_mass_g is not None and (pcr_template_vol is None
+                                          or dna_extract_vol is None):
+        raise ValueError('pcr_template_vol and dna_extract_vol are required '
+                         'to estimate the cells per gram of the samples.')
+
+    with timed('biomass_plot') as timer:
+        slope, intercept, filtered, positive_controls = fit_lm(
+            table, min_total_reads, positive_control_column,
+            positive_control_value, control_cell_extraction)
+
+        samples = None
+        if plot_samples:
+            samples = filtered
+            if extraction_mass_g is not None:
+                samples = estimate_biomass(filtered.copy(), slope,
+                                           intercept, pcr_template_vol,
+                                           dna_extract_vol, extraction_mass_g)
+
+        # make plot
+        with stage('plot'):
+            plot_standard_curve(
+                os.path.join(output_dir, 'fit.svg'),
+                positive_controls['log_total_reads'],
+                positive_controls['log_control_cell_extraction'],
+                slope,
+                intercept,
+                samples)
+
+        # visualizer
+        if samples is None:
+            samples = filtered
+        with stage('table'):
+            estimates, columns = estimates_table(slope, intercept, samples)
+            _vega.write_table(output_dir, 'estimates.json.gz', estimates)
+        with stage('views'):
+            context = {'views': biomass_views(slope, intercept,
+                                              positive_controls, samples),
+                       'estimates': {'file': 'estimates.json.gz',
+                                     'n_samples': len(estimates),
+                                     'columns': columns}}
+            _vega.write_assets(output_dir)
+
+        context['timings'] = timer.to_html()
+        with stage('render'):
+            TEMPLATES = files('q2_katharoseq') / 'estimating_biomass_assets'
+            index = TEMPLATES / 'index.html'
+            q2templates.render(str(index), output_dir, context=context)
+        timer.write(output_dir)
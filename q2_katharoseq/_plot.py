@@ -0,0 +1,109 @@
+import numpy as np
+
+
+# resolution of the sample density layer of the standard curve plot
+DENSITY_GRIDSIZE = 50
+DENSITY_DPI = 100
+
+
+def _figure():
+    # figures are built on their own Agg canvas rather than through the
+    # pyplot state machine, so visualizers can render concurrently
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def plot_threshold(fp, log_asv_reads, correct_assign, popt):
+    from .core import allosteric_sigmoid
+
+    fig = _figure()
+    ax = fig.add_subplot()
+
+    x = np.linspace(0, 5, 50)
+    y = allosteric_sigmoid(x, *popt)
+    ax.plot(log_asv_reads, correct_assign, 'o', label='data', gid='data')
+    ax.plot(x, y, label='fit', gid='fit')
+    ax.set_ylim(0, 1.05)
+    ax.legend(loc='best')
+    fig.savefig(fp)
+
+
+def plot_rank_fits(fp, log_asv_reads, ranks):
+    # the controls and the fit of every taxonomic rank on one axis
+    from .core import allosteric_sigmoid
+
+    fig = _figure()
+    ax = fig.add_subplot()
+
+    x = np.linspace(0, 5, 50)
+    for rank in ranks:
+        line, = ax.plot(log_asv_reads, rank['correct_assign'], 'o',
+                        alpha=0.6, gid='data-' + rank['rank'])
+        if rank['h'] is not None:
+            ax.plot(x, allosteric_sigmoid(x, rank['h'], rank['k_prime']),
+                    color=line.get_color(), label=rank['rank'],
+                    gid='fit-' + rank['rank'])
+    ax.set_ylim(0, 1.05)
+    ax.set_xlabel('Log reads')
+    ax.set_ylabel('Correct assignment')
+    ax.legend(loc='best')
+    fig.savefig(fp)
+
+
+def _density(ax, x, y):
+    # samples are aggregated into a fixed hexagonal grid and rasterized, so
+    # the size of the figure does not depend on the number of samples
+    finite = np.isfinite(x) & np.isfinite(y)
+    ax.hexbin(x[finite], y[finite], gridsize=DENSITY_GRIDSIZE, bins='log',
+              mincnt=1, cmap='Blues', rasterized=True)
+
+
+def plot_standard_curve(fp, log_reads, log_cells, slope, intercept,
+                        samples=None):
+    fig = _figure()
+    per_g = samples is not None and 'log_estimated_cells_per_g' in samples
+    if per_g:
+        width, height = fig.get_size_inches()
+        fig.set_size_inches(2 * width, height)
+        ax, ax_per_g = fig.subplots(1, 2)
+    else:
+        ax = fig.add_subplot()
+
+    if samples is not None:
+        sample_reads = samples['log_total_reads'].to_numpy()
+        _density(ax, sample_reads, intercept + slope * sample_reads)
+
+    ax.scatter(log_reads, log_cells, color='black', gid='controls')
+    x_vals = np.array(ax.get_xlim())
+    y_vals = intercept + slope * x_vals
+    ax.plot(x_vals, y_vals, '--', gid='fit')
+    ax.set_xlabel('Log reads')
+    ax.set_ylabel('Log cells')
+
+    if per_g:
+        _density(ax_per_g, sample_reads,
+                 samples['log_estimated_cells_per_g'].to_numpy())
+        ax_per_g.set_xlabel('Log reads')
+        ax_per_g.set_ylabel('Log estimated cells per g')
+
+    fig.savefig(fp, dpi=DENSITY_DPI)
+
+
+def plot_depth(fp, depth, min_freqs):
+    fig = _figure()
+    ax = fig.add_subplot()
+
+    counts = np.asarray(depth['counts'])
+    edges = np.arange(len(counts) + 1) * depth['bin_width']
+    ax.stairs(counts, edges, fill=True, color='lightgray', gid='depth')
+    for i, (t, min_freq) in enumerate(min_freqs.items()):
+        ax.axvline(np.log10(max(min_freq, 1)), color='C%d' % i,
+                   linestyle='--', label='%s%% (%d reads)' % (t, min_freq))
+    ax.set_xlabel('Log reads')
+    ax.set_ylabel('Samples')
+    ax.legend(loc='best')
+    fig.savefig(fp)
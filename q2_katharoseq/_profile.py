@@ -0,0 +1,122 @@
+# Opt-in profiling of the actions. With KATHAROSEQ_PROFILE set to a
+# directory, every action runs under cProfile and writes
+# <action>-<time>-<pid>-<n>.prof and a summary of its hottest functions
+# there, also when the action fails. KATHAROSEQ_PROFILE_TOP sets the number of
+# functions in the summary (default 30) and KATHAROSEQ_PROFILE_LINES=1 adds
+# a sampling of the executing lines. The variables are read when the plugin
+# is imported; without them the actions are registered unwrapped.
+import functools
+import inspect
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+PROFILE = 'KATHAROSEQ_PROFILE'
+PROFILE_TOP = 'KATHAROSEQ_PROFILE_TOP'
+PROFILE_LINES = 'KATHAROSEQ_PROFILE_LINES'
+
+# seconds between two samples of the executing line
+SAMPLE_INTERVAL = 0.001
+
+_active = threading.local()
+_runs = itertools.count()
+
+
+class LineSampler:
+    # samples the line a thread is executing from a background thread, which
+    # is far cheaper than tracing every line
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.lines = Counter()
+        self.n_samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            code = frame.f_code
+            self.lines[(code.co_filename, frame.f_lineno, code.co_name)] += 1
+            self.n_samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self, top):
+        lines = [f'{self.n_samples} samples, one every '
+                 f'{self.interval * 1000:g} ms\n',
+                 f'{"samples":>8} {"share":>7}  location']
+        for (filename, lineno, name), n in self.lines.most_common(top):
+            share = n / max(self.n_samples, 1)
+            lines.append(f'{n:>8} {share:>7.1%}  {filename}:{lineno} ({name})')
+        return '\n'.join(lines) + '\n'
+
+
+def _write(directory, name, profiler, sampler, top):
+    import io
+    import pstats
+
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(
+        directory, f'{name}-{time.strftime("%Y%m%d-%H%M%S")}-'
+                   f'{os.getpid()}-{next(_runs)}')
+    profiler.dump_stats(stem + '.prof')
+
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats('cumulative').print_stats(top)
+    stats.sort_stats('tottime').print_stats(top)
+    if sampler is not None:
+        summary.write('Line samples\n\n')
+        summary.write(sampler.summary(top))
+    with open(stem + '.txt', 'w') as fh:
+        fh.write(summary.getvalue())
+    return stem
+
+
+def profiled(func, environ=os.environ):
+    directory = environ.get(PROFILE)
+    if not directory:
+        return func
+    top = int(environ.get(PROFILE_TOP, 30))
+    lines = environ.get(PROFILE_LINES, '') not in ('', '0')
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        import cProfile
+
+        # actions called by a pipeline in the same thread are part of its
+        # profile
+        if getattr(_active, 'profiling', False):
+            return func(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        sampler = None
+        if lines:
+            sampler = LineSampler(threading.get_ident())
+            sampler.start()
+        _active.profiling = True
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            _active.profiling = False
+            if sampler is not None:
+                sampler.stop()
+            _write(directory, func.__name__, profiler, sampler, top)
+
+    # QIIME 2 reads the signature and annotations of the registered function
+    wrapper.__signature__ = inspect.signature(func)
+    return wrapper
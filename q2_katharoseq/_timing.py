@@ -0,0 +1,107 @@
+# Per-stage wall time, CPU time and peak memory of the actions. An action
+# opens a timer and the fitting code marks its stages against whichever
+# timer is running, so the stages do not have to be passed around. The peak
+# memory is only measured when Python already traces allocations
+# (PYTHONTRACEMALLOC=1 or -X tracemalloc), as tracing slows the plotting
+# code down about threefold.
+import contextvars
+import json
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+_timer = contextvars.ContextVar('katharoseq_timer', default=None)
+
+COLUMNS = ['stage', 'wall_s', 'cpu_s', 'peak_mb']
+
+
+class Timer:
+    def __init__(self, action):
+        self.action = action
+        self.stages = []
+        self._open = False
+
+    @contextmanager
+    def stage(self, name):
+        # stages do not nest; the time of an inner stage stays with the
+        # outer one
+        if self._open:
+            yield
+            return
+        self._open = True
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            peak = None
+            if tracing:
+                peak = (tracemalloc.get_traced_memory()[1] -
+                        start_memory) / 2**20
+            self.stages.append(
+                {'stage': name,
+                 'wall_s': time.perf_counter() - wall,
+                 'cpu_s': time.process_time() - cpu,
+                 'peak_mb': peak})
+            self._open = False
+
+    def to_dataframe(self):
+        return pd.DataFrame(self.stages, columns=COLUMNS).set_index('stage')
+
+    def to_html(self):
+        import q2templates
+
+        df = self.to_dataframe().round(3)
+        df = df.astype(object).where(df.notna(), '')
+        df.columns = ['Wall time (s)', 'CPU time (s)', 'Peak memory (MB)']
+        df.index.name = 'Stage'
+        return q2templates.df_to_html(df)
+
+    def write(self, output_dir):
+        with open(os.path.join(output_dir, 'timings.json'), 'w') as fh:
+            json.dump({'action': self.action,
+                       'tracemalloc': tracemalloc.is_tracing(),
+                       'stages': self.stages}, fh, indent=2)
+        self.to_dataframe().to_csv(os.path.join(output_dir, 'timings.tsv'),
+                                   sep='\t', na_rep='')
+
+    def log(self):
+        for s in self.stages:
+            peak = '' if s['peak_mb'] is None else \
+                ', %.1f MB peak' % s['peak_mb']
+            logger.info('%s: %s took %.3f s wall, %.3f s CPU%s',
+                        self.action, s['stage'], s['wall_s'], s['cpu_s'],
+                        peak)
+
+
+@contextmanager
+def timed(action):
+    # an action called from within another one records into the outer timer
+    timer = _timer.get()
+    if timer is not None:
+        yield timer
+        return
+    timer = Timer(action)
+    token = _timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _timer.reset(token)
+        timer.log()
+
+
+def stage(name):
+    timer = _timer.get()
+    if timer is None:
+        return nullcontext()
+    return timer.stage(name)
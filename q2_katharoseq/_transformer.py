@@ -1,7 +1,44 @@
+import json
+
+import numpy as np
 import pandas as pd
 
 from .plugin_setup import plugin
-from ._format import EstimatedBiomassFmt
+from ._format import (EstimatedBiomassFmt, EstimatedBiomassDirFmt,
+                      STATS_HEADER, OPTIONAL_STATS_COLUMNS,
+                      detect_compression, read_header, BIOMASS_CSV_GZ,
+                      open_gzip_writer,
+                      StandardCurveFmt, KatharoSeqThresholdFmt,
+                      ReadTotalsFmt, READ_TOTALS_HEADER)
+
+
+def _read_csv(path, dtype, compression):
+    # the pyarrow reader is multithreaded and considerably faster than the
+    # pandas C parser on large tables, but it is an optional dependency
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        return pd.read_csv(path, dtype=dtype, compression=compression)
+
+    column_types = {c: pa.string() if t is str else pa.float64()
+                    for c, t in dtype.items()}
+    with pa.input_stream(path, compression=compression) as fh:
+        table = pa_csv.read_csv(
+            fh, convert_options=pa_csv.ConvertOptions(
+                column_types=column_types))
+    return table.to_pandas()
+
+
+def _read_biomass(path):
+    hdr = read_header(path)
+    numeric = set(STATS_HEADER[1:] + OPTIONAL_STATS_COLUMNS)
+    dtype = {c: np.float64 for c in hdr[1:] if c in numeric}
+    # sample IDs must never be coerced to numbers
+    dtype[hdr[0]] = str
+
+    df = _read_csv(str(path), dtype, detect_compression(path))
+    return df.set_index(hdr[0])
 
 
 @plugin.register_transformer
@@ -13,4 +50,60 @@ def _1(data: pd.DataFrame) -> EstimatedBiomassFmt:
 
 @plugin.register_transformer
 def _2(ff: EstimatedBiomassFmt) -> pd.DataFrame:
-    return pd.read_csv(str(ff), index_col='sample-id')
+    return _read_biomass(ff)
+
+
+@plugin.register_transformer
+def _3(data: dict) -> StandardCurveFmt:
+    ff = StandardCurveFmt()
+    with ff.open() as fh:
+        json.dump(data, fh)
+    return ff
+
+
+@plugin.register_transformer
+def _4(ff: StandardCurveFmt) -> dict:
+    with ff.open() as fh:
+        return json.load(fh)
+
+
+@plugin.register_transformer
+def _5(data: dict) -> KatharoSeqThresholdFmt:
+    ff = KatharoSeqThresholdFmt()
+    with ff.open() as fh:
+        json.dump(data, fh, separators=(',', ':'))
+    return ff
+
+
+@plugin.register_transformer
+def _6(ff: KatharoSeqThresholdFmt) -> dict:
+    with ff.open() as fh:
+        return json.load(fh)
+
+
+@plugin.register_transformer
+def _7(data: pd.DataFrame) -> EstimatedBiomassDirFmt:
+    df = EstimatedBiomassDirFmt()
+    with open_gzip_writer(df.path / BIOMASS_CSV_GZ) as fh:
+        data.to_csv(fh)
+    return df
+
+
+@plugin.register_transformer
+def _8(df: EstimatedBiomassDirFmt) -> pd.DataFrame:
+    return _read_biomass(df.biomass_path())
+
+
+@plugin.register_transformer
+def _9(data: pd.Series) -> ReadTotalsFmt:
+    ff = ReadTotalsFmt()
+    data = data.rename(READ_TOTALS_HEADER[1])
+    data.rename_axis(READ_TOTALS_HEADER[0]).to_csv(str(ff), sep='\t')
+    return ff
+
+
+@plugin.register_transformer
+def _10(ff: ReadTotalsFmt) -> pd.Series:
+    # sample IDs must never be coerced to numbers
+    df = pd.read_csv(str(ff), sep='\t', dtype={READ_TOTALS_HEADER[0]: str})
+    return df.set_index(READ_TOTALS_HEADER[0])[READ_TOTALS_HEADER[1]]
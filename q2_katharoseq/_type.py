@@ -1,3 +1,6 @@
 from qiime2.plugin import SemanticType
 
 EstimatedBiomass = SemanticType('EstimatedBiomass')
+StandardCurve = SemanticType('StandardCurve')
+KatharoSeqThreshold = SemanticType('KatharoSeqThreshold')
+ReadTotals = SemanticType('ReadTotals')
@@ -0,0 +1,218 @@
+import gzip
+import json
+import os
+import shutil
+from importlib.resources import files
+
+import numpy as np
+import pandas as pd
+
+
+# the largest number of per-sample points embedded in a visualization; larger
+# datasets are downsampled before they are written to the page
+MAX_POINTS = 5000
+
+_SCHEMA = 'https://vega.github.io/schema/vega-lite/v5.json'
+
+# pinned, minified builds of the libraries the specs are rendered with; they
+# are copied next to index.html so the pages work without network access
+LIBRARIES = ['vega-5.30.0.min.js', 'vega-lite-5.20.1.min.js',
+             'vega-embed-6.26.0.min.js']
+
+
+# datasets are embedded as {column: [values]}, which is far more compact than
+# the list of records vega-lite consumes; vega.js expands them in the page
+def columnar(df):
+    data = {}
+    for column, values in df.items():
+        if pd.api.types.is_numeric_dtype(values):
+            values = values.astype(float).round(6)
+            data[column] = [None if not np.isfinite(v) else v
+                            for v in values.tolist()]
+        else:
+            data[column] = values.astype(str).tolist()
+    return data
+
+
+def downsample(df, max_points=MAX_POINTS, seed=0):
+    # the seed is fixed so that reports are reproducible
+    n = len(df)
+    if n <= max_points:
+        return df, n
+    rng = np.random.default_rng(seed)
+    keep = np.sort(rng.choice(n, size=max_points, replace=False))
+    return df.iloc[keep], n
+
+
+def _line(x, y):
+    return pd.DataFrame({'x': x, 'y': y})
+
+
+def sigmoid_spec(controls, fit_x, fit_y):
+    spec = {
+        '$schema': _SCHEMA,
+        'width': 480, 'height': 320,
+        'layer': [
+            {'data': {'name': 'fit'},
+             'mark': {'type': 'line', 'color': '#ff7f0e'},
+             'encoding': {
+                 'x': {'field': 'x', 'type': 'quantitative',
+                       'title': 'Log reads'},
+                 'y': {'field': 'y', 'type': 'quantitative',
+                       'title': 'Correctly assigned',
+                       'scale': {'domain': [0, 1.05]}}}},
+            {'data': {'name': 'controls'},
+             'mark': {'type': 'point', 'filled': True, 'size': 60},
+             'encoding': {
+                 'x': {'field': 'log_asv_reads', 'type': 'quantitative'},
+                 'y': {'field': 'correct_assign', 'type': 'quantitative'},
+                 'tooltip': [
+                     {'field': 'sample_id', 'title': 'Sample'},
+                     {'field': 'cell_count', 'title': 'Cell count'},
+                     {'field': 'asv_reads', 'title': 'Reads'},
+                     {'field': 'correct_assign', 'format': '.3f',
+                      'title': 'Correctly assigned'}]}}]}
+    datasets = {'fit': _line(fit_x, fit_y), 'controls': controls}
+    return spec, datasets
+
+
+def threshold_curve_spec(percent, min_freq, selected):
+    spec = {
+        '$schema': _SCHEMA,
+        'width': 480, 'height': 320,
+        'layer': [
+            {'data': {'name': 'curve'},
+             'mark': {'type': 'line', 'point': True},
+             'encoding': {
+                 'x': {'field': 'x', 'type': 'quantitative',
+                       'title': 'Threshold (%)'},
+                 'y': {'field': 'y', 'type': 'quantitative',
+                       'title': 'Minimum frequency',
+                       'scale': {'type': 'log'}},
+                 'tooltip': [
+                     {'field': 'x', 'title': 'Threshold (%)'},
+                     {'field': 'y', 'title': 'Minimum frequency'}]}},
+            {'data': {'name': 'selected'},
+             'mark': {'type': 'rule', 'color': 'firebrick'},
+             'encoding': {
+                 'x': {'field': 'x', 'type': 'quantitative'}}}]}
+    datasets = {'curve': _line(percent, min_freq),
+                'selected': _line([selected], [np.nan])}
+    return spec, datasets
+
+
+def depth_spec(depth, min_freqs):
+    counts = np.asarray(depth['counts'])
+    start = np.arange(len(counts)) * depth['bin_width']
+    bins = pd.DataFrame({'start': start,
+                         'end': start + depth['bin_width'],
+                         'samples': counts})
+    bins['reads_from'] = np.floor(np.power(10, bins['start']))
+    bins['reads_to'] = np.floor(np.power(10, bins['end']))
+    rules = pd.DataFrame({
+        'threshold': list(min_freqs),
+        'min_freq': list(min_freqs.values()),
+        'log_min_freq': np.log10(np.maximum(list(min_freqs.values()), 1)),
+        'retained': [depth['retained'][t] for t in min_freqs]})
+    spec = {
+        '$schema': _SCHEMA,
+        'width': 480, 'height': 320,
+        'layer': [
+            {'data': {'name': 'bins'},
+             'mark': {'type': 'rect', 'color': 'lightgray'},
+             'encoding': {
+                 'x': {'field': 'start', 'type': 'quantitative',
+                       'title': 'Log reads'},
+                 'x2': {'field': 'end'},
+                 'y': {'field': 'samples', 'type': 'quantitative',
+                       'title': 'Samples'},
+                 'tooltip': [
+                     {'field': 'reads_from', 'title': 'Reads from'},
+                     {'field': 'reads_to', 'title': 'Reads to'},
+                     {'field': 'samples', 'title': 'Samples'}]}},
+            {'data': {'name': 'thresholds'},
+             'mark': {'type': 'rule', 'strokeDash': [6, 4]},
+             'encoding': {
+                 'x': {'field': 'log_min_freq', 'type': 'quantitative'},
+                 'color': {'field': 'threshold', 'type': 'nominal',
+                           'title': 'Threshold (%)'},
+                 'tooltip': [
+                     {'field': 'threshold', 'title': 'Threshold (%)'},
+                     {'field': 'min_freq', 'title': 'Minimum frequency'},
+                     {'field': 'retained', 'title': 'Samples retained'}]}}]}
+    return spec, {'bins': bins, 'thresholds': rules}
+
+
+def standard_curve_spec(controls, fit_x, fit_y):
+    spec = {
+        '$schema': _SCHEMA,
+        'width': 480, 'height': 320,
+        'layer': [
+            {'data': {'name': 'fit'},
+             'mark': {'type': 'line', 'strokeDash': [6, 4]},
+             'encoding': {
+                 'x': {'field': 'x', 'type': 'quantitative',
+                       'title': 'Log reads'},
+                 'y': {'field': 'y', 'type': 'quantitative',
+                       'title': 'Log cells'}}},
+            {'data': {'name': 'controls'},
+             'mark': {'type': 'point', 'filled': True, 'color': 'black'},
+             'encoding': {
+                 'x': {'field': 'log_total_reads', 'type': 'quantitative'},
+                 'y': {'field': 'log_control_cell_extraction',
+                       'type': 'quantitative'},
+                 'tooltip': [
+                     {'field': 'sample_id', 'title': 'Sample'},
+                     {'field': 'total_reads', 'title': 'Reads'},
+                     {'field': 'control_cell_extraction',
+                      'title': 'Cells'}]}}]}
+    datasets = {'fit': _line(fit_x, fit_y), 'controls': controls}
+    return spec, datasets
+
+
+def estimates_spec(samples, y, y_title):
+    spec = {
+        '$schema': _SCHEMA,
+        'width': 480, 'height': 320,
+        'data': {'name': 'samples'},
+        'mark': {'type': 'circle', 'opacity': 0.5, 'size': 20},
+        'params': [{'name': 'zoom', 'select': 'interval', 'bind': 'scales'}],
+        'encoding': {
+            'x': {'field': 'log_total_reads', 'type': 'quantitative',
+                  'title': 'Log reads', 'scale': {'zero': False}},
+            'y': {'field': y, 'type': 'quantitative', 'title': y_title,
+                  'scale': {'zero': False}},
+            'tooltip': [
+                {'field': 'sample_id', 'title': 'Sample'},
+                {'field': 'total_reads', 'title': 'Reads'},
+                {'field': y, 'format': '.3f', 'title': y_title}]}}
+    return spec, {'samples': samples}
+
+
+def to_json(spec, datasets):
+    payload = {'spec': spec,
+               'datasets': {name: columnar(df)
+                            for name, df in datasets.items()}}
+    # the payload is embedded in a script element
+    return json.dumps(payload, separators=(',', ':')).replace('</', '<\\/')
+
+
+def view(id, title, spec, datasets, note=None):
+    return {'id': id, 'title': title, 'note': note,
+            'payload': to_json(spec, datasets)}
+
+
+def write_table(output_dir, filename, df):
+    # the full table is kept out of index.html; table.js fetches and
+    # decompresses it in the browser, so it is written with gzip and a pinned
+    # mtime like the other artifacts
+    payload = json.dumps(columnar(df), separators=(',', ':'))
+    with gzip.GzipFile(os.path.join(output_dir, filename), 'wb',
+                       mtime=0) as fh:
+        fh.write(payload.encode('utf-8'))
+
+
+def write_assets(output_dir):
+    for asset in LIBRARIES + ['vega.js', 'table.js']:
+        shutil.copy(str(files('q2_katharoseq') / 'assets' / asset),
+                    os.path.join(output_dir, asset))
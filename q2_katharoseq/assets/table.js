@@ -0,0 +1,145 @@
+// Renders the per-sample tables written by q2_katharoseq._vega.write_table.
+// Only the rows in view are in the DOM, so the page stays responsive with
+// hundreds of thousands of samples.
+var KATHAROSEQ_ROW_HEIGHT = 28;
+var KATHAROSEQ_OVERSCAN = 10;
+
+function katharoseqFetchTable(url) {
+  return fetch(url).then(function (response) {
+    if (!response.ok) {
+      throw new Error(url + ': ' + response.status);
+    }
+    return response.arrayBuffer();
+  }).then(function (buffer) {
+    var bytes = new Uint8Array(buffer);
+    // some servers already undo the compression for us
+    if (bytes.length < 2 || bytes[0] !== 0x1f || bytes[1] !== 0x8b) {
+      return new TextDecoder().decode(bytes);
+    }
+    if (typeof DecompressionStream === 'undefined') {
+      throw new Error('this browser cannot decompress ' + url);
+    }
+    var stream = new Blob([bytes]).stream().pipeThrough(
+      new DecompressionStream('gzip'));
+    return new Response(stream).text();
+  }).then(JSON.parse);
+}
+
+function katharoseqFormat(value) {
+  if (value === null || value === undefined) {
+    return '';
+  }
+  if (typeof value === 'number') {
+    if (Number.isInteger(value)) {
+      return value.toLocaleString();
+    }
+    return Math.abs(value) >= 1e5 ? value.toExponential(3)
+                                   : value.toPrecision(4);
+  }
+  return String(value);
+}
+
+function katharoseqTable(container, columns) {
+  var keys = columns.map(function (c) { return c[0]; });
+  var status = container.querySelector('.katharoseq-table-status');
+  var filter = container.querySelector('.katharoseq-table-filter');
+  var viewport = container.querySelector('.katharoseq-table-viewport');
+  var header = container.querySelector('thead tr');
+  var body = container.querySelector('tbody');
+  var data = null;
+  var order = [];
+  var sortKey = null;
+  var descending = false;
+
+  columns.forEach(function (column) {
+    var th = document.createElement('th');
+    th.textContent = column[1];
+    th.style.cursor = 'pointer';
+    th.addEventListener('click', function () {
+      descending = sortKey === column[0] ? !descending : false;
+      sortKey = column[0];
+      update();
+    });
+    header.appendChild(th);
+  });
+
+  function update() {
+    var needle = filter.value.trim().toLowerCase();
+    var ids = data[keys[0]];
+    order = [];
+    for (var i = 0; i < ids.length; i++) {
+      if (!needle || String(ids[i]).toLowerCase().indexOf(needle) !== -1) {
+        order.push(i);
+      }
+    }
+    if (sortKey !== null) {
+      var values = data[sortKey];
+      var sign = descending ? -1 : 1;
+      order.sort(function (a, b) {
+        var x = values[a], y = values[b];
+        // missing values always go last
+        if (x === null) { return y === null ? a - b : 1; }
+        if (y === null) { return -1; }
+        return (x < y ? -1 : x > y ? 1 : a - b) * sign;
+      });
+    }
+    status.textContent = order.length.toLocaleString() + ' of ' +
+      ids.length.toLocaleString() + ' samples';
+    viewport.scrollTop = 0;
+    render();
+  }
+
+  function spacer(height) {
+    var tr = document.createElement('tr');
+    var td = document.createElement('td');
+    td.colSpan = keys.length;
+    td.style.height = height + 'px';
+    td.style.padding = '0';
+    td.style.border = 'none';
+    tr.appendChild(td);
+    return tr;
+  }
+
+  function render() {
+    var first = Math.max(0, Math.floor(
+      viewport.scrollTop / KATHAROSEQ_ROW_HEIGHT) - KATHAROSEQ_OVERSCAN);
+    var last = Math.min(order.length, Math.ceil(
+      (viewport.scrollTop + viewport.clientHeight) / KATHAROSEQ_ROW_HEIGHT) +
+      KATHAROSEQ_OVERSCAN);
+    var fragment = document.createDocumentFragment();
+    fragment.appendChild(spacer(first * KATHAROSEQ_ROW_HEIGHT));
+    for (var i = first; i < last; i++) {
+      var tr = document.createElement('tr');
+      tr.style.height = KATHAROSEQ_ROW_HEIGHT + 'px';
+      for (var j = 0; j < keys.length; j++) {
+        var td = document.createElement('td');
+        td.textContent = katharoseqFormat(data[keys[j]][order[i]]);
+        tr.appendChild(td);
+      }
+      fragment.appendChild(tr);
+    }
+    fragment.appendChild(spacer((order.length - last) *
+                                KATHAROSEQ_ROW_HEIGHT));
+    body.replaceChildren(fragment);
+  }
+
+  var pending = false;
+  viewport.addEventListener('scroll', function () {
+    if (!pending) {
+      pending = true;
+      requestAnimationFrame(function () {
+        pending = false;
+        render();
+      });
+    }
+  });
+  filter.addEventListener('input', update);
+
+  katharoseqFetchTable(container.dataset.src).then(function (table) {
+    data = table;
+    update();
+  }).catch(function (error) {
+    status.textContent = 'The table could not be loaded (' + error.message +
+      '); it can be downloaded from ' + container.dataset.src + '.';
+  });
+}
@@ -0,0 +1,30 @@
+// Expands the columnar datasets embedded by q2_katharoseq._vega into the
+// records vega-lite expects, and embeds every view on the page.
+function katharoseqRows(columns) {
+  var keys = Object.keys(columns);
+  var n = keys.length ? columns[keys[0]].length : 0;
+  var rows = new Array(n);
+  for (var i = 0; i < n; i++) {
+    var row = {};
+    for (var j = 0; j < keys.length; j++) {
+      row[keys[j]] = columns[keys[j]][i];
+    }
+    rows[i] = row;
+  }
+  return rows;
+}
+
+function katharoseqEmbedAll() {
+  var payloads = document.querySelectorAll('script.katharoseq-view');
+  for (var i = 0; i < payloads.length; i++) {
+    var payload = JSON.parse(payloads[i].textContent);
+    var datasets = {};
+    for (var name in payload.datasets) {
+      datasets[name] = katharoseqRows(payload.datasets[name]);
+    }
+    payload.spec.datasets = datasets;
+    vegaEmbed('#' + payloads[i].dataset.target, payload.spec,
+              {actions: {export: true, source: false, compiled: false,
+                         editor: false}});
+  }
+}
@@ -0,0 +1,242 @@
+# The katharoseq command, which runs the threshold and biomass fits on .biom
+# and .qza files directly. It does not import QIIME 2, so it skips the
+# framework startup and the archive extraction, which cost more than the
+# analysis itself on small tables.
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from ._io import load_table, load_taxonomy
+from ._profile import profiled
+from ._fit import (fit_table_threshold, fit_lm, estimate_biomass,
+                   totals_frame, CONTROLS)
+
+
+TABLE_EXTENSIONS = ('.biom', '.qza')
+
+
+def read_metadata(path):
+    # QIIME 2 metadata is a TSV whose first column holds the sample IDs; the
+    # optional #q2: directives and comments are skipped
+    df = pd.read_csv(path, sep='\t', dtype=str, keep_default_na=False,
+                     index_col=0)
+    df = df.loc[~df.index.str.startswith('#')]
+    df.index = df.index.astype(str)
+    return df.replace({'': np.nan})
+
+
+def metadata_column(metadata, name, numeric=False):
+    if name not in metadata.columns:
+        raise ValueError(f"'{name}' is not a column of the metadata.")
+    # blank cells stay as NaN for every sample of the metadata, as
+    # MetadataColumn.to_series() returns them within the plugin
+    column = metadata[name]
+    if numeric:
+        try:
+            column = pd.to_numeric(column)
+        except ValueError as e:
+            raise ValueError(f"'{name}' is not a numeric column: {e}") from e
+    return column
+
+
+def threshold(table, metadata, args):
+    table = load_table(table)
+    taxonomy = load_taxonomy(args.taxonomy) if args.taxonomy else None
+    fit, _ = fit_table_threshold(
+        table, args.threshold, args.positive_control_value,
+        metadata_column(metadata, args.positive_control_column),
+        metadata_column(metadata, args.cell_count_column, numeric=True),
+        args.control, args.asv, taxonomy)
+    return fit
+
+
+def biomass(table, metadata, args):
+    slope, intercept, filtered, _ = fit_lm(
+        totals_frame(load_table(table)), args.min_total_reads,
+        metadata_column(metadata, args.positive_control_column),
+        args.positive_control_value,
+        metadata_column(metadata, args.control_cell_extraction,
+                        numeric=True))
+    return estimate_biomass(
+        filtered, slope, intercept, args.pcr_template_vol,
+        args.dna_extract_vol,
+        metadata_column(metadata, args.extraction_mass_g, numeric=True))
+
+
+COMMANDS = {'threshold': (profiled(threshold), '.json'),
+            'biomass': (profiled(biomass), '.csv')}
+
+
+def write_result(result, output):
+    if isinstance(result, pd.DataFrame):
+        result.to_csv(output)
+    else:
+        json.dump(result, output, separators=(',', ':'))
+
+
+def run(command, table, metadata_path, args, output):
+    func, _ = COMMANDS[command]
+    result = func(table, read_metadata(metadata_path), args)
+    if output is None:
+        write_result(result, sys.stdout)
+    else:
+        with open(output, 'w', newline='') as fh:
+            write_result(result, fh)
+    return output
+
+
+def _run_member(command, table, metadata_path, args, output):
+    try:
+        run(command, table, metadata_path, args, output)
+        return None
+    except Exception as e:
+        return f'{type(e).__name__}: {e}'
+
+
+def batch(args):
+    from concurrent.futures import ProcessPoolExecutor
+
+    tables = sorted(f for f in os.listdir(args.directory)
+                    if f.endswith(TABLE_EXTENSIONS))
+    if not tables:
+        raise ValueError(f'No .biom or .qza files found in {args.directory}.')
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    _, extension = COMMANDS[args.batch_command]
+    jobs = {}
+    n_jobs = args.n_jobs or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(tables))) as pool:
+        for name in tables:
+            stem = os.path.splitext(name)[0]
+            jobs[name] = pool.submit(
+                _run_member, args.batch_command,
+                os.path.join(args.directory, name), args.metadata, args,
+                os.path.join(args.output_dir, stem + extension))
+        errors = {name: job.result() for name, job in jobs.items()}
+
+    failures = {name: e for name, e in errors.items() if e is not None}
+    for name, error in failures.items():
+        print(f'{name}: {error}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _percent(value):
+    # the minimum frequency is infinite at 100 percent and undefined at 0
+    value = int(value)
+    if not 0 < value < 100:
+        raise argparse.ArgumentTypeError(
+            f'{value} is not between 0 and 100, exclusive')
+    return value
+
+
+def _add_threshold_arguments(parser):
+    parser.add_argument('--threshold', type=_percent, default=90,
+                        help='Threshold, in percent, to calculate the '
+                             'minimum frequency for, between 0 and 100 '
+                             'exclusive (default: 90).')
+    parser.add_argument('--positive-control-column', required=True,
+                        help='Metadata column that marks the positive '
+                             'controls.')
+    parser.add_argument('--positive-control-value', required=True,
+                        help='Value of the positive controls in that column.')
+    parser.add_argument('--cell-count-column',
+                        help='Metadata column with the cell counts of the '
+                             'positive controls.')
+    parser.add_argument('--control', choices=CONTROLS, default='classic',
+                        help='Type of positive control (default: classic); '
+                             'auto picks the kit that fits best.')
+    parser.add_argument('--asv', help='ASV to use with --control asv.')
+    parser.add_argument('--taxonomy',
+                        help='Taxonomy .qza or TSV of an ASV table, to '
+                             'collapse its positive controls to genus.')
+
+
+def _add_biomass_arguments(parser):
+    parser.add_argument('--control-cell-extraction',
+                        help='Metadata column with the cells put into the '
+                             'extraction of the positive controls.')
+    parser.add_argument('--min-total-reads', type=int,
+                        help='Minimum number of reads of a sample.')
+    parser.add_argument('--pcr-template-vol', type=float,
+                        help='Volume of DNA used as PCR template.')
+    parser.add_argument('--dna-extract-vol', type=float,
+                        help='Final elution volume of the DNA extraction.')
+    parser.add_argument('--extraction-mass-g',
+                        help='Metadata column with the sample masses, in g.')
+
+
+def _require(parser, args, names):
+    missing = ['--' + n.replace('_', '-') for n in names
+               if getattr(args, n) is None]
+    if missing:
+        parser.error('the following arguments are required: %s'
+                     % ', '.join(missing))
+
+
+THRESHOLD_REQUIRED = ['cell_count_column']
+BIOMASS_REQUIRED = ['control_cell_extraction', 'min_total_reads',
+                    'pcr_template_vol', 'dna_extract_vol',
+                    'extraction_mass_g']
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='katharoseq',
+        description='KatharoSeq read count thresholds and biomass estimates '
+                    'without the QIIME 2 framework.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for name, help in (('threshold', 'Fit the read count threshold.'),
+                       ('biomass', 'Estimate the biomass of the samples.')):
+        command = commands.add_parser(name, help=help)
+        command.add_argument('table', help='A .biom or .qza feature table.')
+        command.add_argument('--metadata', required=True,
+                             help='Sample metadata TSV.')
+        command.add_argument('--output', '-o',
+                             help='Output file (default: stdout).')
+        if name == 'threshold':
+            _add_threshold_arguments(command)
+        else:
+            command.add_argument('--positive-control-column', required=True)
+            command.add_argument('--positive-control-value', required=True)
+            _add_biomass_arguments(command)
+
+    command = commands.add_parser(
+        'batch', help='Run threshold or biomass for every .biom and .qza '
+                      'file of a directory on a process pool.')
+    command.add_argument('batch_command', choices=list(COMMANDS))
+    command.add_argument('directory')
+    command.add_argument('--metadata', required=True,
+                         help='Sample metadata TSV shared by every table.')
+    command.add_argument('--output-dir', required=True)
+    command.add_argument('--n-jobs', type=int, default=0,
+                         help='Number of worker processes (default: all '
+                              'CPUs).')
+    _add_threshold_arguments(command)
+    _add_biomass_arguments(command)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    command = args.batch_command if args.command == 'batch' else args.command
+    _require(parser, args, THRESHOLD_REQUIRED if command == 'threshold'
+             else BIOMASS_REQUIRED)
+
+    try:
+        if args.command == 'batch':
+            return batch(args)
+        run(args.command, args.table, args.metadata, args, args.output)
+    except (ValueError, KeyError, OSError) as e:
+        print(f'katharoseq: error: {e}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
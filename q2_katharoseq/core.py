@@ -0,0 +1,279 @@
+# The KatharoSeq math on plain arrays. This module only imports NumPy, so it
+# can be embedded in lab pipelines without QIIME 2; scipy is imported once a
+# curve is actually fitted. Count matrices are samples x features and may be
+# dense arrays or scipy sparse matrices.
+import numpy as np
+
+
+control_type = {
+    'atcc': [
+        'd__Bacteria;p__Firmicutes;c__Clostridia;o__Clostridiales;'
+        'f__Clostridiaceae;g__Clostridium',
+        'd__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;'
+        'o__Enterobacterales;f__Enterobacteriaceae;g__',
+        'd__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;'
+        'o__Enterobacterales;f__Enterobacteriaceae;'
+        'g__Escherichia-Shigella',
+        'd__Bacteria;p__Firmicutes;c__Bacilli;o__Staphylococcales;'
+        'f__Staphylococcaceae;g__Staphylococcus'],
+    'zymobiomics': [
+        'd__Bacteria;p__Firmicutes;c__Bacilli;'
+        'o__Lactobacillales;f__Listeriaceae;g__Listeria',
+        'd__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;'
+        'o__Pseudomonadales;f__Pseudomonadaceae;g__Pseudomonas',
+        'd__Bacteria;p__Firmicutes;c__Bacilli;o__Bacillales;'
+        'f__Bacillaceae;g__Bacillus',
+        'd__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;'
+        'o__Enterobacterales;f__Enterobacteriaceae;__',
+        'd__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;'
+        'o__Enterobacterales;f__Enterobacteriaceae;'
+        'g__Escherichia-Shigella',
+        'd__Bacteria;p__Firmicutes;c__Bacilli;o__Lactobacillales;'
+        'f__Lactobacillaceae;g__Lactobacillus',
+        'd__Bacteria;p__Firmicutes;c__Bacilli;o__Lactobacillales;'
+        'f__Enterococcaceae;g__Enterococcus',
+        'd__Bacteria;p__Firmicutes;c__Bacilli;o__Staphylococcales'
+        ';f__Staphylococcaceae;g__Staphylococcus'],
+    'classic': [
+        'd__Bacteria;p__Firmicutes;c__Bacilli;o__Bacillales;'
+        'f__Bacillaceae;g__Bacillus',
+        'd__Bacteria;p__Proteobacteria;c__Alphaproteobacteria;'
+        'o__Rhodobacterales;f__Rhodobacteraceae;g__Paracoccus'],
+    'single': [
+        'd__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;'
+        'o__Burkholderiales;f__Comamonadaceae;g__Variovorax'],
+    'asv': ''
+}
+
+# the control types that are a kit of known taxa
+KITS = [k for k in control_type if k != 'asv']
+
+# the taxonomic level of the kit taxa, as in `qiime taxa collapse --p-level`
+GENUS = 6
+
+
+# Define the allosteric sigmoid equation
+def allosteric_sigmoid(x, h, k_prime):
+    y = x ** h / (k_prime + x ** h)
+    return y
+
+
+def sample_totals(counts):
+    return np.asarray(counts.sum(axis=1), dtype=float).ravel()
+
+
+def control_reads(counts, feature_ids, control_features):
+    # reads of the control features that are present in the table; features
+    # of a control type that were not observed are skipped
+    index = {f: i for i, f in enumerate(feature_ids)}
+    present = [f for f in control_features if f in index]
+    if not present:
+        return np.zeros(counts.shape[0]), present
+    columns = counts[:, [index[f] for f in present]]
+    return sample_totals(columns), present
+
+
+def lineage(taxon, level):
+    # the lineage of a taxonomy string at a level; like taxa collapse, ranks
+    # missing from the string are filled with '__'
+    ranks = [r.strip() for r in taxon.split(';')][:level]
+    return ';'.join(ranks + ['__'] * (level - len(ranks)))
+
+
+def collapse_indicator(taxa, level=GENUS):
+    # features x lineages sparse matrix assigning every feature to its
+    # lineage at a level, and the lineages; counts @ indicator collapses a
+    # table without building the collapsed table of all samples
+    from scipy import sparse
+
+    lineages, inverse = np.unique([lineage(t, level) for t in taxa],
+                                  return_inverse=True)
+    n = len(inverse)
+    indicator = sparse.csr_matrix(
+        (np.ones(n), (np.arange(n), inverse.ravel())),
+        shape=(n, len(lineages)))
+    return indicator, [str(t) for t in lineages]
+
+
+def rank_indicator(taxa, control_features, levels):
+    # features x levels sparse matrix marking the features whose lineage at
+    # each level is that of one of the control features, so a single product
+    # gives the control reads at every level
+    from scipy import sparse
+
+    # the features of a table share far fewer taxonomy strings
+    unique, inverse = np.unique(np.asarray(taxa, dtype=str),
+                                return_inverse=True)
+    inverse = inverse.ravel()
+    rows, cols = [], []
+    for c, level in enumerate(levels):
+        kit = {lineage(f, level) for f in control_features}
+        hit = np.array([lineage(t, level) in kit for t in unique], dtype=bool)
+        features = np.flatnonzero(hit[inverse])
+        rows.append(features)
+        cols.append(np.full(len(features), c))
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    return sparse.csr_matrix((np.ones(len(rows)), (rows, cols)),
+                             shape=(len(inverse), len(levels)))
+
+
+def kit_indicator(feature_ids, kits=KITS):
+    # kits x features sparse matrix marking the taxa of each kit that are
+    # present in the table
+    from scipy import sparse
+
+    index = {f: i for i, f in enumerate(feature_ids)}
+    rows, cols = [], []
+    for k, kit in enumerate(kits):
+        for f in control_type[kit]:
+            if f in index:
+                rows.append(k)
+                cols.append(index[f])
+    return sparse.csr_matrix((np.ones(len(rows)), (rows, cols)),
+                             shape=(len(kits), len(index)))
+
+
+def kit_reads(counts, feature_ids, kits=KITS):
+    # the reads of every kit in a single product with the indicator, as a
+    # samples x kits array, and the number of taxa of each kit in the table
+    from scipy import sparse
+
+    indicator = kit_indicator(feature_ids, kits)
+    reads = indicator @ counts.T
+    if sparse.issparse(reads):
+        reads = reads.toarray()
+    return np.asarray(reads, dtype=float).T, np.diff(indicator.indptr)
+
+
+def fit_quality(log_reads, correct_assign, popt):
+    # coefficient of determination and root mean squared error of a fit
+    y = np.asarray(correct_assign, dtype=float)
+    residuals = y - allosteric_sigmoid(np.asarray(log_reads, dtype=float),
+                                       *popt)
+    ss_res = np.dot(residuals, residuals)
+    ss_tot = np.dot(y - y.mean(), y - y.mean())
+    r2 = 1 - ss_res / ss_tot if ss_tot > 0 else np.nan
+    return float(r2), float(np.sqrt(ss_res / len(y)))
+
+
+def fit_sigmoid(log_reads, correct_assign):
+    from scipy.optimize import curve_fit
+
+    log_reads = np.asarray(log_reads, dtype=float)
+    correct_assign = np.asarray(correct_assign, dtype=float)
+
+    # validate there's variation in correct_assign for curve fitting
+    if len(np.unique(correct_assign)) < 2:
+        raise ValueError(
+            f"All positive control samples have identical correct "
+            f"assignment ratio ({correct_assign[0]:.4f}). "
+            f"Cannot fit curve without variation in the data. Check "
+            f"that your dilution series spans a range of concentrations."
+        )
+
+    try:
+        popt, pcov = curve_fit(allosteric_sigmoid, log_reads, correct_assign,
+                               method='dogbox')
+    except RuntimeError as e:
+        raise RuntimeError(
+            f"Curve fitting failed to converge. This typically indicates "
+            f"the data does not follow the expected sigmoid pattern. "
+            f"Details: {e}\n"
+            f"Data summary - log_asv_reads range: "
+            f"[{log_reads.min():.2f}, {log_reads.max():.2f}], "
+            f"correct_assign range: "
+            f"[{correct_assign.min():.4f}, {correct_assign.max():.4f}]"
+        ) from e
+    return popt, pcov
+
+
+def min_frequency(popt, thresh):
+    h = popt[0]  # first value printed above graph
+    k = popt[1]  # second value printed above graph
+    y = thresh   # desired thresh (50%, 70%, 90%)
+    min_log_reads = np.power((k/(1/y-1)), (1/h))
+    # floored rather than cast, so an array of thresholds can be passed and
+    # the ones that overflow stay inf
+    min_freq = np.floor(np.power(10, min_log_reads))
+    return min_freq
+
+
+def get_threshold(r1, r2, thresh):
+    from scipy.optimize import curve_fit
+
+    # assign variables and solve for X (number of reads to pass filter)
+    popt, pcov = curve_fit(allosteric_sigmoid, r1, r2, method='dogbox')
+    return int(min_frequency(popt, thresh))
+
+
+def fit_standard_curve(log_reads, log_cells):
+    # ordinary least squares of log cells on log reads
+    x = np.asarray(log_reads, dtype=float)
+    y = np.asarray(log_cells, dtype=float)
+    x_mean = x.mean()
+    slope = np.dot(x - x_mean, y - y.mean()) / np.dot(x - x_mean, x - x_mean)
+    return float(slope), float(y.mean() - slope * x_mean)
+
+
+def estimate_cells(log_reads, slope, intercept):
+    return np.power(10, np.asarray(log_reads, dtype=float) * slope + intercept)
+
+
+# number of most abundant features reported for each dilution level
+TOP_K = 10
+
+
+def top_features(matrix, feature_ids, levels, k=TOP_K):
+    # matrix is a samples x features CSR matrix. The rows of each level are
+    # aggregated and ranked over their nonzeros only, so the cost scales
+    # with the number of nonzeros rather than the number of features
+    feature_ids = np.asarray(feature_ids)
+    levels = np.asarray(levels)
+    top = {'levels': [], 'totals': [], 'features': [], 'reads': []}
+
+    for level in np.unique(levels)[::-1]:
+        rows = np.flatnonzero(levels == level)
+        spans = [slice(matrix.indptr[r], matrix.indptr[r + 1]) for r in rows]
+        indices = np.concatenate([matrix.indices[i] for i in spans])
+        data = np.concatenate([matrix.data[i] for i in spans])
+
+        features, inverse = np.unique(indices, return_inverse=True)
+        reads = np.bincount(inverse, weights=data, minlength=len(features))
+        n = min(k, len(reads))
+        if n < len(reads):
+            best = np.argpartition(-reads, n - 1)[:n]
+        else:
+            best = np.arange(len(reads))
+        best = best[np.argsort(-reads[best], kind='stable')]
+
+        top['levels'].append(float(level))
+        top['totals'].append(float(data.sum()))
+        top['features'].append([str(f) for f in feature_ids[features[best]]])
+        top['reads'].append(reads[best].tolist())
+
+    return top
+
+
+# width of the read depth histogram bins, in log10 reads
+DEPTH_BIN_WIDTH = 0.05
+
+
+def depth_summary(totals, min_freqs):
+    totals = np.asarray(totals, dtype=float)
+    positive = totals[totals > 0]
+
+    log_totals = np.log10(positive)
+    top = log_totals.max() if len(log_totals) else 0
+    n_bins = max(1, int(np.ceil(top / DEPTH_BIN_WIDTH)))
+    edges = np.arange(n_bins + 1) * DEPTH_BIN_WIDTH
+    counts, _ = np.histogram(log_totals, bins=edges)
+
+    ordered = np.sort(totals)
+    retained = len(ordered) - np.searchsorted(
+        ordered, list(min_freqs.values()), side='left')
+
+    return {'bin_width': DEPTH_BIN_WIDTH,
+            'counts': counts.tolist(),
+            'n_zero': int(len(totals) - len(positive)),
+            'n_samples': int(len(totals)),
+            'retained': {t: int(n) for t, n in zip(min_freqs, retained)}}
@@ -1,12 +1,28 @@
 import importlib
-from qiime2.plugin import (Plugin, Citations, Str, Int,
-                           MetadataColumn, Categorical, Numeric, Choices)
+from qiime2.plugin import (Plugin, Citations, Str, Int, Bool, Range,
+                           Collection, Visualization, MetadataColumn,
+                           Categorical, Numeric, Choices, List)
 from q2_types.feature_table import (FeatureTable, Frequency)
-from . import (read_count_threshold, estimating_biomass, biomass_plot,
-               control_type)
+from q2_types.feature_data import FeatureData, Taxonomy
+from ._methods import (read_count_threshold, estimating_biomass,
+                       biomass_plot, fit_standard_curve, append_biomass,
+                       filter_table, fit_threshold, threshold_plot,
+                       fit_threshold_collection,
+                       estimating_biomass_collection, select_group,
+                       read_totals, group_thresholds, rank_thresholds)
 import q2_katharoseq
-from q2_katharoseq._type import EstimatedBiomass
-from q2_katharoseq._format import EstimatedBiomassFmt, EstimatedBiomassDirFmt
+from q2_katharoseq._fit import CONTROLS, AUTO
+from q2_katharoseq.core import KITS
+from q2_katharoseq._profile import profiled
+from q2_katharoseq._type import (EstimatedBiomass, StandardCurve,
+                                 KatharoSeqThreshold, ReadTotals)
+from q2_katharoseq._format import (EstimatedBiomassFmt, EstimatedBiomassDirFmt,
+                                   CompressedEstimatedBiomassFmt,
+                                   ZstdEstimatedBiomassFmt,
+                                   StandardCurveFmt, StandardCurveDirFmt,
+                                   KatharoSeqThresholdFmt,
+                                   KatharoSeqThresholdDirFmt,
+                                   ReadTotalsFmt, ReadTotalsDirFmt)
 
 
 citations = Citations.load('citations.bib', package='q2_katharoseq')
@@ -23,20 +39,32 @@ plugin = Plugin(
 )
 
 
-plugin.register_formats(EstimatedBiomassFmt, EstimatedBiomassDirFmt)
-plugin.register_semantic_types(EstimatedBiomass)
+plugin.register_formats(EstimatedBiomassFmt, EstimatedBiomassDirFmt,
+                        CompressedEstimatedBiomassFmt, ZstdEstimatedBiomassFmt,
+                        StandardCurveFmt, StandardCurveDirFmt,
+                        KatharoSeqThresholdFmt, KatharoSeqThresholdDirFmt,
+                        ReadTotalsFmt, ReadTotalsDirFmt)
+plugin.register_semantic_types(EstimatedBiomass, StandardCurve,
+                               KatharoSeqThreshold, ReadTotals)
 plugin.register_semantic_type_to_format(EstimatedBiomass,
                                         artifact_format=EstimatedBiomassDirFmt)
+plugin.register_semantic_type_to_format(StandardCurve,
+                                        artifact_format=StandardCurveDirFmt)
+plugin.register_semantic_type_to_format(
+    KatharoSeqThreshold, artifact_format=KatharoSeqThresholdDirFmt)
+plugin.register_semantic_type_to_format(ReadTotals,
+                                        artifact_format=ReadTotalsDirFmt)
 
 
 plugin.visualizers.register_function(
-    function=read_count_threshold,
+    function=profiled(read_count_threshold),
     inputs={
         'table': FeatureTable[Frequency],
+        'taxonomy': FeatureData[Taxonomy],
     },
     parameters={
-        'control': Str % Choices(control_type.keys()),
-        'threshold': Int,
+        'control': Str % Choices(CONTROLS),
+        'threshold': Int % Range(1, 100),
         'positive_control_value': Str,
         'positive_control_column': MetadataColumn[Categorical],
         'cell_count_column': MetadataColumn[Numeric],
@@ -45,16 +73,23 @@ plugin.visualizers.register_function(
     input_descriptions={
         'table': (
             'A FeatureTable collapsed to the genus level (level 6) that '
-            'contains the control samples.'
+            'contains the control samples, or an ASV table together with '
+            'its taxonomy.'
+        ),
+        'taxonomy': (
+            'The taxonomy of the features of an ASV table. The positive '
+            'controls are collapsed to the genus level with it, so the '
+            'table does not have to be collapsed beforehand.'
         ),
     },
     parameter_descriptions={
         'control': (
-            'The type of positive control used.'
+            'The type of positive control used. auto fits every kit and '
+            'keeps the one that fits the positive controls best.'
         ),
         'threshold': (
             'Threshold to use in calculating minimum frequency. '
-            'Must be int in [0,100].'
+            'Must be int in [1,99].'
         ),
         'positive_control_value': (
             'The value in the control column that demarks which samples are '
@@ -77,7 +112,7 @@ plugin.visualizers.register_function(
 )
 
 plugin.methods.register_function(
-    function=estimating_biomass,
+    function=profiled(estimating_biomass),
     inputs={
         'table': FeatureTable[Frequency],
     },
@@ -130,14 +165,18 @@ plugin.methods.register_function(
 )
 
 plugin.visualizers.register_function(
-    function=biomass_plot,
+    function=profiled(biomass_plot),
     inputs={
         'table': FeatureTable[Frequency],
     },
     parameters={'control_cell_extraction': MetadataColumn[Numeric],
                 'positive_control_column': MetadataColumn[Categorical],
                 'positive_control_value': Str,
-                'min_total_reads': Int
+                'min_total_reads': Int,
+                'plot_samples': Bool,
+                'extraction_mass_g': MetadataColumn[Numeric],
+                'pcr_template_vol': Int,
+                'dna_extract_vol': Int
                 },
     input_descriptions={
         'table': (
@@ -161,10 +200,534 @@ plugin.visualizers.register_function(
             'The value in the control column that demarks which samples are '
             'the positive controls.'),
         'min_total_reads': 'The minimum threshold to apply.',
+        'plot_samples': (
+            'Overlay the density of all samples passing min_total_reads on '
+            'the standard curve. Samples are aggregated into a rasterized '
+            'hexagonal grid, so the plot stays small for any number of '
+            'samples.'),
+        'extraction_mass_g': (
+            'The column in the sample metadata that describes the sample '
+            'mass (in grams). If provided with plot_samples, the density '
+            'of the estimated cells per gram of all samples is plotted in a '
+            'second panel.'),
+        'pcr_template_vol': (
+            'The volume of DNA used as template in the '
+            'library prep (PCR reaction). Required with extraction_mass_g.'),
+        'dna_extract_vol': (
+            'The final elution volume used during DNA extraction. Required '
+            'with extraction_mass_g.'),
     },
     name='Plot the results of estimating_biomass.',
     description='Plot the results of estimating_biomass.',
     citations=[]
 )
 
+plugin.methods.register_function(
+    function=profiled(fit_standard_curve),
+    inputs={
+        'table': FeatureTable[Frequency],
+    },
+    parameters={'control_cell_extraction': MetadataColumn[Numeric],
+                'positive_control_column': MetadataColumn[Categorical],
+                'positive_control_value': Str,
+                'min_total_reads': Int},
+    outputs=[('standard_curve', StandardCurve)],
+    input_descriptions={
+        'table': (
+            'A FeatureTable collapsed to the genus level (level 6) that '
+            'contains the control samples.'
+        ),
+    },
+    parameter_descriptions={
+        'control_cell_extraction': (
+            'The estimated number of cells or genomes used as input to your '
+            'library prep.'),
+        'positive_control_column': (
+            'The column in the sample metadata that describes which samples '
+            'are and are not controls.'),
+        'positive_control_value': (
+            'The value in the control column that demarks which samples are '
+            'the positive controls.'),
+        'min_total_reads': 'The minimum threshold to apply.'},
+    output_descriptions={
+        'standard_curve': (
+            'The linear fit of log cells against log reads of the positive '
+            'controls, used by estimating_biomass.')
+        },
+    name='Fit the KatharoSeq standard curve.',
+    description='Fit and store the standard curve relating the number of '
+                'reads of the positive controls to their cell input, so '
+                'that new samples can be estimated without refitting.',
+    citations=[]
+)
+
+plugin.methods.register_function(
+    function=profiled(append_biomass),
+    inputs={
+        'estimated_biomass': EstimatedBiomass,
+        'standard_curve': StandardCurve,
+        'table': FeatureTable[Frequency],
+    },
+    parameters={'extraction_mass_g': MetadataColumn[Numeric],
+                'min_total_reads': Int,
+                'pcr_template_vol': Int,
+                'dna_extract_vol': Int},
+    outputs=[('estimated_biomass', EstimatedBiomass)],
+    input_descriptions={
+        'estimated_biomass': (
+            'The existing biomass estimates. These rows are copied over '
+            'unchanged.'),
+        'standard_curve': (
+            'The standard curve the existing estimates were computed with.'),
+        'table': (
+            'A FeatureTable containing only the samples to add.'),
+    },
+    parameter_descriptions={
+        'extraction_mass_g': (
+            'The column in the sample metadata that describes the sample '
+            '(e.g. stool, tissue, soil, etc) mass (in grams - typically '
+            'converted from mg)'),
+        'min_total_reads': (
+            'The minimum threshold to apply. Defaults to the one the '
+            'standard curve was fit with, and must match it if set.'),
+        'pcr_template_vol': (
+            'The volume of DNA used as template in the '
+            'library prep (PCR reaction)'),
+        'dna_extract_vol': (
+            'The final elution volume used during DNA extraction')},
+    output_descriptions={
+        'estimated_biomass': (
+            'The existing and new biomass estimates, sorted by sample ID.')
+        },
+    name='Append new samples to existing biomass estimates.',
+    description='Estimate the biomass of new samples with a stored standard '
+                'curve and merge them into existing estimates, without '
+                'recomputing the existing samples.',
+    citations=[]
+)
+
+plugin.methods.register_function(
+    function=profiled(filter_table),
+    inputs={
+        'table': FeatureTable[Frequency],
+        'taxonomy': FeatureData[Taxonomy],
+    },
+    parameters={
+        'control': Str % Choices(CONTROLS),
+        'threshold': Int % Range(1, 100),
+        'positive_control_value': Str,
+        'positive_control_column': MetadataColumn[Categorical],
+        'cell_count_column': MetadataColumn[Numeric],
+        'asv': Str,
+    },
+    outputs=[('filtered_table', FeatureTable[Frequency]),
+             ('threshold', KatharoSeqThreshold)],
+    input_descriptions={
+        'table': (
+            'A FeatureTable collapsed to the genus level (level 6) that '
+            'contains the control samples, or an ASV table together with '
+            'its taxonomy.'
+        ),
+        'taxonomy': (
+            'The taxonomy of the features of an ASV table. The positive '
+            'controls are collapsed to the genus level with it, so the '
+            'table does not have to be collapsed beforehand.'
+        ),
+    },
+    parameter_descriptions={
+        'control': (
+            'The type of positive control used. auto fits every kit and '
+            'keeps the one that fits the positive controls best.'
+        ),
+        'threshold': (
+            'Threshold to use in calculating minimum frequency. '
+            'Must be int in [1,99].'
+        ),
+        'positive_control_value': (
+            'The value in the control column that demarks which samples are '
+            'the positive controls.'
+        ),
+        'positive_control_column': (
+            'The column in the sample metadata that describes which samples '
+            'are and are not controls.'
+        ),
+        'asv': (
+            'Specify an exact ASV to use for a control. If the features are '
+            'hashed, please use the feature hash'
+        ),
+    },
+    output_descriptions={
+        'filtered_table': (
+            'The samples whose total frequency is at least the minimum '
+            'frequency. Features left without counts are removed.'),
+        'threshold': 'The fitted curve and the minimum frequency used.',
+    },
+    name='Filter samples using the KatharoSeq read count threshold.',
+    description='Fit the KatharoSeq curve to the positive controls and '
+                'remove the samples below the resulting minimum frequency, '
+                'without loading the table a second time.',
+    citations=[]
+)
+
+plugin.methods.register_function(
+    function=profiled(fit_threshold),
+    inputs={
+        'table': FeatureTable[Frequency],
+        'taxonomy': FeatureData[Taxonomy],
+        'totals': ReadTotals,
+    },
+    parameters={
+        'control': Str % Choices(CONTROLS),
+        'threshold': Int % Range(1, 100),
+        'positive_control_value': Str,
+        'positive_control_column': MetadataColumn[Categorical],
+        'cell_count_column': MetadataColumn[Numeric],
+        'asv': Str,
+    },
+    outputs=[('threshold', KatharoSeqThreshold)],
+    input_descriptions={
+        'table': (
+            'A FeatureTable collapsed to the genus level (level 6) that '
+            'contains the control samples, or an ASV table together with '
+            'its taxonomy.'
+        ),
+        'taxonomy': (
+            'The taxonomy of the features of an ASV table. The positive '
+            'controls are collapsed to the genus level with it, so the '
+            'table does not have to be collapsed beforehand.'
+        ),
+        'totals': (
+            'The total reads of every sample of the table, as computed by '
+            'read-totals. They are summed from the table if not given.'
+        ),
+    },
+    parameter_descriptions={
+        'control': (
+            'The type of positive control used. auto fits every kit and '
+            'keeps the one that fits the positive controls best.'
+        ),
+        'threshold': (
+            'Threshold to use in calculating minimum frequency. '
+            'Must be int in [1,99].'
+        ),
+        'positive_control_value': (
+            'The value in the control column that demarks which samples are '
+            'the positive controls.'
+        ),
+        'positive_control_column': (
+            'The column in the sample metadata that describes which samples '
+            'are and are not controls.'
+        ),
+        'asv': (
+            'Specify an exact ASV to use for a control. If the features are '
+            'hashed, please use the feature hash'
+        ),
+    },
+    output_descriptions={
+        'threshold': (
+            'The fitted h and k\' parameters and their covariance, the '
+            'minimum frequency at the requested and the 50, 70 and 90 '
+            'percent thresholds, and a summary of the positive controls.'),
+    },
+    name='Fit the KatharoSeq read count threshold.',
+    description='Fit the KatharoSeq curve to the positive controls and '
+                'store the results in a machine-readable artifact.',
+    citations=[]
+)
+
+plugin.visualizers.register_function(
+    function=profiled(threshold_plot),
+    inputs={
+        'threshold': KatharoSeqThreshold,
+    },
+    parameters={},
+    input_descriptions={
+        'threshold': 'The fitted KatharoSeq read count threshold.',
+    },
+    parameter_descriptions={},
+    name='Plot a fitted KatharoSeq read count threshold.',
+    description='Render the read_count_threshold visualization from a '
+                'stored fit, without refitting or loading the table.',
+    citations=[]
+)
+
+plugin.visualizers.register_function(
+    function=profiled(rank_thresholds),
+    inputs={
+        'table': FeatureTable[Frequency],
+        'taxonomy': FeatureData[Taxonomy],
+    },
+    parameters={
+        'control': Str % Choices(KITS + [AUTO]),
+        'threshold': Int % Range(1, 100),
+        'positive_control_value': Str,
+        'positive_control_column': MetadataColumn[Categorical],
+        'cell_count_column': MetadataColumn[Numeric],
+        'levels': List[Int % Range(1, 7)],
+    },
+    input_descriptions={
+        'table': 'An ASV FeatureTable that contains the control samples.',
+        'taxonomy': 'The taxonomy of the features of the table.',
+    },
+    parameter_descriptions={
+        'control': (
+            'The type of positive control used. auto fits every kit and '
+            'keeps the one that fits the positive controls best.'
+        ),
+        'threshold': (
+            'Threshold to use in calculating minimum frequency. '
+            'Must be int in [1,99].'
+        ),
+        'positive_control_value': (
+            'The value in the control column that demarks which samples are '
+            'the positive controls.'
+        ),
+        'positive_control_column': (
+            'The column in the sample metadata that describes which samples '
+            'are and are not controls.'
+        ),
+        'levels': (
+            'The taxonomic levels, as in taxa collapse, at which reads '
+            'assigned to the kit taxa count as correct (default: 4, 5 and '
+            '6, order to genus).'
+        ),
+    },
+    name='KatharoSeq read count thresholds by taxonomic rank.',
+    description='Fit the KatharoSeq curve of an ASV table at several '
+                'taxonomic ranks from one load of the table, and show the '
+                'thresholds of the ranks side by side.',
+    citations=[]
+)
+
+plugin.methods.register_function(
+    function=profiled(fit_threshold_collection),
+    inputs={
+        'tables': Collection[FeatureTable[Frequency]],
+    },
+    parameters={
+        'control': Str % Choices(CONTROLS),
+        'threshold': Int % Range(1, 100),
+        'positive_control_value': Str,
+        'positive_control_column': MetadataColumn[Categorical],
+        'cell_count_column': MetadataColumn[Numeric],
+        'asv': Str,
+        'n_jobs': Int % Range(0, None),
+    },
+    outputs=[('thresholds', Collection[KatharoSeqThreshold])],
+    input_descriptions={
+        'tables': (
+            'FeatureTables collapsed to the genus level (level 6), e.g. one '
+            'per study or sequencing run, that contain the control samples.'
+        ),
+    },
+    parameter_descriptions={
+        'control': ('The type of positive control used. auto fits every '
+                    'kit and keeps the one that fits the positive controls '
+                    'best.'),
+        'threshold': (
+            'Threshold to use in calculating minimum frequency. '
+            'Must be int in [1,99].'
+        ),
+        'positive_control_value': (
+            'The value in the control column that demarks which samples are '
+            'the positive controls.'
+        ),
+        'positive_control_column': (
+            'The column in the sample metadata that describes which samples '
+            'are and are not controls.'
+        ),
+        'cell_count_column': (
+            'The column in the sample metadata that describes the cell '
+            'counts of the positive controls.'
+        ),
+        'asv': (
+            'Specify an exact ASV to use for a control. If the features are '
+            'hashed, please use the feature hash'
+        ),
+        'n_jobs': (
+            'The number of worker processes the tables are fitted on. 0 uses '
+            'every available CPU.'
+        ),
+    },
+    output_descriptions={
+        'thresholds': 'The fitted read count threshold of every table.',
+    },
+    name='Fit the KatharoSeq read count threshold of many tables.',
+    description='Fit the KatharoSeq curve to the positive controls of every '
+                'table in a collection. Each table is loaded and fitted in '
+                'its own worker process.',
+    citations=[]
+)
+
+plugin.methods.register_function(
+    function=profiled(estimating_biomass_collection),
+    inputs={
+        'tables': Collection[FeatureTable[Frequency]],
+    },
+    parameters={'control_cell_extraction': MetadataColumn[Numeric],
+                'positive_control_column': MetadataColumn[Categorical],
+                'positive_control_value': Str,
+                'extraction_mass_g': MetadataColumn[Numeric],
+                'min_total_reads': Int,
+                'pcr_template_vol': Int,
+                'dna_extract_vol': Int,
+                'n_jobs': Int % Range(0, None)},
+    outputs=[('estimated_biomass', Collection[EstimatedBiomass])],
+    input_descriptions={
+        'tables': (
+            'FeatureTables collapsed to the genus level (level 6), e.g. one '
+            'per study or sequencing run, that contain the control samples.'
+        ),
+    },
+    parameter_descriptions={
+        'control_cell_extraction': (
+            'The estimated number of cells or genomes used as input to your '
+            'library prep.'),
+        'positive_control_column': (
+            'The column in the sample metadata that describes which samples '
+            'are and are not controls.'),
+        'positive_control_value': (
+            'The value in the control column that demarks which samples are '
+            'the positive controls.'),
+        'extraction_mass_g': (
+            'The column in the sample metadata that describes the sample '
+            '(e.g. stool, tissue, soil, etc) mass (in grams - typically '
+            'converted from mg)'),
+        'min_total_reads': 'The minimum threshold to apply.',
+        'pcr_template_vol': (
+            'The volume of DNA used as template in the '
+            'library prep (PCR reaction)'),
+        'dna_extract_vol': (
+            'The final elution volume used during DNA extraction'),
+        'n_jobs': (
+            'The number of worker processes the tables are processed on. 0 '
+            'uses every available CPU.')},
+    output_descriptions={
+        'estimated_biomass': (
+            'The estimated biomass of the samples of every table.')
+        },
+    name='Estimate the biomass of the samples of many tables.',
+    description='Estimate the biomass of the samples of every table in a '
+                'collection. Each table is loaded and processed in its own '
+                'worker process.',
+    citations=[]
+)
+
+plugin.methods.register_function(
+    function=profiled(select_group),
+    inputs={
+        'table': FeatureTable[Frequency],
+    },
+    parameters={
+        'group_column': MetadataColumn[Categorical],
+        'group': Str,
+    },
+    outputs=[('selected_table', FeatureTable[Frequency])],
+    input_descriptions={
+        'table': 'The feature table to select the samples from.',
+    },
+    parameter_descriptions={
+        'group_column': (
+            'The column in the sample metadata that assigns every sample to '
+            'a group, e.g. its plate or sequencing run.'
+        ),
+        'group': 'The group whose samples are selected.',
+    },
+    output_descriptions={
+        'selected_table': (
+            'The samples of the group, without the features they do not '
+            'contain.'),
+    },
+    name='Select the samples of one group.',
+    description='Select the samples of one group of a feature table, e.g. '
+                'a single plate, so that its positive controls can be fitted '
+                'on their own.',
+    citations=[]
+)
+
+plugin.methods.register_function(
+    function=profiled(read_totals),
+    inputs={
+        'table': FeatureTable[Frequency],
+    },
+    parameters={},
+    outputs=[('totals', ReadTotals)],
+    input_descriptions={
+        'table': 'The feature table to sum the reads of.',
+    },
+    parameter_descriptions={},
+    output_descriptions={
+        'totals': 'The total reads of every sample.',
+    },
+    name='Sum the reads of every sample.',
+    description='Sum the reads of every sample of a feature table, e.g. of '
+                'one group selected by select-group, for fit-threshold.',
+    citations=[]
+)
+
+plugin.pipelines.register_function(
+    function=profiled(group_thresholds),
+    inputs={
+        'table': FeatureTable[Frequency],
+    },
+    parameters={
+        'control': Str % Choices(CONTROLS),
+        'threshold': Int % Range(1, 100),
+        'positive_control_value': Str,
+        'positive_control_column': MetadataColumn[Categorical],
+        'cell_count_column': MetadataColumn[Numeric],
+        'group_column': MetadataColumn[Categorical],
+        'asv': Str,
+    },
+    outputs=[('thresholds', Collection[KatharoSeqThreshold]),
+             ('visualizations', Collection[Visualization])],
+    input_descriptions={
+        'table': (
+            'A FeatureTable collapsed to the genus level (level 6) that '
+            'contains the control samples of every group.'
+        ),
+    },
+    parameter_descriptions={
+        'control': ('The type of positive control used. auto fits every '
+                    'kit and keeps the one that fits the positive controls '
+                    'best.'),
+        'threshold': (
+            'Threshold to use in calculating minimum frequency. '
+            'Must be int in [1,99].'
+        ),
+        'positive_control_value': (
+            'The value in the control column that demarks which samples are '
+            'the positive controls.'
+        ),
+        'positive_control_column': (
+            'The column in the sample metadata that describes which samples '
+            'are and are not controls.'
+        ),
+        'cell_count_column': (
+            'The column in the sample metadata that describes the cell '
+            'counts of the positive controls.'
+        ),
+        'group_column': (
+            'The column in the sample metadata that assigns every sample to '
+            'a group, e.g. its plate or sequencing run. Every group needs '
+            'its own positive controls.'
+        ),
+        'asv': (
+            'Specify an exact ASV to use for a control. If the features are '
+            'hashed, please use the feature hash'
+        ),
+    },
+    output_descriptions={
+        'thresholds': 'The fitted read count threshold of every group.',
+        'visualizations': 'The read count threshold plot of every group.',
+    },
+    name='Fit a KatharoSeq read count threshold per group.',
+    description='Fit and plot the KatharoSeq read count threshold of every '
+                'group of samples, e.g. every plate. Selecting, summing, '
+                'fitting and plotting every group are independent actions, '
+                'so they run concurrently when the pipeline is run with '
+                '--parallel.',
+    citations=[]
+)
+
 importlib.import_module('q2_katharoseq._transformer')
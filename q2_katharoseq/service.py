@@ -0,0 +1,244 @@
+# A long-lived local service that keeps the scientific stack imported and
+# holds the loaded tables and every fit it computed in memory, so repeated
+# threshold and biomass queries skip interpreter startup and refitting. It
+# only listens on localhost and speaks JSON over HTTP:
+#
+#   python -m q2_katharoseq.service --port 8765
+#
+#   POST /load       {name, table, metadata}
+#   POST /threshold  {name, threshold, positive_control_value,
+#                     positive_control_column, cell_count_column, control,
+#                     asv}
+#   POST /biomass    {name, control_cell_extraction, min_total_reads,
+#                     positive_control_value, positive_control_column,
+#                     pcr_template_vol, dna_extract_vol, extraction_mass_g,
+#                     samples}
+#   POST /unload     {name}
+#   GET  /status
+import argparse
+import itertools
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import qiime2
+
+from ._io import load_table
+from ._fit import (fit_table_threshold, fit_lm, estimate_biomass,
+                   totals_frame)
+
+
+THRESHOLD_PARAMS = ['threshold', 'positive_control_value',
+                    'positive_control_column', 'cell_count_column', 'control',
+                    'asv']
+BIOMASS_PARAMS = ['control_cell_extraction', 'min_total_reads',
+                  'positive_control_value', 'positive_control_column',
+                  'pcr_template_vol', 'dna_extract_vol', 'extraction_mass_g']
+
+
+class KatharoSeqService:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._fits = {}
+        # every load gets a new generation, so a fit of a table that was
+        # replaced while it ran is never stored for its successor
+        self._generations = itertools.count()
+
+    def load(self, name, table, metadata):
+        table = load_table(table)
+        # biomass only uses the total reads of a sample, so they are summed
+        # once here rather than densifying the table
+        loaded = {'table': table,
+                  'metadata': qiime2.Metadata.load(metadata),
+                  'totals': totals_frame(table)}
+        with self._lock:
+            loaded['generation'] = next(self._generations)
+            self._tables[name] = loaded
+            # fits of a previous table with the same name are stale
+            self._fits = {k: v for k, v in self._fits.items()
+                          if k[1] != name}
+        ids = loaded['table'].ids(axis='sample')
+        return {'name': name, 'n_samples': len(ids),
+                'n_features': len(loaded['table'].ids(axis='observation'))}
+
+    def unload(self, name):
+        with self._lock:
+            self._get(name)
+            del self._tables[name]
+            self._fits = {k: v for k, v in self._fits.items()
+                          if k[1] != name}
+        return {'name': name}
+
+    def status(self):
+        with self._lock:
+            return {'tables': sorted(self._tables), 'fits': len(self._fits)}
+
+    def _get(self, name):
+        if name not in self._tables:
+            raise KeyError(f"No table named '{name}' is loaded.")
+        return self._tables[name]
+
+    def _params(self, params, names):
+        unknown = sorted(set(params) - set(names))
+        if unknown:
+            raise ValueError(f"Unknown parameters: {', '.join(unknown)}.")
+        return {p: params.get(p) for p in names}
+
+    def _cached(self, kind, name, params, compute):
+        with self._lock:
+            loaded = self._get(name)
+            key = (kind, name, loaded['generation'],
+                   json.dumps(params, sort_keys=True))
+            if key in self._fits:
+                return self._fits[key]
+        # fits are computed outside of the lock; two identical concurrent
+        # queries may both fit, but they produce the same result
+        result = compute(loaded)
+        with self._lock:
+            if self._tables.get(name) is loaded:
+                self._fits[key] = result
+        return result
+
+    def _column(self, loaded, column):
+        return loaded['metadata'].get_column(column)
+
+    def threshold(self, name, **params):
+        params = self._params(params, THRESHOLD_PARAMS)
+
+        def compute(loaded):
+            args = dict(params)
+            for column in 'positive_control_column', 'cell_count_column':
+                args[column] = self._column(loaded, params[column])
+            return fit_table_threshold(loaded['table'], **args)[0]
+
+        return self._cached('threshold', name, params, compute)
+
+    def biomass(self, name, samples=None, **params):
+        params = self._params(params, BIOMASS_PARAMS)
+
+        def compute(loaded):
+            slope, intercept, filtered, _ = fit_lm(
+                loaded['totals'], params['min_total_reads'],
+                self._column(loaded, params['positive_control_column']),
+                params['positive_control_value'],
+                self._column(loaded, params['control_cell_extraction']))
+            estimates = estimate_biomass(
+                filtered, slope, intercept,
+                params['pcr_template_vol'], params['dna_extract_vol'],
+                self._column(loaded, params['extraction_mass_g']))
+            return {'slope': slope, 'intercept': intercept,
+                    'estimates': estimates['estimated_cells_per_g']}
+
+        fit = self._cached('biomass', name, params, compute)
+        estimates = fit['estimates']
+        if samples is not None:
+            estimates = estimates.reindex(samples)
+        return {'slope': fit['slope'], 'intercept': fit['intercept'],
+                'estimated_cells_per_g': {
+                    k: None if v != v else v
+                    for k, v in estimates.items()}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    routes = {'/load': 'load', '/unload': 'unload',
+              '/threshold': 'threshold', '/biomass': 'biomass'}
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path != '/status':
+            return self._reply(404, {'error': f'Unknown path {self.path}'})
+        self._reply(200, self.server.service.status())
+
+    def do_POST(self):
+        if self.path not in self.routes:
+            return self._reply(404, {'error': f'Unknown path {self.path}'})
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            method = getattr(self.server.service, self.routes[self.path])
+            self._reply(200, method(**request))
+        except KeyError as e:
+            self._reply(404, {'error': e.args[0] if e.args else str(e)})
+        except (ValueError, TypeError, OSError) as e:
+            self._reply(400, {'error': str(e)})
+        except Exception as e:
+            self._reply(500, {'error': f'{type(e).__name__}: {e}'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(port=0, service=None):
+    server = ThreadingHTTPServer(('127.0.0.1', port), _Handler)
+    server.daemon_threads = True
+    server.service = service if service is not None else KatharoSeqService()
+    return server
+
+
+class Client:
+    def __init__(self, port, host='127.0.0.1', timeout=None):
+        self.url = f'http://{host}:{port}'
+        self.timeout = timeout
+
+    def _request(self, path, body=None):
+        data = None if body is None else json.dumps(body).encode('utf-8')
+        request = urllib.request.Request(
+            self.url + path, data=data,
+            headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request,
+                                        timeout=self.timeout) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            error = json.load(e).get('error', str(e))
+            if e.code == 404:
+                raise KeyError(error) from None
+            if e.code == 400:
+                raise ValueError(error) from None
+            raise RuntimeError(error) from None
+
+    def status(self):
+        return self._request('/status')
+
+    def load(self, name, table, metadata):
+        return self._request('/load', {'name': name, 'table': table,
+                                       'metadata': metadata})
+
+    def unload(self, name):
+        return self._request('/unload', {'name': name})
+
+    def threshold(self, name, **params):
+        return self._request('/threshold', dict(params, name=name))
+
+    def biomass(self, name, **params):
+        return self._request('/biomass', dict(params, name=name))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Serve KatharoSeq fits on localhost.')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.port)
+    print(f'Serving on http://127.0.0.1:{server.server_address[1]}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
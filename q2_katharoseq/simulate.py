@@ -0,0 +1,130 @@
+# Synthetic KatharoSeq data for benchmarks and stress tests. A positive
+# control of a dilution series gets a read depth that grows with its input
+# cells, and the share of its reads that hit the kit taxa follows the
+# allosteric sigmoid of its log10 depth; the remaining reads go to a small
+# pool of contaminants. Study samples draw their features from a skewed
+# popularity distribution over the whole table. Every step is vectorized
+# over the samples, so a table of a million samples takes seconds.
+import numpy as np
+import pandas as pd
+
+from .core import control_type, allosteric_sigmoid
+
+
+# the fit of the FMP example, on log10 reads
+H = 16.6
+K_PRIME = 1.8e7
+
+# cells into extraction of a ten-fold dilution series
+DILUTIONS = 10.0 ** np.arange(6, -2, -1)
+
+# log10 depth of a positive control = READ_INTERCEPT + READ_SLOPE * log10
+# cells, as in the FMP example
+READ_INTERCEPT = 2.9
+READ_SLOPE = 0.29
+
+# the metadata columns of the FMP example
+POSITIVE_CONTROL_COLUMN = 'control_rct'
+CELL_COUNT_COLUMN = 'control_cell_into_extraction'
+EXTRACTION_MASS_COLUMN = 'extraction_mass_g'
+
+
+def kit_features(control, asv='ASV'):
+    if control not in control_type:
+        raise ValueError(f"Unknown control type '{control}'. Choose from "
+                         f"{sorted(control_type)}.")
+    if control == 'asv':
+        return [asv]
+    return list(control_type[control])
+
+
+def dilution_series(control='classic', dilutions=DILUTIONS, replicates=3,
+                    h=H, k_prime=K_PRIME, n_contaminants=20, asv='ASV',
+                    seed=None):
+    # returns the controls x (kit + contaminants) counts, the feature IDs and
+    # the cells into extraction of each control
+    rng = np.random.default_rng(seed)
+    kit = kit_features(control, asv)
+    cells = np.tile(np.asarray(dilutions, dtype=float), replicates)
+
+    log_depth = (READ_INTERCEPT + READ_SLOPE * np.log10(cells) +
+                 rng.normal(0, 0.1, len(cells)))
+    depth = np.round(10 ** log_depth).astype(np.int64)
+    correct = allosteric_sigmoid(np.log10(depth), h, k_prime)
+
+    # the contaminants keep their relative abundances across the series
+    contaminants = rng.lognormal(0, 1, n_contaminants)
+    contaminants /= contaminants.sum()
+    pvals = np.hstack([
+        np.outer(correct, np.full(len(kit), 1 / len(kit))),
+        np.outer(1 - correct, contaminants)])
+    counts = rng.multinomial(depth, pvals)
+
+    feature_ids = kit + [f'contaminant-{i}' for i in range(n_contaminants)]
+    return counts, feature_ids, cells
+
+
+def simulate_study(n_samples, n_features, control='classic',
+                   dilutions=DILUTIONS, replicates=3, h=H, k_prime=K_PRIME,
+                   n_contaminants=20, features_per_sample=50, log_depth=4.0,
+                   log_depth_sd=0.5, asv='ASV', seed=None):
+    # returns a features x samples biom.Table whose first samples are the
+    # positive controls, and the matching sample metadata
+    import biom
+    from scipy.sparse import csc_matrix, hstack
+
+    rng = np.random.default_rng(seed)
+    controls, control_features, cells = dilution_series(
+        control, dilutions, replicates, h, k_prime, n_contaminants, asv,
+        rng)
+    n_controls = len(cells)
+    n_study = n_samples - n_controls
+    if n_study < 0:
+        raise ValueError(f'{n_samples} samples cannot hold the '
+                         f'{n_controls} positive controls.')
+    if n_features < len(control_features):
+        raise ValueError(f'{n_features} features cannot hold the '
+                         f'{len(control_features)} control and contaminant '
+                         f'features.')
+
+    # study samples: features drawn log-uniformly over the table, so a few
+    # are common and most are rare, with lognormal abundances and Poisson
+    # reads, which are multinomial given the sample depth
+    k = min(features_per_sample, n_features)
+    features = np.power(np.float32(n_features + 1),
+                        rng.random((n_study, k), dtype=np.float32))
+    features = np.minimum(features.astype(np.int32) - 1, n_features - 1)
+    features.sort(axis=1)
+    weights = np.exp(rng.standard_normal((n_study, k), dtype=np.float32))
+    depth = 10 ** rng.normal(log_depth, log_depth_sd, n_study)
+    reads = rng.poisson((depth / weights.sum(axis=1))[:, None] * weights)
+
+    study = csc_matrix((reads.ravel().astype(float), features.ravel(),
+                        np.arange(0, n_study * k + 1, k)),
+                       shape=(n_features, n_study))
+    study.has_sorted_indices = True
+    study.sum_duplicates()
+    control_part = csc_matrix(
+        (controls.T.ravel().astype(float),
+         (np.repeat(np.arange(len(control_features)), n_controls),
+          np.tile(np.arange(n_controls), len(control_features)))),
+        shape=(n_features, n_controls))
+    matrix = hstack([control_part, study], format='csc').tocsr()
+    matrix.eliminate_zeros()
+
+    # the kit taxa and contaminants come first, so the study samples also
+    # pick them up now and then
+    feature_ids = control_features + [
+        f'F{i}' for i in range(n_features - len(control_features))]
+    sample_ids = [f'control-{i}' for i in range(n_controls)] + [
+        f'S{i}' for i in range(n_study)]
+    table = biom.Table(matrix, feature_ids, sample_ids)
+
+    metadata = pd.DataFrame(
+        {POSITIVE_CONTROL_COLUMN: np.repeat(['control', 'sample'],
+                                            [n_controls, n_study]),
+         CELL_COUNT_COLUMN: np.concatenate(
+             [cells, np.full(n_study, np.nan)]),
+         EXTRACTION_MASS_COLUMN: rng.uniform(0.01, 0.5, n_samples)},
+        index=pd.Index(sample_ids, name='sample_name'))
+    return table, metadata
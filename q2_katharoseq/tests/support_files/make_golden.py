@@ -0,0 +1,124 @@
+# Writes the golden outputs test_equivalence compares against. They come from
+# the original implementation, not from this tree, so that a mistake shared by
+# the rewritten code and its tests cannot pass unnoticed:
+#
+#   git worktree add /tmp/baseline 500089c
+#   python q2_katharoseq/tests/support_files/make_golden.py /tmp/baseline
+#
+# read_count_threshold of the baseline only renders its fit, so the fitted
+# parameters and the minimum frequency are captured from its calls to
+# curve_fit and q2templates.render.
+import importlib.util
+import json
+import sys
+import tempfile
+from os.path import dirname, abspath, join
+
+import biom
+import pandas as pd
+import qiime2
+
+from q2_katharoseq.simulate import simulate_study
+from q2_katharoseq.tests.test_equivalence import (GRID, BIOMASS_SAMPLES,
+                                                  fingerprint)
+
+
+HERE = dirname(abspath(__file__))
+EXAMPLE = join(HERE, '..', '..', '..', 'example')
+
+THRESHOLDS = [50, 70, 90]
+
+
+def load_baseline(checkout):
+    spec = importlib.util.spec_from_file_location(
+        'baseline_methods', join(checkout, 'q2_katharoseq', '_methods.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def baseline_threshold(baseline, frame, metadata, control, asv):
+    fits, contexts = [], []
+    curve_fit = baseline.curve_fit
+
+    def record_fit(f, xdata, ydata, **kwargs):
+        popt, pcov = curve_fit(f, xdata, ydata, **kwargs)
+        fits.append((xdata.copy(), ydata.copy(), popt))
+        return popt, pcov
+
+    baseline.curve_fit = record_fit
+    baseline.q2templates.render = \
+        lambda template, output_dir, context=None: contexts.append(context)
+    try:
+        thresholds = {}
+        for threshold in THRESHOLDS:
+            with tempfile.TemporaryDirectory() as output_dir:
+                baseline.read_count_threshold(
+                    output_dir, threshold, 'control',
+                    qiime2.CategoricalMetadataColumn(
+                        metadata['control_rct']),
+                    qiime2.NumericMetadataColumn(
+                        metadata['control_cell_into_extraction']),
+                    frame.copy(), control, asv)
+            thresholds[str(threshold)] = int(
+                contexts[-1]['minimum_frequency'])
+    finally:
+        baseline.curve_fit = curve_fit
+
+    log_asv_reads, correct_assign, popt = fits[0]
+    return {'h': float(popt[0]), 'k_prime': float(popt[1]),
+            'thresholds': thresholds,
+            'controls': {
+                'sample_id': [str(i) for i in log_asv_reads.index],
+                'log_asv_reads': log_asv_reads.tolist(),
+                'correct_assign': correct_assign.tolist()}}
+
+
+def baseline_biomass(baseline, frame, metadata, min_total_reads):
+    return baseline.estimating_biomass(
+        frame,
+        qiime2.NumericMetadataColumn(
+            metadata['control_cell_into_extraction']),
+        min_total_reads, 'control',
+        qiime2.CategoricalMetadataColumn(metadata['control_rct']), 5, 60,
+        qiime2.NumericMetadataColumn(metadata['extraction_mass_g']))
+
+
+def main(checkout):
+    baseline = load_baseline(checkout)
+    thresholds = {}
+    biomass = []
+
+    artifact = qiime2.Artifact.load(join(EXAMPLE, 'fmp_collapsed_table.qza'))
+    metadata = qiime2.Metadata.load(join(EXAMPLE, 'fmp_metadata.tsv'))
+    metadata = pd.DataFrame({
+        c: metadata.get_column(c).to_series()
+        for c in ['control_rct', 'control_cell_into_extraction',
+                  'extraction_mass_g']})
+    thresholds['example'] = baseline_threshold(
+        baseline, artifact.view(biom.Table).to_dataframe(dense=True).T,
+        metadata, 'classic', None)
+
+    for n_samples, n_features, control in GRID:
+        asv = 'ASV' if control == 'asv' else None
+        table, metadata = simulate_study(n_samples, n_features,
+                                         control=control, seed=n_samples)
+        frame = table.to_dataframe(dense=True).T
+        case = f'{control}-{n_samples}'
+        thresholds[case] = dict(
+            baseline_threshold(baseline, frame, metadata, control, asv),
+            n_samples=n_samples, n_features=n_features, control=control,
+            fingerprint=fingerprint(table))
+        if n_samples == BIOMASS_SAMPLES:
+            estimates = baseline_biomass(baseline, frame, metadata, 100)
+            estimates.insert(0, 'case', case)
+            biomass.append(estimates)
+
+    with open(join(HERE, 'golden_thresholds.json'), 'w') as fh:
+        json.dump(thresholds, fh, indent=1, sort_keys=True)
+        fh.write('\n')
+    pd.concat(biomass).to_csv(join(HERE, 'golden_biomass.csv'))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1])
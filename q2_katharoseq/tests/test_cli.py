@@ -0,0 +1,172 @@
+from unittest import TestCase, main
+
+import io
+import json
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stderr
+from os.path import dirname, abspath, join
+
+import biom
+import pandas as pd
+import qiime2
+
+from q2_katharoseq import fit_threshold, estimating_biomass
+from q2_katharoseq._io import load_table
+from q2_katharoseq.cli import main as cli
+
+
+class CLITests(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.fp = join(dirname(abspath(__file__)), '..', '..', 'example')
+        self.table = join(self.fp, 'fmp_collapsed_table.qza')
+        self.metadata = join(self.fp, 'fmp_metadata.tsv')
+        self.threshold_args = [
+            '--metadata', self.metadata,
+            '--positive-control-column', 'control_rct',
+            '--positive-control-value', 'control',
+            '--cell-count-column', 'control_cell_into_extraction',
+            '--control', 'classic',
+            '--threshold', '90']
+        self.biomass_args = [
+            '--metadata', self.metadata,
+            '--positive-control-column', 'control_rct',
+            '--positive-control-value', 'control',
+            '--control-cell-extraction', 'control_cell_into_extraction',
+            '--min-total-reads', '1150',
+            '--pcr-template-vol', '5',
+            '--dna-extract-vol', '60',
+            '--extraction-mass-g', 'extraction_mass_g']
+
+    def test_load_table(self):
+        table = load_table(self.table)
+        path = join(self.temp_dir.name, 'table.biom')
+        with open(path, 'w') as fh:
+            fh.write(table.to_json('test'))
+
+        self.assertEqual(load_table(path), table)
+        self.assertEqual(
+            table, qiime2.Artifact.load(self.table).view(biom.Table))
+
+    def test_threshold(self):
+        output = join(self.temp_dir.name, 'threshold.json')
+        self.assertEqual(
+            cli(['threshold', self.table, '-o', output] +
+                self.threshold_args), 0)
+
+        with open(output) as fh:
+            obs = json.load(fh)
+        data = qiime2.Metadata.load(self.metadata)
+        exp = fit_threshold(
+            90, 'control', data.get_column('control_rct'),
+            data.get_column('control_cell_into_extraction'),
+            qiime2.Artifact.load(self.table).view(pd.DataFrame), 'classic')
+        self.assertEqual(obs['min_freq'], exp['min_freq'])
+        self.assertEqual(obs['thresholds'], exp['thresholds'])
+
+    def test_threshold_taxonomy(self):
+        # the example split into one ASV per genus and sample
+        table = load_table(self.table)
+        genera = table.ids(axis='observation')
+        asvs = table.copy()
+        asvs.update_ids({g: f'asv{i}' for i, g in enumerate(genera)},
+                        axis='observation')
+        path = join(self.temp_dir.name, 'asv.biom')
+        with open(path, 'w') as fh:
+            fh.write(asvs.to_json('test'))
+        taxonomy = join(self.temp_dir.name, 'taxonomy.tsv')
+        pd.DataFrame({'Feature ID': [f'asv{i}' for i in range(len(genera))],
+                      'Taxon': ['; '.join(g.split(';')) for g in genera]}
+                     ).to_csv(taxonomy, sep='\t', index=False)
+
+        fits = []
+        for args in [[self.table], [path, '--taxonomy', taxonomy]]:
+            output = join(self.temp_dir.name, f'{len(fits)}.json')
+            self.assertEqual(
+                cli(['threshold'] + args + ['-o', output] +
+                    self.threshold_args), 0)
+            with open(output) as fh:
+                fits.append(json.load(fh))
+        exp, obs = fits
+        self.assertEqual(obs['min_freq'], exp['min_freq'])
+        self.assertEqual(obs['controls'], exp['controls'])
+        # taxa with as many reads may be listed in another order
+        for o, e in zip(obs['top_taxa']['features'],
+                        exp['top_taxa']['features']):
+            self.assertEqual(o[0], e[0])
+
+    def test_biomass(self):
+        output = join(self.temp_dir.name, 'est_biomass.csv')
+        self.assertEqual(
+            cli(['biomass', self.table, '-o', output] + self.biomass_args),
+            0)
+
+        obs = pd.read_csv(output, index_col=0)
+        exp = pd.read_csv(join(self.fp, 'est_biomass_output.csv'),
+                          index_col=0)
+        pd.testing.assert_frame_equal(obs, exp)
+
+    def test_biomass_sparse_metadata(self):
+        metadata = pd.read_csv(self.metadata, sep='\t', dtype=str,
+                               keep_default_na=False, index_col=0)
+        metadata.loc[metadata['control_rct'] == 'control',
+                     'extraction_mass_g'] = ''
+        path = join(self.temp_dir.name, 'metadata.tsv')
+        metadata.to_csv(path, sep='\t')
+        output = join(self.temp_dir.name, 'est_biomass.csv')
+        args = self.biomass_args[2:]
+
+        self.assertEqual(
+            cli(['biomass', self.table, '-o', output, '--metadata', path] +
+                args), 0)
+
+        metadata = qiime2.Metadata.load(path)
+        exp = estimating_biomass(
+            qiime2.Artifact.load(self.table).view(pd.DataFrame),
+            metadata.get_column('control_cell_into_extraction'), 1150,
+            'control', metadata.get_column('control_rct'), 5, 60,
+            metadata.get_column('extraction_mass_g'))
+        obs = pd.read_csv(output, index_col=0)
+        self.assertTrue(obs['estimated_cells_per_g'].isna().any())
+        pd.testing.assert_frame_equal(obs, exp, check_names=False)
+
+    def test_batch(self):
+        runs = join(self.temp_dir.name, 'runs')
+        os.mkdir(runs)
+        for name in 'run1.qza', 'run2.qza':
+            shutil.copy(self.table, join(runs, name))
+        with open(join(runs, 'broken.biom'), 'w') as fh:
+            fh.write('not a table')
+        output_dir = join(self.temp_dir.name, 'out')
+
+        self.assertEqual(
+            cli(['batch', 'threshold', runs, '--output-dir', output_dir,
+                 '--n-jobs', '2'] + self.threshold_args), 1)
+
+        self.assertEqual(sorted(os.listdir(output_dir)),
+                         ['run1.json', 'run2.json'])
+        for name in 'run1.json', 'run2.json':
+            with open(join(output_dir, name)) as fh:
+                self.assertEqual(json.load(fh)['min_freq'], 1315)
+
+    def test_missing_arguments(self):
+        with self.assertRaises(SystemExit):
+            cli(['biomass', self.table, '--metadata', self.metadata,
+                 '--positive-control-column', 'control_rct',
+                 '--positive-control-value', 'control'])
+
+    def test_threshold_bounds(self):
+        for threshold in '0', '100':
+            with self.assertRaises(SystemExit), \
+                    redirect_stderr(io.StringIO()) as stderr:
+                cli(['threshold', self.table] + self.threshold_args[:-1] +
+                    [threshold])
+            self.assertIn('between 0 and 100', stderr.getvalue())
+
+
+if __name__ == '__main__':
+    main()
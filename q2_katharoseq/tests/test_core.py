@@ -0,0 +1,151 @@
+from unittest import TestCase, main
+
+import json
+import subprocess
+import sys
+
+import numpy as np
+from scipy import sparse
+
+from q2_katharoseq import core
+
+
+# modules an embedding pipeline must not pay for when importing the core
+FORBIDDEN_MODULES = ['qiime2', 'q2_types', 'matplotlib', 'sklearn', 'scipy',
+                     'pandas', 'biom']
+
+SCRIPT = '''
+import json, sys
+import q2_katharoseq.core
+print(json.dumps(sorted(sys.modules)))
+'''
+
+
+class CoreImportTests(TestCase):
+
+    def test_core_imports_numpy_only(self):
+        proc = subprocess.run([sys.executable, '-c', SCRIPT],
+                              capture_output=True, text=True, check=True)
+        modules = json.loads(proc.stdout.strip().splitlines()[-1])
+
+        for forbidden in FORBIDDEN_MODULES:
+            loaded = [m for m in modules
+                      if m == forbidden or m.startswith(forbidden + '.')]
+            self.assertEqual(loaded, [], '%s is imported by the core'
+                             % forbidden)
+
+
+class CoreTests(TestCase):
+
+    def setUp(self):
+        self.counts = np.array([[1, 1, 2, 3],
+                                [10, 4, 3, 2],
+                                [100, 5, 6, 7],
+                                [0, 0, 0, 9]])
+        self.feature_ids = ['a', 'b', 'c', 'd']
+
+    def test_sample_totals(self):
+        exp = [7, 19, 118, 9]
+        np.testing.assert_array_equal(core.sample_totals(self.counts), exp)
+        np.testing.assert_array_equal(
+            core.sample_totals(sparse.csr_matrix(self.counts)), exp)
+
+    def test_control_reads(self):
+        for counts in self.counts, sparse.csr_matrix(self.counts):
+            obs, present = core.control_reads(counts, self.feature_ids,
+                                              ['b', 'x', 'a'])
+            np.testing.assert_array_equal(obs, [2, 14, 105, 0])
+            self.assertEqual(present, ['b', 'a'])
+
+        obs, present = core.control_reads(self.counts, self.feature_ids,
+                                          ['x'])
+        np.testing.assert_array_equal(obs, [0, 0, 0, 0])
+        self.assertEqual(present, [])
+
+    def test_kit_reads(self):
+        feature_ids = [core.control_type['classic'][1], 'x',
+                       core.control_type['single'][0],
+                       core.control_type['classic'][0]]
+        for counts in self.counts, sparse.csr_matrix(self.counts):
+            reads, n_present = core.kit_reads(counts, feature_ids)
+            self.assertEqual(reads.shape, (4, len(core.KITS)))
+            classic = core.KITS.index('classic')
+            single = core.KITS.index('single')
+            np.testing.assert_array_equal(reads[:, classic], [4, 12, 107, 9])
+            np.testing.assert_array_equal(reads[:, single], [2, 3, 6, 0])
+            np.testing.assert_array_equal(n_present[[classic, single]],
+                                          [2, 1])
+            for kit in 'classic', 'single':
+                exp, _ = core.control_reads(counts, feature_ids,
+                                            core.control_type[kit])
+                np.testing.assert_array_equal(
+                    reads[:, core.KITS.index(kit)], exp)
+
+    def test_collapse_indicator(self):
+        self.assertEqual(core.lineage('d__Bacteria; p__Firmicutes; c__X', 2),
+                         'd__Bacteria;p__Firmicutes')
+        self.assertEqual(core.lineage('d__Bacteria; p__Firmicutes', 4),
+                         'd__Bacteria;p__Firmicutes;__;__')
+
+        taxa = ['d__A; p__B; c__C', 'd__A; p__B', 'd__A;p__D', 'd__A; p__B']
+        indicator, lineages = core.collapse_indicator(taxa, 2)
+        self.assertEqual(lineages, ['d__A;p__B', 'd__A;p__D'])
+        collapsed = sparse.csr_matrix(self.counts) @ indicator
+        np.testing.assert_array_equal(collapsed.toarray(),
+                                      [[5, 2], [16, 3], [112, 6], [9, 0]])
+
+    def test_rank_indicator(self):
+        taxa = ['d__A; p__B; c__C', 'd__A; p__B; c__D', 'd__A; p__E',
+                'd__A; p__B; c__C']
+        indicator = core.rank_indicator(taxa, ['d__A;p__B;c__C'], [1, 2, 3])
+        np.testing.assert_array_equal(
+            indicator.toarray(),
+            [[1, 1, 1], [1, 1, 0], [1, 0, 0], [1, 1, 1]])
+        reads = sparse.csr_matrix(self.counts) @ indicator
+        np.testing.assert_array_equal(reads.toarray()[:, 2], [4, 12, 107, 9])
+
+    def test_fit_sigmoid(self):
+        h, k_prime = 8.0, 2.5e3
+        log_reads = np.linspace(1.5, 4.5, 12)
+        correct_assign = core.allosteric_sigmoid(log_reads, h, k_prime)
+
+        popt, pcov = core.fit_sigmoid(log_reads, correct_assign)
+        np.testing.assert_allclose(popt, [h, k_prime], rtol=1e-4)
+
+        exp = np.power(10, np.power(k_prime / (1 / 0.9 - 1), 1 / h))
+        self.assertEqual(core.min_frequency(popt, 0.9), int(exp))
+
+        r2, rmse = core.fit_quality(log_reads, correct_assign, popt)
+        self.assertAlmostEqual(r2, 1)
+        self.assertAlmostEqual(rmse, 0)
+
+    def test_min_frequency_thresholds(self):
+        popt = (8.0, 2.5e3)
+        thresholds = np.array([0.5, 0.7, 0.9])
+
+        obs = core.min_frequency(popt, thresholds)
+        exp = [core.min_frequency(popt, t) for t in thresholds]
+        np.testing.assert_array_equal(obs, exp)
+
+        with np.errstate(over='ignore'):
+            self.assertEqual(core.min_frequency((0.5, 2.5e3), 0.99), np.inf)
+
+    def test_fit_sigmoid_without_variation(self):
+        with self.assertRaisesRegex(ValueError, 'identical correct'):
+            core.fit_sigmoid([1, 2, 3], [0.5, 0.5, 0.5])
+
+    def test_fit_standard_curve(self):
+        rng = np.random.default_rng(0)
+        log_reads = rng.uniform(3, 5, 20)
+        log_cells = 3.2 * log_reads - 9.5 + rng.normal(0, 0.1, 20)
+
+        slope, intercept = core.fit_standard_curve(log_reads, log_cells)
+        np.testing.assert_allclose([slope, intercept],
+                                   np.polyfit(log_reads, log_cells, 1))
+        np.testing.assert_allclose(
+            core.estimate_cells([4.0], slope, intercept),
+            [10 ** (4 * slope + intercept)])
+
+
+if __name__ == '__main__':
+    main()
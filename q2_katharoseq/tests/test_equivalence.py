@@ -0,0 +1,244 @@
+from unittest import TestCase, main
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from os.path import dirname, abspath, join
+
+import biom
+import numpy as np
+import pandas as pd
+import qiime2
+
+from q2_katharoseq import estimating_biomass, filter_table, fit_threshold
+from q2_katharoseq import cli
+from q2_katharoseq.core import control_type
+from q2_katharoseq.simulate import simulate_study
+
+
+# Every engine has to reproduce the golden outputs in support_files, which
+# make_golden.py wrote by running the original dense pandas and sklearn
+# implementation (500089c) on the example data and on the synthetic tables
+# below. Tolerances are (rtol, atol) per output column.
+THRESHOLD_TOLERANCES = {
+    'correct_assign': (1e-12, 0),
+    'log_asv_reads': (1e-12, 0),
+    'h': (1e-6, 0),
+    'k_prime': (1e-6, 0),
+    # the frequency is truncated to an integer, so a difference in the last
+    # bits of the fit may move it by one read
+    '50': (0, 1),
+    '70': (0, 1),
+    '90': (0, 1)}
+
+BIOMASS_TOLERANCES = {
+    'total_reads': (0, 0),
+    'log_total_reads': (1e-12, 0),
+    'estimated_biomass_per_pcrrxn': (1e-9, 0),
+    'estimated_biomass_per_dnarxn': (1e-9, 0),
+    'extraction_mass_g': (0, 0),
+    'estimated_cells_per_g': (1e-9, 0),
+    'log_estimated_cells_per_g': (1e-9, 0)}
+
+SUPPORT_FILES = join(dirname(abspath(__file__)), 'support_files')
+
+# tables of the synthetic grid: samples, features and control type; the
+# golden biomass estimates are only kept for the small tables
+GRID = [(n_samples, n_features, control)
+        for n_samples, n_features in [(100, 50), (2000, 500)]
+        for control in control_type]
+BIOMASS_SAMPLES = 100
+
+
+def fingerprint(table):
+    # the synthetic tables are regenerated rather than stored, so the golden
+    # outputs record which table they were computed from
+    matrix = table.matrix_data.tocsc()
+    digest = hashlib.sha256()
+    for part in (matrix.data.astype(np.float64), matrix.indices,
+                 matrix.indptr):
+        digest.update(np.ascontiguousarray(part).tobytes())
+    for ids in table.ids(axis='sample'), table.ids(axis='observation'):
+        digest.update('\n'.join(ids).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def deviations(expected, observed, tolerances):
+    # the largest deviation of each column, worst first
+    rows = []
+    for column, (rtol, atol) in tolerances.items():
+        if column not in expected:
+            continue
+        exp = expected[column].astype(float)
+        obs = observed[column].reindex(exp.index).astype(float)
+        # missing and infinite values have to match exactly
+        same = (exp == obs) | (exp.isna() & obs.isna())
+        error = (obs - exp).abs().where(~same, 0)
+        allowed = atol + rtol * exp.abs().where(~same, 0)
+        excess = (error - allowed).fillna(np.inf)
+        worst = excess.idxmax()
+        rows.append({'column': column,
+                     'sample': worst,
+                     'expected': exp[worst],
+                     'observed': obs[worst],
+                     'abs_error': error.max(),
+                     'rel_error': (error / exp.abs()).max(),
+                     'rtol': rtol, 'atol': atol,
+                     'ok': bool((excess <= 0).all())})
+    report = pd.DataFrame(rows).set_index('column')
+    return report.sort_values('rel_error', ascending=False)
+
+
+class EquivalenceTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        fp = join(dirname(abspath(__file__)), '..', '..', 'example')
+        artifact = qiime2.Artifact.load(join(fp, 'fmp_collapsed_table.qza'))
+        metadata = qiime2.Metadata.load(join(fp, 'fmp_metadata.tsv'))
+        cls.example = (artifact.view(biom.Table), pd.DataFrame({
+            'control_rct': metadata.get_column('control_rct').to_series(),
+            'control_cell_into_extraction': metadata.get_column(
+                'control_cell_into_extraction').to_series(),
+            'extraction_mass_g': metadata.get_column(
+                'extraction_mass_g').to_series()}))
+        cls.golden = pd.read_csv(join(fp, 'est_biomass_output.csv'),
+                                 index_col=0)
+        with open(join(SUPPORT_FILES, 'golden_thresholds.json')) as fh:
+            cls.golden_thresholds = json.load(fh)
+        cls.golden_biomass = pd.read_csv(
+            join(SUPPORT_FILES, 'golden_biomass.csv'), index_col=0,
+            dtype={'sample_name': str}, float_precision='round_trip')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def assertEquivalent(self, expected, observed, tolerances, label):
+        report = deviations(expected, observed, tolerances)
+        self.assertTrue(report['ok'].all(),
+                        f'{label} deviates from the golden output:\n'
+                        f'{report.to_string()}')
+
+    def _write(self, table, name):
+        path = os.path.join(self.temp_dir.name, name + '.biom')
+        with open(path, 'w') as fh:
+            fh.write(table.to_json('equivalence'))
+        return path
+
+    def threshold_engines(self, table, metadata, control, asv):
+        positive_controls = qiime2.CategoricalMetadataColumn(
+            metadata['control_rct'].rename('control_rct'))
+        cell_counts = qiime2.NumericMetadataColumn(
+            metadata['control_cell_into_extraction'].rename(
+                'control_cell_into_extraction'))
+        frame = table.to_dataframe(dense=True).T
+        args = argparse.Namespace(
+            threshold=90, positive_control_value='control',
+            positive_control_column='control_rct',
+            cell_count_column='control_cell_into_extraction',
+            control=control, asv=asv, taxonomy=None)
+        path = self._write(table, f'threshold-{control}-{len(frame)}')
+
+        yield 'fit_threshold', fit_threshold(
+            90, 'control', positive_controls, cell_counts, frame, control,
+            asv)
+        yield 'filter_table', filter_table(
+            table, 90, 'control', positive_controls, cell_counts, control,
+            asv)[1]
+        yield 'cli', cli.threshold(path, metadata, args)
+
+    def check_threshold(self, table, metadata, case, asv=None):
+        golden = self.golden_thresholds[case]
+        controls = pd.DataFrame(golden['controls']).set_index('sample_id')
+        scalars = pd.DataFrame(
+            dict(golden['thresholds'], h=golden['h'],
+                 k_prime=golden['k_prime']), index=['fit'])
+
+        control = golden.get('control', 'classic')
+        for engine, fit in self.threshold_engines(table, metadata, control,
+                                                  asv):
+            with self.subTest(engine=engine, case=case):
+                observed = pd.DataFrame(fit['controls']).set_index(
+                    'sample_id')
+                self.assertEqual(sorted(observed.index),
+                                 sorted(controls.index))
+                self.assertEquivalent(controls, observed,
+                                      THRESHOLD_TOLERANCES, engine)
+                self.assertEquivalent(
+                    scalars,
+                    pd.DataFrame(dict(fit['thresholds'], h=fit['h'],
+                                      k_prime=fit['k_prime']),
+                                 index=['fit']),
+                    THRESHOLD_TOLERANCES, engine)
+                self.assertEqual(fit['min_freq'], fit['thresholds']['90'])
+
+    def check_biomass(self, table, metadata, min_total_reads, expected):
+        frame = table.to_dataframe(dense=True).T
+        args = argparse.Namespace(
+            positive_control_column='control_rct',
+            positive_control_value='control',
+            control_cell_extraction='control_cell_into_extraction',
+            min_total_reads=min_total_reads, pcr_template_vol=5,
+            dna_extract_vol=60, extraction_mass_g='extraction_mass_g')
+        path = self._write(table, f'biomass-{len(frame)}')
+        engines = {
+            'estimating_biomass': estimating_biomass(
+                frame,
+                qiime2.NumericMetadataColumn(
+                    metadata['control_cell_into_extraction']),
+                min_total_reads, 'control',
+                qiime2.CategoricalMetadataColumn(metadata['control_rct']),
+                5, 60,
+                qiime2.NumericMetadataColumn(metadata['extraction_mass_g'])),
+            'cli': cli.biomass(path, metadata, args)}
+
+        for engine, observed in engines.items():
+            with self.subTest(engine=engine, n_samples=len(frame)):
+                self.assertEqual(list(observed.index), list(expected.index))
+                self.assertEquivalent(expected, observed, BIOMASS_TOLERANCES,
+                                      engine)
+
+    def test_example_threshold(self):
+        self.check_threshold(*self.example, 'example')
+
+    def test_example_biomass(self):
+        self.check_biomass(*self.example, 1150, self.golden)
+
+    def test_synthetic_grid(self):
+        for n_samples, n_features, control in GRID:
+            case = f'{control}-{n_samples}'
+            asv = 'ASV' if control == 'asv' else None
+            table, metadata = simulate_study(n_samples, n_features,
+                                             control=control, seed=n_samples)
+            self.assertEqual(fingerprint(table),
+                             self.golden_thresholds[case]['fingerprint'],
+                             f'the simulated {case} table is not the one the '
+                             f'golden outputs were computed from')
+            self.check_threshold(table, metadata, case, asv)
+            if n_samples == BIOMASS_SAMPLES:
+                expected = self.golden_biomass[
+                    self.golden_biomass['case'] == case].drop(columns='case')
+                self.check_biomass(table, metadata, 100, expected)
+
+    def test_deviations(self):
+        expected = pd.DataFrame({'a': [1.0, 2.0], 'b': [10.0, 20.0]},
+                                index=['s1', 's2'])
+        observed = pd.DataFrame({'a': [1.0, 2.5], 'b': [10.0, 20.0]},
+                                index=['s1', 's2'])
+
+        report = deviations(expected, observed,
+                            {'a': (0.1, 0), 'b': (0, 0)})
+
+        self.assertEqual(list(report.index), ['a', 'b'])
+        self.assertFalse(report.loc['a', 'ok'])
+        self.assertEqual(report.loc['a', 'sample'], 's2')
+        self.assertEqual(report.loc['a', 'abs_error'], 0.5)
+        self.assertTrue(report.loc['b', 'ok'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+from unittest import TestCase, main
+
+import json
+import subprocess
+import sys
+
+
+# modules which are only needed once an action actually runs
+HEAVY_MODULES = ['matplotlib', 'scipy.optimize', 'q2templates']
+
+# registering the actions imports _methods and with it everything it needs at
+# module level
+REGISTRATION_MODULES = ['q2_katharoseq._methods', 'qiime2', 'biom', 'pandas',
+                        'q2_types']
+
+# qiime2 and q2-types are loaded first, as every plugin pays for them
+SCRIPT = '''
+import json, sys
+import qiime2.plugin
+import q2_types.feature_table
+before = set(sys.modules)
+import q2_katharoseq.plugin_setup
+print(json.dumps({'new': sorted(set(sys.modules) - before),
+                  'loaded': sorted(sys.modules)}))
+'''
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us, depth)} from -X importtime."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return times
+
+
+class PluginImportTests(TestCase):
+
+    def setUp(self):
+        proc = subprocess.run([sys.executable, '-c', SCRIPT],
+                              capture_output=True, text=True, check=True)
+        modules = json.loads(proc.stdout.strip().splitlines()[-1])
+        self.new_modules = modules['new']
+        self.loaded_modules = modules['loaded']
+
+    def test_heavy_modules_are_not_imported(self):
+        for heavy in HEAVY_MODULES:
+            loaded = [m for m in self.new_modules
+                      if m == heavy or m.startswith(heavy + '.')]
+            self.assertEqual(loaded, [], '%s is imported by the plugin'
+                             % heavy)
+
+    def test_registration_modules_are_imported(self):
+        self.assertIn('q2_katharoseq._methods', self.new_modules)
+        for module in REGISTRATION_MODULES:
+            self.assertIn(module, self.loaded_modules)
+
+
+if __name__ == '__main__':
+    main()
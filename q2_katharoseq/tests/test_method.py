@@ -2,18 +2,38 @@ from unittest import TestCase, main
 
 import tempfile
 import os
-import sys
-from io import StringIO
+import gzip
+import json
+import tracemalloc
+import numpy as np
 import pandas as pd
+import biom
 import qiime2
 from qiime2 import CategoricalMetadataColumn
 from qiime2 import NumericMetadataColumn
 
 from q2_katharoseq import (read_count_threshold,
                            estimating_biomass,
-                           biomass_plot)
+                           biomass_plot,
+                           fit_standard_curve,
+                           append_biomass,
+                           filter_table,
+                           fit_threshold,
+                           threshold_plot,
+                           fit_threshold_collection,
+                           estimating_biomass_collection,
+                           read_totals,
+                           rank_thresholds)
+from q2_katharoseq._fit import fit_rank_thresholds
+from q2_katharoseq._type import EstimatedBiomass
+from q2_katharoseq._format import EstimatedBiomassDirFmt
+from q2_types.feature_table import BIOMV210DirFmt
 from q2_katharoseq._methods import allosteric_sigmoid
 from q2_katharoseq._methods import get_threshold
+from q2_katharoseq._methods import depth_summary
+from q2_katharoseq._methods import top_features
+from q2_katharoseq.simulate import simulate_study
+from q2_katharoseq import _vega
 
 from os.path import dirname, abspath, join
 from inspect import currentframe, getfile
@@ -93,6 +113,79 @@ class KatharoSeqTestCase(TestCase):
             index_fp = os.path.join(output_dir, 'index.html')
             self.assertTrue(os.path.exists(index_fp))
 
+    def test_outputs_vega_views(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            read_count_threshold(
+                output_dir,
+                self.threshold,
+                self.positive_control_value,
+                self.positive_control_column,
+                self.cell_count_column,
+                self.table,
+                self.control)
+
+            for asset in _vega.LIBRARIES + ['vega.js']:
+                self.assertTrue(
+                    os.path.exists(os.path.join(output_dir, asset)))
+            with open(os.path.join(output_dir, 'index.html')) as fh:
+                index = fh.read()
+            self.assertNotIn('https://cdn', index)
+            self.assertIn('data-target="sigmoid"', index)
+            self.assertIn('data-target="threshold-curve"', index)
+
+    def test_outputs_timings(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            read_count_threshold(
+                output_dir,
+                self.threshold,
+                self.positive_control_value,
+                self.positive_control_column,
+                self.cell_count_column,
+                self.table,
+                self.control)
+
+            with open(os.path.join(output_dir, 'timings.json')) as fh:
+                timings = json.load(fh)
+            tsv = pd.read_csv(os.path.join(output_dir, 'timings.tsv'),
+                              sep='\t', index_col=0)
+            with open(os.path.join(output_dir, 'index.html')) as fh:
+                index = fh.read()
+
+        self.assertEqual(timings['action'], 'read_count_threshold')
+        stages = [s['stage'] for s in timings['stages']]
+        self.assertEqual(stages, ['validate', 'controls', 'top taxa',
+                                  'control totals', 'control reads',
+                                  'curve fit', 'sum', 'depth summary',
+                                  'plot', 'views', 'render'])
+        self.assertEqual(list(tsv.index), stages)
+        for s in timings['stages']:
+            self.assertGreaterEqual(s['wall_s'], 0)
+            self.assertGreaterEqual(s['cpu_s'], 0)
+        self.assertIn('<details>', index)
+        self.assertIn('curve fit', index)
+        self.assertNotIn('<th>render</th>', index)
+
+    def test_timings_peak_memory(self):
+        tracemalloc.start()
+        try:
+            with tempfile.TemporaryDirectory() as output_dir:
+                read_count_threshold(
+                    output_dir,
+                    self.threshold,
+                    self.positive_control_value,
+                    self.positive_control_column,
+                    self.cell_count_column,
+                    self.table,
+                    self.control)
+                with open(os.path.join(output_dir, 'timings.json')) as fh:
+                    timings = json.load(fh)
+        finally:
+            tracemalloc.stop()
+
+        self.assertTrue(timings['tracemalloc'])
+        for s in timings['stages']:
+            self.assertGreaterEqual(s['peak_mb'], 0)
+
     def test_invalid_threshold(self):
         with tempfile.TemporaryDirectory() as output_dir, \
             self.assertRaisesRegex(
@@ -124,6 +217,18 @@ class KatharoSeqTestCase(TestCase):
                 self.table,
                 self.control)
 
+    def test_threshold_bounds(self):
+        # the minimum frequency is infinite at 100 and undefined at 0
+        for threshold in 0, 100:
+            with self.assertRaisesRegex(ValueError, 'exclusive'):
+                fit_threshold(
+                    threshold,
+                    self.positive_control_value,
+                    self.positive_control_column,
+                    self.cell_count_column,
+                    self.table,
+                    self.control)
+
     def test_no_positive_controls_in_col(self):
         ind = pd.Index(['s1', 's2', 's3', 's4'],
                        name='sampleid')
@@ -210,12 +315,7 @@ class KatharoSeqTestCase(TestCase):
             columns=columns)
 
         with tempfile.TemporaryDirectory() as output_dir:
-            # capture stderr to check for warning message
-            captured_stderr = StringIO()
-            old_stderr = sys.stderr
-            sys.stderr = captured_stderr
-
-            try:
+            with self.assertLogs('q2_katharoseq', level='WARNING') as logs:
                 read_count_threshold(
                     output_dir,
                     self.threshold,
@@ -224,12 +324,9 @@ class KatharoSeqTestCase(TestCase):
                     cell_count_column,
                     table,
                     self.control)
-            finally:
-                sys.stderr = old_stderr
 
-            # check that warning was printed to stderr
-            stderr_output = captured_stderr.getvalue()
-            self.assertIn("Only 3 of 4 positive controls found", stderr_output)
+            self.assertIn("Only 3 of 4 positive controls found",
+                          logs.output[0])
 
     def test_insufficient_dilution_series(self):
         """Test error when fewer than 3 unique cell count values."""
@@ -456,6 +553,387 @@ class KatharoSeqTestCase(TestCase):
                 'asv',
                 'target_asv')
 
+    def test_filter_table(self):
+        table = biom.Table(self.table.T.values,
+                           list(self.table.columns),
+                           list(self.table.index))
+
+        obs_table, obs = filter_table(
+            table,
+            self.threshold,
+            self.positive_control_value,
+            self.positive_control_column,
+            self.cell_count_column,
+            self.control)
+
+        totals = pd.Series(table.sum(axis='sample'),
+                           index=table.ids(axis='sample'))
+        exp_ids = totals[totals >= obs['min_freq']].index
+        self.assertEqual(obs['threshold'], self.threshold)
+        self.assertEqual(obs['n_samples'], 6)
+        self.assertEqual(obs['n_retained'], len(exp_ids))
+        self.assertEqual(set(obs_table.ids(axis='sample')), set(exp_ids))
+        self.assertTrue(
+            (obs_table.sum(axis='observation') > 0).all())
+
+    def test_filter_table_matches_read_count_threshold(self):
+        data = qiime2.Metadata.load(f'{self.fp}/fmp_metadata.tsv')
+        table = qiime2.Artifact.load(f'{self.fp}/fmp_collapsed_table.qza')
+
+        obs_table, obs = filter_table(
+            table.view(biom.Table),
+            90,
+            'control',
+            data.get_column('control_rct'),
+            data.get_column('control_cell_into_extraction'),
+            'classic')
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            read_count_threshold(
+                output_dir, 90, 'control',
+                data.get_column('control_rct'),
+                data.get_column('control_cell_into_extraction'),
+                table.view(pd.DataFrame), 'classic')
+            with open(os.path.join(output_dir, 'index.html')) as fh:
+                self.assertIn(
+                    'value observed was: %d' % obs['min_freq'], fh.read())
+
+        self.assertTrue(
+            np.all(obs_table.sum(axis='sample') >= obs['min_freq']))
+
+    def test_fit_threshold(self):
+        obs = fit_threshold(
+            self.threshold,
+            self.positive_control_value,
+            self.positive_control_column,
+            self.cell_count_column,
+            self.table,
+            self.control)
+
+        self.assertEqual(obs['threshold'], self.threshold)
+        self.assertEqual(obs['min_freq'], obs['thresholds']['50'])
+        self.assertEqual(sorted(obs['thresholds']), ['50', '70', '90'])
+        self.assertEqual(np.asarray(obs['pcov']).shape, (2, 2))
+        self.assertEqual(obs['controls']['sample_id'], ['s1', 's3', 's5'])
+        self.assertEqual(obs['controls']['cell_count'], [100, 1000, 10000])
+        self.assertEqual(obs['top_taxa']['levels'], [10000, 1000, 100])
+        self.assertEqual(obs['min_freq'], get_threshold(
+            obs['controls']['log_asv_reads'],
+            obs['controls']['correct_assign'],
+            self.threshold / 100))
+
+    def test_fit_threshold_totals(self):
+        table, md = simulate_study(200, 100, seed=1)
+        args = (90, 'control',
+                CategoricalMetadataColumn(md['control_rct']),
+                NumericMetadataColumn(md['control_cell_into_extraction']),
+                table.to_dataframe(dense=True).T, 'classic')
+        totals = read_totals(table)
+
+        self.assertEqual(totals.name, 'total_reads')
+        self.assertEqual(list(totals.index), list(table.ids()))
+        self.assertEqual(fit_threshold(*args, totals=totals),
+                         fit_threshold(*args))
+        with self.assertRaisesRegex(ValueError, 'lack 1 samples'):
+            fit_threshold(*args, totals=totals.iloc[1:])
+
+    def test_fit_threshold_auto(self):
+        for control in 'atcc', 'zymobiomics', 'classic', 'single':
+            table, md = simulate_study(200, 100, control=control, seed=1)
+            obs = fit_threshold(
+                90, 'control',
+                CategoricalMetadataColumn(md['control_rct']),
+                NumericMetadataColumn(md['control_cell_into_extraction']),
+                table.to_dataframe(dense=True).T, 'auto')
+            exp = fit_threshold(
+                90, 'control',
+                CategoricalMetadataColumn(md['control_rct']),
+                NumericMetadataColumn(md['control_cell_into_extraction']),
+                table.to_dataframe(dense=True).T, control)
+
+            self.assertEqual(obs['control'], control)
+            self.assertEqual([k['kit'] for k in obs['kits']
+                              if k['selected']], [control])
+            self.assertEqual(len(obs['kits']), 4)
+            self.assertEqual(obs['min_freq'], exp['min_freq'])
+            self.assertNotIn('kits', exp)
+
+    def test_read_count_threshold_auto(self):
+        table = qiime2.Artifact.load(
+            join(self.fp, 'fmp_collapsed_table.qza')).view(pd.DataFrame)
+        md = qiime2.Metadata.load(join(self.fp, 'fmp_metadata.tsv'))
+        with tempfile.TemporaryDirectory() as output_dir:
+            read_count_threshold(
+                output_dir, 90, 'control',
+                md.get_column('control_rct'),
+                md.get_column('control_cell_into_extraction'),
+                table, 'auto')
+
+            with open(os.path.join(output_dir, 'index.html')) as fh:
+                index = fh.read()
+        self.assertIn('Control type: classic', index)
+        for kit in 'atcc', 'zymobiomics', 'single':
+            self.assertIn(f'<th>{kit}</th>', index)
+
+    def test_fit_threshold_auto_without_kit(self):
+        table = self.table.rename(columns={self.table.columns[0]: 'f1',
+                                           self.table.columns[1]: 'f2'})
+        with self.assertRaisesRegex(ValueError, 'No control type'):
+            fit_threshold(
+                self.threshold,
+                self.positive_control_value,
+                self.positive_control_column,
+                self.cell_count_column,
+                table,
+                'auto')
+
+    def asv_table(self):
+        # every genus of the table split into two ASVs, with a taxonomy in
+        # the format of the classifiers
+        columns, taxa = {}, {}
+        for i, (genus, counts) in enumerate(self.table.items()):
+            columns[f'asv{i}a'] = counts // 2
+            columns[f'asv{i}b'] = counts - counts // 2
+            taxon = '; '.join(genus.split(';'))
+            taxa[f'asv{i}a'] = taxon + '; s__'
+            taxa[f'asv{i}b'] = taxon
+        taxonomy = pd.DataFrame({'Taxon': taxa, 'Confidence': 0.9})
+        taxonomy.index.name = 'Feature ID'
+        return pd.DataFrame(columns), taxonomy
+
+    def test_fit_threshold_taxonomy(self):
+        table, taxonomy = self.asv_table()
+
+        for control in self.control, 'auto':
+            exp = fit_threshold(
+                self.threshold, self.positive_control_value,
+                self.positive_control_column, self.cell_count_column,
+                self.table, control)
+            obs = fit_threshold(
+                self.threshold, self.positive_control_value,
+                self.positive_control_column, self.cell_count_column,
+                table, control, taxonomy=taxonomy)
+            self.assertEqual(obs['min_freq'], exp['min_freq'])
+            self.assertEqual(obs['controls'], exp['controls'])
+            self.assertEqual(obs.get('kits'), exp.get('kits'))
+            self.assertEqual(obs['top_taxa']['features'][0][0],
+                             self.table.columns[0])
+
+        with self.assertRaisesRegex(ValueError, '2 features .* not in'):
+            fit_threshold(
+                self.threshold, self.positive_control_value,
+                self.positive_control_column, self.cell_count_column,
+                table, self.control, taxonomy=taxonomy.iloc[2:])
+
+    def test_filter_table_taxonomy(self):
+        table, taxonomy = self.asv_table()
+        exp = fit_threshold(
+            self.threshold, self.positive_control_value,
+            self.positive_control_column, self.cell_count_column,
+            self.table, self.control)
+        obs_table, obs = filter_table(
+            biom.Table(table.T.to_numpy(), table.columns, table.index),
+            self.threshold, self.positive_control_value,
+            self.positive_control_column, self.cell_count_column,
+            self.control, taxonomy=taxonomy)
+
+        self.assertEqual(obs['min_freq'], exp['min_freq'])
+        self.assertEqual(obs_table.shape[0], 8)
+
+    def test_rank_thresholds(self):
+        table, taxonomy = self.asv_table()
+        # another genus of the family of Bacillus
+        table['asv4'] = [3, 0, 4, 0, 5, 0]
+        taxonomy.loc['asv4', 'Taxon'] = (
+            'd__Bacteria; p__Firmicutes; c__Bacilli; o__Bacillales; '
+            'f__Bacillaceae; g__Geobacillus')
+        table = biom.Table(table.T.to_numpy(), table.columns, table.index)
+        exp = fit_threshold(
+            self.threshold, self.positive_control_value,
+            self.positive_control_column, self.cell_count_column,
+            self.table, self.control)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            rank_thresholds(
+                output_dir, table, taxonomy, self.threshold,
+                self.positive_control_value, self.positive_control_column,
+                self.cell_count_column, self.control, [6, 5])
+
+            self.assertTrue(os.path.exists(
+                os.path.join(output_dir, 'ranks.svg')))
+            with open(os.path.join(output_dir, 'index.html')) as fh:
+                index = fh.read()
+        self.assertIn('Thresholds by rank', index)
+        self.assertIn('<th>family</th>', index)
+
+        obs, _ = fit_rank_thresholds(
+            table, self.threshold, self.positive_control_value,
+            self.positive_control_column, self.cell_count_column,
+            self.control, taxonomy, [6, 5])
+        family, genus = obs['ranks']
+        self.assertEqual((family['rank'], genus['rank']),
+                         ('family', 'genus'))
+        self.assertEqual(genus['min_freq'], obs['min_freq'])
+        self.assertAlmostEqual(genus['h'], obs['h'])
+        self.assertEqual(genus['correct_assign'],
+                         obs['controls']['correct_assign'])
+        self.assertEqual(obs['controls']['asv_reads'],
+                         [s + a for s, a in zip(exp['controls']['asv_reads'],
+                                                [3, 4, 5])])
+        self.assertTrue(np.all(np.greater(family['correct_assign'],
+                                          genus['correct_assign'])))
+
+    def test_rank_thresholds_invalid(self):
+        table, taxonomy = self.asv_table()
+        table = biom.Table(table.T.to_numpy(), table.columns, table.index)
+        args = (table, self.threshold, self.positive_control_value,
+                self.positive_control_column, self.cell_count_column)
+
+        with self.assertRaisesRegex(ValueError, 'between 1 and 6'):
+            fit_rank_thresholds(*args, self.control, taxonomy, [5, 7])
+        with self.assertRaisesRegex(ValueError, 'asv control type'):
+            fit_rank_thresholds(*args, 'asv', taxonomy, [5])
+
+    def test_fit_threshold_depth(self):
+        obs = fit_threshold(
+            self.threshold,
+            self.positive_control_value,
+            self.positive_control_column,
+            self.cell_count_column,
+            self.table,
+            self.control)
+
+        totals = self.table.sum(axis=1)
+        depth = obs['depth']
+        self.assertEqual(depth['n_samples'], 6)
+        self.assertEqual(sum(depth['counts']), 6)
+        for t, min_freq in obs['thresholds'].items():
+            self.assertEqual(depth['retained'][t],
+                             (totals >= min_freq).sum())
+
+    def test_depth_summary(self):
+        totals = np.array([0, 1, 9, 10, 11, 1000, 1000])
+
+        obs = depth_summary(totals, {'50': 10, '90': 1001})
+        self.assertEqual(obs['n_samples'], 7)
+        self.assertEqual(obs['n_zero'], 1)
+        self.assertEqual(obs['retained'], {'50': 4, '90': 0})
+        self.assertEqual(len(obs['counts']), 60)
+        self.assertEqual(obs['counts'][0], 1)
+        self.assertEqual(obs['counts'][-1], 2)
+        self.assertEqual(sum(obs['counts']), 6)
+
+    def test_top_features(self):
+        rng = np.random.default_rng(0)
+        counts = rng.poisson(0.5, (12, 200)) * rng.integers(1, 50, 200)
+        levels = np.repeat([10., 100., 1000.], 4)
+        feature_ids = ['f%d' % i for i in range(200)]
+
+        obs = top_features(biom.Table(counts.T, feature_ids,
+                                      list(range(12))).matrix_data.T.tocsr(),
+                           feature_ids, levels, k=5)
+
+        self.assertEqual(obs['levels'], [1000., 100., 10.])
+        for i, level in enumerate(obs['levels']):
+            reads = counts[levels == level].sum(axis=0)
+            exp = np.sort(reads)[::-1][:5]
+            self.assertEqual(obs['reads'][i], exp.tolist())
+            self.assertEqual(obs['totals'][i], reads.sum())
+            self.assertEqual([reads[feature_ids.index(f)]
+                              for f in obs['features'][i]], exp.tolist())
+
+    def _collection(self, tables):
+        members = {}
+        for name, table in tables.items():
+            path = os.path.join(self.temp_dir.name, name)
+            os.mkdir(path)
+            table = biom.Table(table.T.values, table.columns, table.index)
+            with biom.util.biom_open(
+                    os.path.join(path, 'feature-table.biom'), 'w') as fh:
+                table.to_hdf5(fh, 'test')
+            members[name] = BIOMV210DirFmt(path, mode='r')
+        return members
+
+    def test_fit_threshold_collection(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        tables = {'run1': self.table, 'run2': self.table * 3}
+        members = self._collection(tables)
+
+        for n_jobs in 1, 2:
+            obs = fit_threshold_collection(
+                members,
+                self.threshold,
+                self.positive_control_value,
+                self.positive_control_column,
+                self.cell_count_column,
+                self.control,
+                n_jobs=n_jobs)
+
+            self.assertEqual(list(obs), ['run1', 'run2'])
+            for name, table in tables.items():
+                exp = fit_threshold(
+                    self.threshold,
+                    self.positive_control_value,
+                    self.positive_control_column,
+                    self.cell_count_column,
+                    table,
+                    self.control)
+                self.assertEqual(obs[name]['thresholds'], exp['thresholds'])
+                self.assertEqual(obs[name]['controls'], exp['controls'])
+
+    def test_fit_threshold_collection_names_failing_member(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        table = self.table.rename(index={'s1': 'x1', 's3': 'x3', 's5': 'x5'})
+        members = self._collection({'run1': self.table, 'run2': table})
+
+        with self.assertRaisesRegex(ValueError, "'run2'.*No positive"):
+            fit_threshold_collection(
+                members,
+                self.threshold,
+                self.positive_control_value,
+                self.positive_control_column,
+                self.cell_count_column,
+                self.control,
+                n_jobs=2)
+
+    def test_estimating_biomass_collection(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        data = qiime2.Metadata.load(f'{self.fp}/fmp_metadata.tsv')
+        table = qiime2.Artifact.load(f'{self.fp}/fmp_collapsed_table.qza')
+        table = table.view(pd.DataFrame)
+        members = self._collection({'run1': table})
+        args = (data.get_column('control_cell_into_extraction'), 1150,
+                'control', data.get_column('control_rct'), 5, 60,
+                data.get_column('extraction_mass_g'))
+
+        obs = estimating_biomass_collection(members, *args, n_jobs=0)
+        exp = estimating_biomass(table, *args)
+        pd.testing.assert_frame_equal(obs['run1'], exp)
+
+    def test_threshold_plot(self):
+        fit = fit_threshold(
+            self.threshold,
+            self.positive_control_value,
+            self.positive_control_column,
+            self.cell_count_column,
+            self.table,
+            self.control)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            threshold_plot(output_dir, fit)
+
+            self.assertTrue(
+                os.path.exists(os.path.join(output_dir, 'fit.svg')))
+            with open(os.path.join(output_dir, 'index.html')) as fh:
+                index = fh.read()
+            self.assertIn('value observed was: %d' % fit['min_freq'], index)
+            self.assertIn('Samples retained', index)
+            self.assertTrue(
+                os.path.exists(os.path.join(output_dir, 'depth.svg')))
+
     def test_sigmoid(self):
         x = 1.0
         h = 2.0
@@ -492,6 +970,133 @@ class KatharoSeqTestCase(TestCase):
         exp = pd.read_csv(f'{self.fp}/est_biomass_output.csv', index_col=0)
         pd.testing.assert_frame_equal(obs, exp)
 
+    def test_estimating_biomass_logs_timings(self):
+        data = qiime2.Metadata.load(f'{self.fp}/fmp_metadata.tsv')
+        table = f'{self.fp}/fmp_collapsed_table.qza'
+        table = qiime2.Artifact.load(table).view(pd.DataFrame)
+
+        with self.assertLogs('q2_katharoseq', level='INFO') as logs:
+            estimating_biomass(
+                table=table,
+                control_cell_extraction=data.get_column(
+                    'control_cell_into_extraction'),
+                min_total_reads=1150,
+                positive_control_value='control',
+                positive_control_column=data.get_column('control_rct'),
+                pcr_template_vol=5,
+                dna_extract_vol=60,
+                extraction_mass_g=data.get_column('extraction_mass_g'))
+
+        stages = [line.split(': ')[1].split(' took')[0]
+                  for line in logs.output]
+        self.assertEqual(stages, ['sum', 'standard curve', 'estimate'])
+        self.assertTrue(all('estimating_biomass' in line
+                            for line in logs.output))
+
+    def test_append_biomass(self):
+        data = qiime2.Metadata.load(f'{self.fp}/fmp_metadata.tsv')
+        table = f'{self.fp}/fmp_collapsed_table.qza'
+        table = qiime2.Artifact.load(table).view(pd.DataFrame)
+        params = dict(
+            control_cell_extraction=data.get_column(
+                'control_cell_into_extraction'),
+            min_total_reads=1150,
+            positive_control_value='control',
+            positive_control_column=data.get_column('control_rct'))
+
+        exp = estimating_biomass(
+            table=table,
+            pcr_template_vol=5,
+            dna_extract_vol=60,
+            extraction_mass_g=data.get_column('extraction_mass_g'),
+            **params).sort_index()
+        curve = fit_standard_curve(table=table, **params)
+
+        # existing estimates cover every other sample, the rest are new
+        existing = qiime2.Artifact.import_data(
+            EstimatedBiomass, exp.iloc[::2]).view(EstimatedBiomassDirFmt)
+        new_ids = exp.index[1::2]
+
+        obs = append_biomass(
+            estimated_biomass=existing,
+            standard_curve=curve,
+            table=table.loc[new_ids],
+            min_total_reads=1150,
+            pcr_template_vol=5,
+            dna_extract_vol=60,
+            extraction_mass_g=data.get_column('extraction_mass_g'))
+        obs = qiime2.Artifact.import_data(
+            EstimatedBiomass, obs).view(pd.DataFrame)
+
+        pd.testing.assert_frame_equal(obs, exp, check_index_type=False)
+
+    def test_append_biomass_min_total_reads(self):
+        data = qiime2.Metadata.load(f'{self.fp}/fmp_metadata.tsv')
+        table = f'{self.fp}/fmp_collapsed_table.qza'
+        table = qiime2.Artifact.load(table).view(pd.DataFrame)
+        params = dict(
+            control_cell_extraction=data.get_column(
+                'control_cell_into_extraction'),
+            min_total_reads=1150,
+            positive_control_value='control',
+            positive_control_column=data.get_column('control_rct'))
+
+        exp = estimating_biomass(
+            table=table,
+            pcr_template_vol=5,
+            dna_extract_vol=60,
+            extraction_mass_g=data.get_column('extraction_mass_g'),
+            **params).sort_index()
+        curve = fit_standard_curve(table=table, **params)
+        existing = qiime2.Artifact.import_data(
+            EstimatedBiomass, exp.iloc[::2]).view(EstimatedBiomassDirFmt)
+        new = dict(
+            estimated_biomass=existing,
+            standard_curve=curve,
+            table=table.loc[exp.index[1::2]],
+            pcr_template_vol=5,
+            dna_extract_vol=60,
+            extraction_mass_g=data.get_column('extraction_mass_g'))
+
+        # the threshold of the curve is used when none is given
+        obs = qiime2.Artifact.import_data(
+            EstimatedBiomass, append_biomass(**new)).view(pd.DataFrame)
+        pd.testing.assert_frame_equal(obs, exp, check_index_type=False)
+
+        with self.assertRaisesRegex(ValueError, "curve was fit with 1150"):
+            append_biomass(min_total_reads=1315, **new)
+
+    def test_append_biomass_duplicate_samples(self):
+        data = qiime2.Metadata.load(f'{self.fp}/fmp_metadata.tsv')
+        table = f'{self.fp}/fmp_collapsed_table.qza'
+        table = qiime2.Artifact.load(table).view(pd.DataFrame)
+        params = dict(
+            control_cell_extraction=data.get_column(
+                'control_cell_into_extraction'),
+            min_total_reads=1150,
+            positive_control_value='control',
+            positive_control_column=data.get_column('control_rct'))
+
+        exp = estimating_biomass(
+            table=table,
+            pcr_template_vol=5,
+            dna_extract_vol=60,
+            extraction_mass_g=data.get_column('extraction_mass_g'),
+            **params)
+        curve = fit_standard_curve(table=table, **params)
+        existing = qiime2.Artifact.import_data(
+            EstimatedBiomass, exp).view(EstimatedBiomassDirFmt)
+
+        with self.assertRaisesRegex(ValueError, "already have biomass"):
+            append_biomass(
+                estimated_biomass=existing,
+                standard_curve=curve,
+                table=table.loc[exp.index[:3]],
+                min_total_reads=1150,
+                pcr_template_vol=5,
+                dna_extract_vol=60,
+                extraction_mass_g=data.get_column('extraction_mass_g'))
+
     def test_biomass_plot(self):
 
         data = qiime2.Metadata.load(f'{self.fp}/fmp_metadata.tsv')
@@ -512,6 +1117,75 @@ class KatharoSeqTestCase(TestCase):
             index_fp = os.path.join(output_dir, 'index.html')
             self.assertTrue(os.path.exists(index_fp))
 
+            with gzip.open(os.path.join(output_dir,
+                                        'estimates.json.gz')) as fh:
+                estimates = json.load(fh)
+            with open(index_fp) as fh:
+                index = fh.read()
+            self.assertIn('estimates.json.gz', index)
+
+            totals = table.sum(axis=1)
+            exp = totals[totals >= 1150]
+            self.assertEqual(estimates['sample_id'], list(exp.index))
+            self.assertEqual(estimates['total_reads'], exp.tolist())
+            self.assertEqual(len(estimates['estimated_biomass_per_pcrrxn']),
+                             len(exp))
+
+            with open(os.path.join(output_dir, 'timings.json')) as fh:
+                timings = json.load(fh)
+            self.assertEqual([s['stage'] for s in timings['stages']],
+                             ['sum', 'standard curve', 'plot', 'table',
+                              'views', 'render'])
+
+    def test_biomass_plot_samples(self):
+        data = qiime2.Metadata.load(f'{self.fp}/fmp_metadata.tsv')
+        table = qiime2.Artifact.load(f'{self.fp}/fmp_collapsed_table.qza')
+        table = table.view(pd.DataFrame)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            biomass_plot(
+                output_dir,
+                table=table,
+                control_cell_extraction=data.get_column(
+                    'control_cell_into_extraction'),
+                min_total_reads=1150,
+                positive_control_value='control',
+                positive_control_column=data.get_column('control_rct'),
+                plot_samples=True,
+                extraction_mass_g=data.get_column('extraction_mass_g'),
+                pcr_template_vol=5,
+                dna_extract_vol=60
+            )
+
+            # one rasterized density layer per panel
+            with open(os.path.join(output_dir, 'fit.svg')) as fh:
+                self.assertEqual(fh.read().count('<image '), 2)
+
+            with open(os.path.join(output_dir, 'index.html')) as fh:
+                index = fh.read()
+            self.assertIn('data-target="standard-curve"', index)
+            self.assertIn('log_estimated_cells_per_g', index)
+
+            with gzip.open(os.path.join(output_dir,
+                                        'estimates.json.gz')) as fh:
+                estimates = json.load(fh)
+            self.assertIn('estimated_cells_per_g', estimates)
+
+    def test_biomass_plot_samples_missing_volumes(self):
+        data = qiime2.Metadata.load(f'{self.fp}/fmp_metadata.tsv')
+
+        with tempfile.TemporaryDirectory() as output_dir, \
+                self.assertRaisesRegex(ValueError, 'pcr_template_vol'):
+            biomass_plot(
+                output_dir,
+                table=self.table,
+                control_cell_extraction=self.cell_count_column,
+                min_total_reads=0,
+                positive_control_value='a',
+                positive_control_column=self.positive_control_column,
+                plot_samples=True,
+                extraction_mass_g=data.get_column('extraction_mass_g'))
+
 
 if __name__ == '__main__':
     main()
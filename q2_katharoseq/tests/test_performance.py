@@ -0,0 +1,147 @@
+from unittest import TestCase, main
+
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import qiime2
+
+from q2_katharoseq import estimating_biomass, filter_table, fit_threshold
+from q2_katharoseq.simulate import simulate_study
+from q2_katharoseq.tests.test_import import SCRIPT, parse_importtime
+
+
+# Time budgets are multiples of the time of a reference operation measured
+# on the same machine, so they hold on slower runners. They leave roughly
+# four times the current cost as headroom, which a reintroduced row-wise
+# loop or densification still exceeds by far. Memory budgets come from
+# tracemalloc and are relative to the size of the table.
+ESTIMATING_BIOMASS_BUDGET = 60
+FILTER_TABLE_BUDGET = 80
+PACKAGE_IMPORT_BUDGET = 4
+PLUGIN_IMPORT_BUDGET = 20
+
+# peak memory of filter_table relative to the bytes of the table's nonzeros;
+# a dense copy of the 50k x 2k table is about 35 times as large
+FILTER_TABLE_MEMORY = 6
+
+# peak memory of fit_threshold relative to the pandas table it receives
+FIT_THRESHOLD_MEMORY = 0.25
+
+
+def reference_seconds():
+    # a fixed mix of vectorized and interpreted work, best of five
+    rng = np.random.default_rng(0)
+    values = rng.random(10**6)
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        np.sort(values)
+        sum(i * 0.5 for i in range(3 * 10**5))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def best_seconds(func, repeat=2):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_mb(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def columns(metadata):
+    return (
+        qiime2.CategoricalMetadataColumn(metadata['control_rct']),
+        qiime2.NumericMetadataColumn(
+            metadata['control_cell_into_extraction']),
+        qiime2.NumericMetadataColumn(metadata['extraction_mass_g']))
+
+
+class PerformanceTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.reference = reference_seconds()
+
+    def assertWithinBudget(self, seconds, budget, name):
+        self.assertLess(
+            seconds, budget * self.reference,
+            f'{name} took {seconds:.3f} s, {seconds / self.reference:.1f} '
+            f'times the reference operation (budget {budget})')
+
+    def test_estimating_biomass_200k_samples(self):
+        table, metadata = simulate_study(200_000, 50, features_per_sample=5,
+                                         seed=0)
+        table = table.to_dataframe(dense=True).T
+        positive_controls, cell_counts, mass = columns(metadata)
+
+        seconds = best_seconds(lambda: estimating_biomass(
+            table, cell_counts, 100, 'control', positive_controls, 5, 60,
+            mass))
+
+        self.assertWithinBudget(seconds, ESTIMATING_BIOMASS_BUDGET,
+                                'estimating_biomass')
+
+    def test_filter_table_50k_by_2k(self):
+        table, metadata = simulate_study(50_000, 2_000, seed=0)
+        positive_controls, cell_counts, _ = columns(metadata)
+
+        def run():
+            filter_table(table, 90, 'control', positive_controls,
+                         cell_counts, 'classic')
+
+        self.assertWithinBudget(best_seconds(run), FILTER_TABLE_BUDGET,
+                                'filter_table')
+        nonzero_mb = table.nnz * 12 / 2**20
+        self.assertLess(peak_mb(run), FILTER_TABLE_MEMORY * nonzero_mb)
+
+    def test_fit_threshold_does_not_copy_the_table(self):
+        table, metadata = simulate_study(50_000, 200, seed=0)
+        table = table.to_dataframe(dense=True).T
+        positive_controls, cell_counts, _ = columns(metadata)
+        table_mb = table.memory_usage().sum() / 2**20
+
+        peak = peak_mb(lambda: fit_threshold(
+            90, 'control', positive_controls, cell_counts, table,
+            'classic'))
+
+        self.assertLess(peak, FIT_THRESHOLD_MEMORY * table_mb)
+
+    def test_package_import(self):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import q2_katharoseq'],
+            capture_output=True, text=True, check=True)
+        _, cumulative_us, _ = parse_importtime(proc.stderr)['q2_katharoseq']
+
+        self.assertWithinBudget(cumulative_us / 10**6, PACKAGE_IMPORT_BUDGET,
+                                'import q2_katharoseq')
+
+    def test_plugin_import(self):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SCRIPT],
+            capture_output=True, text=True, check=True)
+        cumulative_us = sum(
+            cumulative for name, (_, cumulative, depth)
+            in parse_importtime(proc.stderr).items()
+            if name.startswith('q2_katharoseq') and depth == 0)
+
+        self.assertGreater(cumulative_us, 0)
+        self.assertWithinBudget(cumulative_us / 10**6, PLUGIN_IMPORT_BUDGET,
+                                'import q2_katharoseq.plugin_setup')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+from unittest import TestCase, main
+
+import biom
+import numpy as np
+import pandas as pd
+import qiime2
+from qiime2.sdk import PluginManager
+from qiime2.sdk.parallel_config import ParallelConfig
+from parsl.config import Config
+from parsl.executors.threads import ThreadPoolExecutor
+
+from q2_katharoseq import fit_threshold
+
+
+class GroupThresholdsTests(TestCase):
+
+    def setUp(self):
+        self.pipeline = PluginManager().plugins['katharoseq'].pipelines[
+            'group_thresholds']
+
+        # two plates, each with its own three positive controls
+        counts = np.array([[1, 1, 2, 3],
+                           [2, 1, 2, 3],
+                           [10, 4, 3, 2],
+                           [20, 2, 3, 4],
+                           [100, 5, 6, 7],
+                           [200, 8, 9, 10]])
+        counts = np.vstack([counts, counts * [3, 1, 1, 1]])
+        ids = ['p1.s%d' % i for i in range(6)] + \
+              ['p2.s%d' % i for i in range(6)]
+        features = ['d__Bacteria;p__Firmicutes;c__Bacilli;o__Bacillales;'
+                    'f__Bacillaceae;g__Bacillus',
+                    'd__Bacteria;p__Proteobacteria;c__Alphaproteobacteria;'
+                    'o__Rhodobacterales;f__Rhodobacteraceae;g__Paracoccus',
+                    'f3', 'f4']
+        self.df = pd.DataFrame(counts, index=ids, columns=features)
+        self.table = qiime2.Artifact.import_data(
+            'FeatureTable[Frequency]', biom.Table(counts.T, features, ids))
+
+        index = pd.Index(ids, name='sampleid')
+        self.metadata = qiime2.Metadata(pd.DataFrame({
+            'control': ['a', 'b'] * 6,
+            'cells': [100, 2, 1000, 4, 10000, 6] * 2,
+            'plate': ['p1'] * 6 + ['p2'] * 6}, index=index))
+
+    def test_parallel(self):
+        config = Config(executors=[
+            ThreadPoolExecutor(max_threads=2, label='default')])
+
+        with ParallelConfig(parallel_config=config):
+            future = self.pipeline.parallel(
+                table=self.table,
+                threshold=50,
+                positive_control_value='a',
+                positive_control_column=self.metadata.get_column('control'),
+                cell_count_column=self.metadata.get_column('cells'),
+                group_column=self.metadata.get_column('plate'),
+                control='classic')
+            thresholds, visualizations = future._result()
+
+        self.assertEqual(list(thresholds.keys()), ['p1', 'p2'])
+        self.assertEqual(list(visualizations.keys()), ['p1', 'p2'])
+
+        for plate in 'p1', 'p2':
+            df = self.df.loc[self.df.index.str.startswith(plate)]
+            exp = fit_threshold(
+                50, 'a', self.metadata.get_column('control'),
+                self.metadata.get_column('cells'), df, 'classic')
+            obs = thresholds[plate].view(dict)
+            self.assertEqual(obs['thresholds'], exp['thresholds'])
+            self.assertEqual(obs['controls']['sample_id'],
+                             exp['controls']['sample_id'])
+
+    def test_group_without_controls(self):
+        # the last sample of p2, which is not a control, is moved to p3
+        plates = self.metadata.get_column('plate').to_series()
+        plates.iloc[-1] = 'p3'
+        group_column = qiime2.CategoricalMetadataColumn(plates)
+
+        with self.assertRaisesRegex(ValueError, "group\\(s\\) 'p3'"):
+            self.pipeline(
+                table=self.table,
+                threshold=50,
+                positive_control_value='a',
+                positive_control_column=self.metadata.get_column('control'),
+                cell_count_column=self.metadata.get_column('cells'),
+                group_column=group_column,
+                control='classic')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+from unittest import TestCase, main
+
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from q2_katharoseq._plot import plot_threshold, plot_standard_curve
+
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def count_markers(fp, gid):
+    """Count the points drawn by the artist with the given gid."""
+    root = ET.parse(fp).getroot()
+    group = root.find('.//%sg[@id="%s"]' % (SVG, gid))
+    return len(group.findall('.//%suse' % SVG))
+
+
+class ConcurrentPlotTests(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def _render(self, i):
+        # every plot gets a different number of points so that any
+        # artists leaking between figures would change the counts
+        n = 3 + i % 7
+        x = np.linspace(1, 4, n)
+        fp_threshold = os.path.join(self.temp_dir.name, 'threshold%d.svg' % i)
+        fp_curve = os.path.join(self.temp_dir.name, 'curve%d.svg' % i)
+
+        plot_threshold(fp_threshold, x, x / 5, (2.0, 3.0))
+        plot_standard_curve(fp_curve, x, 2 * x + 1, 2.0, 1.0)
+        return n, fp_threshold, fp_curve
+
+    def test_threaded_rendering(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(self._render, range(48)))
+
+        for n, fp_threshold, fp_curve in results:
+            self.assertEqual(count_markers(fp_threshold, 'data'), n)
+            self.assertEqual(count_markers(fp_curve, 'controls'), n)
+
+
+class SampleDensityTests(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def _render(self, n):
+        rng = np.random.default_rng(0)
+        log_reads = rng.normal(3.5, 0.5, n)
+        samples = pd.DataFrame({
+            'log_total_reads': log_reads,
+            'log_estimated_cells_per_g': rng.normal(2 * log_reads, 0.3)})
+        fp = os.path.join(self.temp_dir.name, 'fit%d.svg' % n)
+
+        plot_standard_curve(fp, np.array([2., 3., 4., 5.]),
+                            np.array([1., 3., 5., 7.]), 2.0, -3.0, samples)
+        return fp
+
+    def test_density_size_is_bounded(self):
+        small = self._render(2000)
+        large = self._render(200000)
+
+        for fp in small, large:
+            self.assertEqual(count_markers(fp, 'controls'), 4)
+            root = ET.parse(fp).getroot()
+            self.assertEqual(len(root.findall('.//%simage' % SVG)), 2)
+
+        self.assertLess(os.path.getsize(large), 2 * os.path.getsize(small))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+from unittest import TestCase, main
+
+import inspect
+import os
+import pstats
+import tempfile
+import time
+
+from q2_katharoseq import read_count_threshold
+from q2_katharoseq._profile import (profiled, PROFILE, PROFILE_TOP,
+                                    PROFILE_LINES)
+
+
+def busy(n: int, wait: float = 0.05) -> int:
+    end = time.perf_counter() + wait
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(n))
+    return total
+
+
+def fails(n: int) -> None:
+    busy(n, 0.01)
+    raise ValueError('pathological table')
+
+
+class ProfileTests(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.environ = {PROFILE: self.temp_dir.name}
+
+    def outputs(self, suffix):
+        return sorted(f for f in os.listdir(self.temp_dir.name)
+                      if f.endswith(suffix))
+
+    def test_disabled(self):
+        self.assertIs(profiled(busy, {}), busy)
+        self.assertIs(profiled(read_count_threshold, {PROFILE: ''}),
+                      read_count_threshold)
+
+    def test_signature(self):
+        wrapped = profiled(read_count_threshold, self.environ)
+        self.assertIsNot(wrapped, read_count_threshold)
+        self.assertEqual(inspect.signature(wrapped),
+                         inspect.signature(read_count_threshold))
+        self.assertEqual(wrapped.__annotations__,
+                         read_count_threshold.__annotations__)
+        self.assertEqual(wrapped.__name__, 'read_count_threshold')
+
+    def test_profile(self):
+        self.assertGreater(profiled(busy, self.environ)(10), 0)
+
+        prof, = self.outputs('.prof')
+        txt, = self.outputs('.txt')
+        self.assertTrue(prof.startswith('busy-'))
+        stats = pstats.Stats(os.path.join(self.temp_dir.name, prof))
+        self.assertTrue(any(name == 'busy'
+                            for _, _, name in stats.stats))
+        with open(os.path.join(self.temp_dir.name, txt)) as fh:
+            summary = fh.read()
+        self.assertIn('busy', summary)
+        self.assertNotIn('Line samples', summary)
+
+    def test_profile_failing_run(self):
+        with self.assertRaisesRegex(ValueError, 'pathological'):
+            profiled(fails, self.environ)(10)
+        self.assertEqual(len(self.outputs('.prof')), 1)
+
+    def test_profile_lines(self):
+        environ = dict(self.environ, **{PROFILE_LINES: '1',
+                                        PROFILE_TOP: '5'})
+        profiled(busy, environ)(1000)
+
+        txt, = self.outputs('.txt')
+        with open(os.path.join(self.temp_dir.name, txt)) as fh:
+            summary = fh.read().split('Line samples')[1]
+        self.assertIn('test_profile.py', summary)
+        self.assertIn('(busy)', summary)
+        self.assertLessEqual(len(summary.strip().splitlines()), 7)
+
+    def test_nested(self):
+        inner = profiled(busy, self.environ)
+
+        def outer(n):
+            return inner(n, 0.01)
+
+        profiled(outer, self.environ)(10)
+        prof, = self.outputs('.prof')
+        self.assertTrue(prof.startswith('outer-'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+from unittest import TestCase, main
+
+import tempfile
+import threading
+from os.path import dirname, abspath, join
+from unittest import mock
+
+import biom
+import pandas as pd
+import qiime2
+
+from q2_katharoseq import fit_threshold, estimating_biomass
+from q2_katharoseq import service
+from q2_katharoseq.service import KatharoSeqService, make_server, Client
+
+
+class ServiceTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = make_server()
+        cls.thread = threading.Thread(target=cls.server.serve_forever,
+                                      daemon=True)
+        cls.thread.start()
+        cls.client = Client(cls.server.server_address[1], timeout=60)
+
+        folder = join(dirname(abspath(__file__)), '..', '..', 'example')
+        cls.table_fp = join(folder, 'fmp_collapsed_table.qza')
+        cls.metadata_fp = join(folder, 'fmp_metadata.tsv')
+        cls.client.load('fmp', cls.table_fp, cls.metadata_fp)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.metadata = qiime2.Metadata.load(self.metadata_fp)
+        self.table = qiime2.Artifact.load(self.table_fp).view(pd.DataFrame)
+
+    def test_threshold(self):
+        params = {'threshold': 90,
+                  'positive_control_value': 'control',
+                  'positive_control_column': 'control_rct',
+                  'cell_count_column': 'control_cell_into_extraction',
+                  'control': 'classic'}
+
+        obs = self.client.threshold('fmp', **params)
+        exp = fit_threshold(
+            90, 'control', self.metadata.get_column('control_rct'),
+            self.metadata.get_column('control_cell_into_extraction'),
+            self.table, 'classic')
+        self.assertEqual(obs['min_freq'], exp['min_freq'])
+        self.assertEqual(obs['thresholds'], exp['thresholds'])
+
+        # a repeated query is served from the fit store
+        n_fits = self.client.status()['fits']
+        self.assertEqual(self.client.threshold('fmp', **params), obs)
+        self.assertEqual(self.client.status()['fits'], n_fits)
+
+    def test_biomass(self):
+        obs = self.client.biomass(
+            'fmp',
+            control_cell_extraction='control_cell_into_extraction',
+            min_total_reads=1150,
+            positive_control_value='control',
+            positive_control_column='control_rct',
+            pcr_template_vol=5,
+            dna_extract_vol=60,
+            extraction_mass_g='extraction_mass_g')
+        exp = estimating_biomass(
+            self.table,
+            self.metadata.get_column('control_cell_into_extraction'),
+            1150, 'control', self.metadata.get_column('control_rct'), 5, 60,
+            self.metadata.get_column('extraction_mass_g'))
+
+        self.assertEqual(list(obs['estimated_cells_per_g']), list(exp.index))
+        for sample, value in exp['estimated_cells_per_g'].items():
+            self.assertAlmostEqual(obs['estimated_cells_per_g'][sample],
+                                   value)
+
+    def test_reload_during_fit(self):
+        params = {'threshold': 90,
+                  'positive_control_value': 'control',
+                  'positive_control_column': 'control_rct',
+                  'cell_count_column': 'control_cell_into_extraction',
+                  'control': 'classic'}
+        # the reloaded table lacks the positive controls of one plate
+        table = qiime2.Artifact.load(self.table_fp).view(biom.Table)
+        drop = [i for i in table.ids() if 'P4gill.PBs' in i]
+        table = table.filter(drop, invert=True, inplace=False)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        reloaded_fp = join(temp_dir.name, 'table.biom')
+        with open(reloaded_fp, 'w') as fh:
+            fh.write(table.to_json('test'))
+
+        local = KatharoSeqService()
+        local.load('fmp', self.table_fp, self.metadata_fp)
+        fit_table_threshold = service.fit_table_threshold
+
+        def reload_first(*args, **kwargs):
+            local.load('fmp', reloaded_fp, self.metadata_fp)
+            return fit_table_threshold(*args, **kwargs)
+
+        with mock.patch.object(service, 'fit_table_threshold',
+                               side_effect=reload_first):
+            old = local.threshold('fmp', **params)
+        # the fit of the replaced table is not served for the new one
+        self.assertEqual(local.status()['fits'], 0)
+        new = local.threshold('fmp', **params)
+
+        exp = fit_threshold(
+            90, 'control', self.metadata.get_column('control_rct'),
+            self.metadata.get_column('control_cell_into_extraction'),
+            self.table.drop(index=drop), 'classic')
+        self.assertEqual(new['min_freq'], exp['min_freq'])
+        self.assertNotEqual(new['min_freq'], old['min_freq'])
+
+    def test_unknown_parameter(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown parameters: thresh'):
+            self.client.threshold('fmp', thresh=90)
+
+    def test_unknown_table(self):
+        with self.assertRaisesRegex(KeyError, 'No table named'):
+            self.client.threshold('missing', threshold=90)
+
+    def test_status(self):
+        self.assertIn('fmp', self.client.status()['tables'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+
+from q2_katharoseq.core import control_type
+from q2_katharoseq.simulate import (dilution_series, simulate_study,
+                                    DILUTIONS, H, K_PRIME)
+from q2_katharoseq._fit import fit_table_threshold
+
+
+class SimulateTests(TestCase):
+
+    def test_dilution_series(self):
+        counts, feature_ids, cells = dilution_series(
+            'zymobiomics', replicates=2, n_contaminants=5, seed=0)
+
+        self.assertEqual(counts.shape, (2 * len(DILUTIONS), 13))
+        self.assertEqual(feature_ids[:8], control_type['zymobiomics'])
+        npt.assert_array_equal(cells, np.tile(DILUTIONS, 2))
+        # the kit share of the reads drops with the input cells
+        share = counts[:, :8].sum(axis=1) / counts.sum(axis=1)
+        self.assertGreater(share[0], 0.99)
+        self.assertLess(share[len(DILUTIONS) - 1], share[0])
+
+    def test_simulate_study(self):
+        table, metadata = simulate_study(500, 200, seed=1)
+
+        self.assertEqual(table.shape, (200, 500))
+        self.assertEqual(list(metadata.index), list(table.ids()))
+        n_controls = 3 * len(DILUTIONS)
+        self.assertEqual(
+            (metadata.control_rct == 'control').sum(), n_controls)
+        self.assertTrue(
+            metadata.control_cell_into_extraction.iloc[n_controls:]
+            .isna().all())
+        self.assertTrue((table.sum(axis='sample') > 0).all())
+        self.assertTrue(table.matrix_data.has_canonical_format)
+
+    def test_simulate_study_seed(self):
+        a, _ = simulate_study(100, 100, seed=2)
+        b, _ = simulate_study(100, 100, seed=2)
+        self.assertEqual(a, b)
+
+    def test_simulate_study_asv(self):
+        table, _ = simulate_study(100, 100, control='asv', asv='ACGT',
+                                  seed=3)
+        self.assertEqual(table.ids(axis='observation')[0], 'ACGT')
+
+    def test_fit_recovers_parameters(self):
+        table, metadata = simulate_study(200, 300, replicates=6, seed=4)
+        fit, _ = fit_table_threshold(
+            table, 90, 'control', metadata.control_rct,
+            metadata.control_cell_into_extraction, 'classic')
+
+        self.assertAlmostEqual(fit['h'], H, delta=2)
+        self.assertAlmostEqual(np.log10(fit['k_prime']), np.log10(K_PRIME),
+                               delta=1)
+
+    def test_invalid(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown control type'):
+            simulate_study(100, 100, control='mock')
+        with self.assertRaisesRegex(ValueError, 'positive controls'):
+            simulate_study(10, 100)
+        with self.assertRaisesRegex(ValueError, 'contaminant features'):
+            simulate_study(100, 10)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+from unittest import TestCase, main, skipIf
+
+import gzip
+import os
+import shutil
+import tempfile
+import pandas as pd
+
+from qiime2.plugin import ValidationError
+
+from q2_katharoseq._format import (EstimatedBiomassFmt, detect_compression,
+                                   CompressedEstimatedBiomassFmt,
+                                   ZstdEstimatedBiomassFmt,
+                                   EstimatedBiomassDirFmt,
+                                   KatharoSeqThresholdFmt, ReadTotalsFmt)
+from q2_katharoseq._transformer import _1, _2, _5, _6, _7, _8, _9, _10
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class EstimatedBiomassTransformerTests(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.fp = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               '..', '..', 'example',
+                               'est_biomass_output.csv')
+        self.exp = pd.read_csv(self.fp, index_col=0)
+
+    def _copy(self, name, opener):
+        df = EstimatedBiomassDirFmt(self.temp_dir.name, mode='r')
+        with open(self.fp, 'rb') as src, \
+                opener(os.path.join(df.path, name)) as dst:
+            shutil.copyfileobj(src, dst)
+        return df
+
+    def test_dataframe_roundtrip(self):
+        ff = _1(self.exp)
+
+        self.assertIsNone(detect_compression(ff))
+        self.assertTrue(ff.sniff())
+
+        obs = _2(ff)
+        pd.testing.assert_frame_equal(obs, self.exp, check_index_type=False)
+        self.assertTrue((obs.dtypes == 'float64').all())
+
+    def test_directory_is_compressed(self):
+        df = _7(self.exp)
+
+        self.assertEqual(sorted(os.listdir(df.path)), ['est_biomass.csv.gz'])
+        self.assertEqual(detect_compression(df.biomass_path()), 'gzip')
+        df.validate()
+        obs = _8(df)
+        pd.testing.assert_frame_equal(obs, self.exp, check_index_type=False)
+
+    def test_directory_plain_csv(self):
+        df = self._copy('est_biomass.csv', lambda p: open(p, 'wb'))
+
+        self.assertIsNone(detect_compression(df.biomass_path()))
+        df.validate()
+        obs = _8(df)
+        pd.testing.assert_frame_equal(obs, self.exp, check_index_type=False)
+
+    def test_plain_csv_is_not_compressed(self):
+        df = self._copy('est_biomass.csv', lambda p: gzip.open(p, 'wb'))
+
+        ff = EstimatedBiomassFmt(df.biomass_path(), mode='r')
+        self.assertFalse(ff.sniff())
+
+    def test_directory_gzip(self):
+        df = self._copy('est_biomass.csv.gz', lambda p: gzip.open(p, 'wb'))
+
+        ff = CompressedEstimatedBiomassFmt(df.biomass_path(), mode='r')
+        self.assertTrue(ff.sniff())
+        df.validate()
+        obs = _8(df)
+        pd.testing.assert_frame_equal(obs, self.exp, check_index_type=False)
+
+    @skipIf(zstandard is None, 'zstandard is not installed')
+    def test_directory_zstd(self):
+        df = self._copy(
+            'est_biomass.csv.zst',
+            lambda p: zstandard.ZstdCompressor().stream_writer(open(p, 'wb')))
+
+        ff = ZstdEstimatedBiomassFmt(df.biomass_path(), mode='r')
+        self.assertEqual(detect_compression(ff), 'zstd')
+        self.assertTrue(ff.sniff())
+        self.assertFalse(
+            CompressedEstimatedBiomassFmt(df.biomass_path(), mode='r').sniff())
+        df.validate()
+        obs = _8(df)
+        pd.testing.assert_frame_equal(obs, self.exp, check_index_type=False)
+
+    def test_directory_needs_one_file(self):
+        df = self._copy('est_biomass.csv', lambda p: open(p, 'wb'))
+        self._copy('est_biomass.csv.gz', lambda p: gzip.open(p, 'wb'))
+
+        with self.assertRaisesRegex(ValidationError, 'exactly one'):
+            df.validate()
+
+    def test_numeric_sample_ids_stay_strings(self):
+        exp = self.exp.iloc[:3].copy()
+        exp.index = pd.Index(['001', '002', '003'], name='sample_name')
+
+        obs = _2(_1(exp))
+        self.assertEqual(list(obs.index), ['001', '002', '003'])
+
+
+class KatharoSeqThresholdTransformerTests(TestCase):
+
+    def test_dict_roundtrip(self):
+        exp = {'threshold': 90, 'min_freq': 1315, 'h': 16.6,
+               'k_prime': 1.8e7, 'pcov': [[1.0, 2.0], [2.0, 4.0]],
+               'thresholds': {'50': 1000, '70': 1100, '90': 1315},
+               'controls': {'sample_id': ['a', 'b'], 'cell_count': [1, 10]}}
+
+        ff = _5(exp)
+        self.assertIsInstance(ff, KatharoSeqThresholdFmt)
+        ff = KatharoSeqThresholdFmt(str(ff), mode='r')
+        self.assertTrue(ff.sniff())
+        self.assertEqual(_6(ff), exp)
+
+
+class ReadTotalsTransformerTests(TestCase):
+
+    def test_series_roundtrip(self):
+        exp = pd.Series([10.0, 0.0, 1315.0], name='total_reads',
+                        index=pd.Index(['001', 's2', 's3'], name='sample-id'))
+
+        ff = _9(exp)
+        self.assertIsInstance(ff, ReadTotalsFmt)
+        ff = ReadTotalsFmt(str(ff), mode='r')
+        self.assertTrue(ff.sniff())
+        pd.testing.assert_series_equal(_10(ff), exp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+from unittest import TestCase, main
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from q2_katharoseq._vega import columnar, downsample, to_json
+
+
+class VegaTests(TestCase):
+
+    def test_columnar(self):
+        df = pd.DataFrame({'sample_id': ['a', 'b', 'c'],
+                           'reads': [1, 2, 3],
+                           'log': [0.1234567891, np.nan, np.inf]})
+
+        self.assertEqual(columnar(df),
+                         {'sample_id': ['a', 'b', 'c'],
+                          'reads': [1.0, 2.0, 3.0],
+                          'log': [0.123457, None, None]})
+
+    def test_downsample_small(self):
+        df = pd.DataFrame({'x': range(10)})
+
+        obs, n = downsample(df, max_points=10)
+        self.assertIs(obs, df)
+        self.assertEqual(n, 10)
+
+    def test_downsample_large(self):
+        df = pd.DataFrame({'x': range(100000)})
+
+        obs, n = downsample(df, max_points=500)
+        self.assertEqual(n, 100000)
+        self.assertEqual(len(obs), 500)
+        self.assertTrue(obs['x'].is_monotonic_increasing)
+        # reproducible
+        pd.testing.assert_frame_equal(obs, downsample(df, max_points=500)[0])
+
+    def test_to_json_is_script_safe(self):
+        payload = to_json({'mark': 'point'},
+                          {'d': pd.DataFrame({'id': ['</script>']})})
+
+        self.assertNotIn('</', payload)
+        self.assertEqual(json.loads(payload)['datasets']['d']['id'],
+                         ['</script>'])
+
+
+if __name__ == '__main__':
+    main()
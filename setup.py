@@ -23,15 +23,18 @@ setup(
     description="katharo seq protocol for low biomass samles",
     license='BSD-3',
     entry_points={
-        'qiime2.plugins': ['q2-katharoseq=q2_katharoseq.plugin_setup:plugin']
+        'qiime2.plugins': ['q2-katharoseq=q2_katharoseq.plugin_setup:plugin'],
+        'console_scripts': ['katharoseq=q2_katharoseq.cli:main']
     },
     package_data={
-        "q2_katharoseq": ['citations.bib'],
+        "q2_katharoseq": ['citations.bib',
+                          'assets/*',
+                          'read_count_threshold_assets/*',
+                          'estimating_biomass_assets/*'],
         "example": ['*']
     },
     zip_safe=False,
     install_requires=['scipy',
-                      'scikit-learn',
                       'matplotlib',
                       'seaborn',
                       'pandas']